@@ -111,11 +111,23 @@ def create_app():
 
     cache.init_app(app)
     logger.info("Cache initialized")
+    from app.utils.cache_versions import check_cache_backend
+    check_cache_backend(app)
 
     # Rate limiting
     limiter.init_app(app)
     logger.info("Rate limiter initialized")
 
+    # Audit log (background writer, see app.utils.audit)
+    from app.utils.audit import init_audit
+    init_audit(app)
+    logger.info("Audit log initialized")
+
+    # Register models (before create_all so SQLAlchemy knows every table)
+    logger.info("Registering models")
+    from app.models import register_models
+    models = register_models()
+
     # Create database tables if they don't exist
     with app.app_context():
         try:
@@ -125,6 +137,15 @@ def create_app():
         except Exception as e:
             logger.error(f"Error creating database tables: {e}")
 
+        # New indexes, the search index and unique constraints on existing
+        # tables are versioned migrations: run `flask db upgrade` after deploying.
+        # Derived tables (facets, sales counters, entitlements) are filled once
+        # with `flask rebuild-derived`, not here, so workers don't race on it
+
+    # Maintenance commands (flask rebuild-derived)
+    from app.cli import register_commands
+    register_commands(app)
+
     @app.before_request
     def before_request():
         request.start_time = time.time()
@@ -143,11 +164,6 @@ def create_app():
 
         return response
 
-    # Register models
-    logger.info("Registering models")
-    from app.models import register_models
-    models = register_models()
-
     # Register blueprints
     logger.info("Registering blueprints")
     from app.routes.auth_routes import auth
@@ -158,6 +174,7 @@ def create_app():
     from app.routes.user_courses import user_courses_bp
     from app.routes.admin_routes import admin_bp
     from app.routes.session_routes import sessions_bp
+    from app.routes.me_routes import me_bp
 
     # Intentar importar rutas de pago si existen
     try:
@@ -175,6 +192,7 @@ def create_app():
     app.register_blueprint(user_courses_bp, url_prefix='/api/user')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     app.register_blueprint(sessions_bp, url_prefix='/api/sessions')
+    app.register_blueprint(me_bp, url_prefix='/api/me')
 
     # Registrar rutas de pago si existen
     if has_payment_routes:
@@ -232,6 +250,19 @@ def create_app():
         logger.warning(f"429 error: {error}")
         return make_error_response("Demasiadas solicitudes. Por favor, inténtalo más tarde.", 429)
 
+    # Password hashing pool saturated (app.utils.password_hashing): any route
+    # that hashes or verifies a password answers 503 instead of 500
+    from app.utils.password_hashing import PasswordHashingBusy
+
+    @app.errorhandler(PasswordHashingBusy)
+    def handle_password_hashing_busy(error):
+        """Handle a saturated password hashing pool"""
+        logger.warning(f"Password hashing busy: {error}")
+        db.session.rollback()
+        response, status_code = make_error_response("Servicio ocupado, inténtalo de nuevo en unos segundos", 503)
+        response.headers['Retry-After'] = '1'
+        return response, status_code
+
     @app.errorhandler(500)
     def handle_server_error(error):
         """Handle 500 Internal Server Error"""
@@ -0,0 +1,93 @@
+"""
+Comandos de Flask para tareas de mantenimiento (flask <comando>).
+
+Las tablas derivadas (facetas del catálogo, contadores de ventas y accesos a
+cursos) se mantienen de forma incremental al confirmar cada cambio, pero hay
+que rellenarlas una vez al desplegarlas sobre una base de datos con datos.
+Se hace con un comando explícito en lugar de al arrancar la aplicación para que
+no lo ejecuten a la vez todos los workers:
+    flask db upgrade
+    flask rebuild-derived
+"""
+
+import logging
+import click
+from sqlalchemy import select
+from app import db
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+
+def _rebuild_facets():
+    """Recalcula las facetas del catálogo."""
+    from app.models.curso_facet import CursoFacet
+    from app.utils.cache_versions import bump_versions
+    CursoFacet.rebuild()
+    db.session.commit()
+    bump_versions('curso')
+    return 'facetas del catálogo recalculadas'
+
+
+def _rebuild_stats():
+    """Recalcula los contadores de ventas de los cursos."""
+    from app.models.curso_stats import CursoStats
+    from app.utils.cache_versions import bump_versions
+    CursoStats.rebuild()
+    db.session.commit()
+    bump_versions('curso')
+    return 'contadores de ventas recalculados'
+
+
+def _rebuild_entitlements():
+    """Recalcula los accesos a cursos comprados y actualiza su caché."""
+    from app.models.entitlement import Entitlement
+    from app.utils.entitlements import refresh_entitlements
+    users = select(Entitlement.user_id).distinct()
+    before = set(db.session.execute(users).scalars())
+    granted = Entitlement.rebuild()
+    after = set(db.session.execute(users).scalars())
+    db.session.commit()
+    refresh_entitlements(before | after)
+    return f'accesos a cursos recalculados ({granted} concedidos)'
+
+
+def _derived_tables():
+    """Tablas derivadas como (nombre, modelo, función de recálculo)."""
+    from app.models.curso_facet import CursoFacet
+    from app.models.curso_stats import CursoStats
+    from app.models.entitlement import Entitlement
+    return [
+        ('facets', CursoFacet, _rebuild_facets),
+        ('stats', CursoStats, _rebuild_stats),
+        ('entitlements', Entitlement, _rebuild_entitlements),
+    ]
+
+
+def register_commands(app):
+    """
+    Registra los comandos de mantenimiento en la CLI de Flask.
+
+    Args:
+        app: Aplicación Flask
+    """
+    @app.cli.command('rebuild-derived')
+    @click.option('--force', is_flag=True,
+                  help='Recalcula también las tablas que ya tienen datos.')
+    @click.option('--only', type=click.Choice(['facets', 'stats', 'entitlements']),
+                  multiple=True, help='Limita el recálculo a estas tablas.')
+    def rebuild_derived(force, only):
+        """Rellena las tablas derivadas (facetas, ventas y accesos) vacías."""
+        for name, model, rebuild in _derived_tables():
+            if only and name not in only:
+                continue
+            if not force and db.session.query(model).first() is not None:
+                click.echo(f"{name}: ya tiene datos, se omite (usa --force para recalcular)")
+                continue
+            try:
+                message = rebuild()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error al recalcular {name}: {e}")
+                raise click.ClickException(f"No se pudo recalcular {name}: {e}")
+            click.echo(f"{name}: {message}")
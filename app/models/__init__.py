@@ -7,19 +7,30 @@
 def register_models():
     from .user import User
     from .curso import Curso
+    from .curso_facet import CursoFacet
+    from .curso_related import CursoRelated
+    from .curso_tombstone import CursoTombstone
     from .contacto import Contacto
     from .wishlist import Wishlist
-    from .cart import Cart
+    from .cart import Cart, CartArchive
     from .order import Order, OrderItem
+    from .curso_stats import CursoStats
+    from .entitlement import Entitlement
     from .session import Session
 
     return {
         'User': User,
         'Curso': Curso,
+        'CursoFacet': CursoFacet,
+        'CursoRelated': CursoRelated,
+        'CursoTombstone': CursoTombstone,
         'Contacto': Contacto,
         'Wishlist': Wishlist,
         'Cart': Cart,
+        'CartArchive': CartArchive,
         'Order': Order,
         'OrderItem': OrderItem,
+        'CursoStats': CursoStats,
+        'Entitlement': Entitlement,
         'Session': Session
     }
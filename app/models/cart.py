@@ -3,6 +3,7 @@ Modelo para el carrito de compras (cart) de los usuarios.
 """
 
 from datetime import datetime, timezone
+from sqlalchemy import Index
 from app import db
 
 class Cart(db.Model):
@@ -18,6 +19,14 @@ class Cart(db.Model):
     # Relaciones
     user = db.relationship('User', backref=db.backref('cart_items', lazy=True))
     curso = db.relationship('Curso', backref=db.backref('cart_items', lazy=True))
+
+    __table_args__ = (
+        # Un curso aparece como mucho una vez por usuario; el índice también
+        # sirve para las consultas por user_id
+        Index('uq_cart_user_curso', 'user_id', 'curso_id', unique=True),
+        # Para localizar los carritos abandonados (ver app.utils.cart_sweeper)
+        Index('idx_cart_created', 'created_at', 'id'),
+    )
     
     def __init__(self, user_id, curso_id):
         self.user_id = user_id
@@ -34,3 +43,34 @@ class Cart(db.Model):
             'curso_id': self.curso_id,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+
+class CartArchive(db.Model):
+    """Elementos de carritos abandonados retirados por el barrido periódico."""
+
+    __tablename__ = 'cart_archive'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cart_id = db.Column(db.Integer, nullable=False)  # ID que tenía en cart
+    user_id = db.Column(db.Integer, nullable=False)
+    curso_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index('idx_cart_archive_archived', 'archived_at'),
+    )
+
+    def __repr__(self):
+        return f'<CartArchive {self.id}: User {self.user_id}, Curso {self.curso_id}>'
+
+    def to_dict(self):
+        """Convierte el elemento archivado a un diccionario para la API."""
+        return {
+            'id': self.id,
+            'cart_id': self.cart_id,
+            'user_id': self.user_id,
+            'curso_id': self.curso_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
@@ -1,5 +1,15 @@
 from datetime import datetime, timezone
 from app import db, cache
+from sqlalchemy import Index
+from sqlalchemy.orm import load_only
+from app.utils.cache_versions import versioned_memoize, versioned_timeout, get_versions, bump_versions
+from app.utils.model_events import on_commit
+
+# Las entradas de caché de los cursos incluyen su versión, que se renueva tras
+# cada commit que modifica un curso, por lo que con una caché compartida pueden
+# durar horas; con una local a cada proceso se limitan (ver versioned_timeout).
+CURSO_CACHE_TIMEOUT = 21600  # 6 horas
+CURSO_DICT_KEY = 'curso:dict:{curso_id}:{version}'
 
 class Curso(db.Model):
     """Modelo para los cursos ofrecidos en la plataforma."""
@@ -24,41 +34,140 @@ class Curso(db.Model):
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
+    # Índices para el listado público (filtro por activo + ordenación por cursor)
+    __table_args__ = (
+        Index('idx_cursos_activo_precio', 'activo', 'precio', 'id'),
+        Index('idx_cursos_activo_titulo', 'activo', 'titulo', 'id'),
+        Index('idx_cursos_activo_created', 'activo', 'created_at', 'id'),
+        Index('idx_cursos_nivel_activo', 'nivel', 'activo'),
+        # Sincronización incremental (GET /api/cursos/changes)
+        Index('idx_cursos_updated', 'updated_at', 'id'),
+    )
+
     def __repr__(self):
         """Representación en string del curso."""
         return f'<Curso {self.id}: {self.titulo}>'
 
-    def to_dict(self):
-        """Convierte el curso a un diccionario para la API."""
-        return {
-            'id': self.id,
-            'titulo': self.titulo,
-            'descripcion': self.descripcion,
-            'duracion': self.duracion,
-            'precio': float(self.precio) if self.precio else None,
-            'imagen_url': self.imagen_url,
-            'nivel': self.nivel,
-            'instructor': self.instructor,
-            'destacado': self.destacado,
-            'activo': self.activo,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    # Campos que se pueden pedir con ?fields= (en el orden en que se serializan)
+    SERIALIZABLE_FIELDS = (
+        'id', 'titulo', 'descripcion', 'duracion', 'precio', 'imagen_url', 'nivel',
+        'instructor', 'destacado', 'activo', 'created_at', 'updated_at'
+    )
+
+    def to_dict(self, fields=None):
+        """
+        Convierte el curso a un diccionario para la API.
+
+        Args:
+            fields (iterable, optional): Campos a incluir. Por defecto, todos.
+        """
+        return {field: self._serialize_field(field) for field in (fields or self.SERIALIZABLE_FIELDS)}
+
+    def _serialize_field(self, field):
+        """Serializa un único campo, sin acceder a las demás columnas."""
+        value = getattr(self, field)
+        if field == 'precio':
+            return float(value) if value is not None else None
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    @classmethod
+    def parse_fields(cls, raw_fields):
+        """
+        Valida el parámetro ?fields= (lista separada por comas).
+
+        El ID se incluye siempre y los campos se devuelven en orden canónico,
+        de modo que la misma selección produce siempre la misma clave de caché.
+
+        Args:
+            raw_fields (str): Valor del parámetro, o None
+
+        Returns:
+            tuple: Campos solicitados, o None si no se pidió ninguno
+
+        Raises:
+            ValueError: Si se pide un campo desconocido
+        """
+        if not raw_fields:
+            return None
+        requested = {field.strip() for field in raw_fields.split(',') if field.strip()}
+        unknown = requested - set(cls.SERIALIZABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Campos no soportados: {', '.join(sorted(unknown))}")
+        requested.add('id')
+        return tuple(field for field in cls.SERIALIZABLE_FIELDS if field in requested)
+
+    @classmethod
+    def load_only_fields(cls, fields, *extra):
+        """
+        Opción de consulta que carga solo las columnas de los campos indicados.
+
+        Args:
+            fields (iterable): Campos a serializar
+            *extra: Columnas adicionales necesarias (por ejemplo, la de ordenación)
+        """
+        columns = {field: getattr(cls, field) for field in fields}
+        columns.update((column.key, column) for column in extra)
+        return load_only(*columns.values())
 
     @classmethod
-    @cache.memoize(timeout=300)  # Caché de 5 minutos
+    @versioned_memoize('curso', timeout=CURSO_CACHE_TIMEOUT)
     def get_all_active(cls):
         """Obtiene todos los cursos activos (con caché)."""
         return cls.query.filter_by(activo=True).order_by(cls.titulo).all()
 
     @classmethod
-    @cache.memoize(timeout=300)  # Caché de 5 minutos
+    @versioned_memoize('curso', timeout=CURSO_CACHE_TIMEOUT)
     def get_featured(cls):
         """Obtiene los cursos destacados (con caché)."""
         return cls.query.filter_by(activo=True, destacado=True).order_by(cls.titulo).all()
 
     @classmethod
-    @cache.memoize(timeout=60)  # Caché de 1 minuto
+    @versioned_memoize('curso', timeout=CURSO_CACHE_TIMEOUT, id_arg=1)
     def get_by_id(cls, curso_id):
         """Obtiene un curso por su ID (con caché)."""
-        return cls.query.get(curso_id)
\ No newline at end of file
+        return cls.query.get(curso_id)
+
+    @classmethod
+    def get_dicts_by_ids(cls, curso_ids):
+        """
+        Obtiene varios cursos serializados, consultando primero la caché por curso.
+
+        Solo los IDs que no están en caché se consultan, con una única
+        sentencia IN.
+
+        Args:
+            curso_ids (list): IDs de los cursos
+
+        Returns:
+            dict: Diccionario de cada curso encontrado, indexado por ID
+        """
+        curso_ids = list(curso_ids)
+        if not curso_ids:
+            return {}
+
+        versions = get_versions('curso', curso_ids)
+        keys = {
+            curso_id: CURSO_DICT_KEY.format(curso_id=curso_id, version=versions[curso_id])
+            for curso_id in curso_ids
+        }
+        found = dict(zip(curso_ids, cache.get_many(*keys.values())))
+
+        missing = [curso_id for curso_id, curso_dict in found.items() if curso_dict is None]
+        if missing:
+            fresh = {curso.id: curso.to_dict() for curso in cls.query.filter(cls.id.in_(missing))}
+            if fresh:
+                cache.set_many(
+                    {keys[curso_id]: curso_dict for curso_id, curso_dict in fresh.items()},
+                    timeout=versioned_timeout(CURSO_CACHE_TIMEOUT)
+                )
+            found.update(fresh)
+
+        return {curso_id: curso_dict for curso_id, curso_dict in found.items() if curso_dict is not None}
+
+
+@on_commit(Curso)
+def _invalidar_cache_cursos(changes):
+    """Renueva la versión de cada curso modificado y la del catálogo."""
+    bump_versions('curso', changes.ids)
@@ -0,0 +1,205 @@
+"""
+Modelo para los recuentos precalculados de facetas del catálogo.
+
+Cada fila guarda cuántos cursos activos tienen un valor de faceta (nivel,
+instructor, franja de precio o destacado). Los recuentos se actualizan de
+forma incremental en la misma transacción que inserta, modifica o elimina un
+curso, de modo que consultar las facetas no depende del tamaño del catálogo.
+"""
+
+from collections import Counter
+from sqlalchemy import event, case, func, select, delete
+from sqlalchemy.orm.attributes import get_history
+from app import db
+from app.models.curso import Curso
+from app.utils.db_utils import dialect_insert, track_previous_values
+
+# Columnas de Curso de las que dependen las facetas
+FACET_COLUMNS = ('activo', 'nivel', 'instructor', 'precio', 'destacado')
+
+# Franjas de precio: (límite superior exclusivo, etiqueta); la última no tiene límite
+PRICE_BANDS = (
+    (50, '0-50'),
+    (100, '50-100'),
+    (200, '100-200'),
+    (None, '200+'),
+)
+FREE_BAND = 'gratis'
+
+FACETS = ('nivel', 'instructor', 'precio', 'destacado')
+
+
+class CursoFacet(db.Model):
+    """Recuento de cursos activos por valor de faceta."""
+
+    __tablename__ = 'curso_facets'
+
+    facet = db.Column(db.String(20), primary_key=True)
+    value = db.Column(db.String(100), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<CursoFacet {self.facet}={self.value}: {self.total}>'
+
+    def to_dict(self):
+        """Convierte el recuento a un diccionario para la API."""
+        return {
+            'value': self.value,
+            'count': self.total
+        }
+
+    @classmethod
+    def get_facets(cls):
+        """
+        Obtiene los recuentos de todas las facetas con al menos un curso.
+
+        Returns:
+            dict: Lista de valores y recuentos por faceta
+        """
+        facets = {facet: [] for facet in FACETS}
+        for row in cls.query.filter(cls.total > 0).order_by(cls.facet, cls.total.desc(), cls.value):
+            facets.setdefault(row.facet, []).append(row.to_dict())
+
+        # Las franjas de precio se devuelven en orden ascendente, no por recuento
+        band_order = {label: index for index, label in enumerate([FREE_BAND] + [label for _, label in PRICE_BANDS])}
+        facets['precio'].sort(key=lambda item: band_order.get(item['value'], len(band_order)))
+        return facets
+
+    @classmethod
+    def rebuild(cls, connection=None):
+        """
+        Recalcula todos los recuentos a partir de la tabla de cursos.
+
+        Args:
+            connection (optional): Conexión a usar. Por defecto, la de la sesión actual.
+        """
+        connection = connection or db.session.connection()
+        connection.execute(delete(cls.__table__))
+
+        activos = Curso.activo.is_(True)
+        band = price_band_expression()
+        destacado = func.coalesce(Curso.destacado, False)
+        queries = (
+            ('nivel', select(Curso.nivel, func.count())
+                .where(activos, Curso.nivel.isnot(None), Curso.nivel != '').group_by(Curso.nivel)),
+            ('instructor', select(Curso.instructor, func.count())
+                .where(activos, Curso.instructor.isnot(None), Curso.instructor != '').group_by(Curso.instructor)),
+            ('precio', select(band, func.count())
+                .where(activos, Curso.precio.isnot(None)).group_by(band)),
+            ('destacado', select(destacado, func.count())
+                .where(activos).group_by(destacado)),
+        )
+
+        rows = []
+        for facet, query in queries:
+            for value, count in connection.execute(query):
+                if facet == 'destacado':
+                    value = _bool_value(value)
+                rows.append({'facet': facet, 'value': str(value), 'total': count})
+
+        if rows:
+            connection.execute(cls.__table__.insert(), rows)
+
+
+def price_band(precio):
+    """Devuelve la etiqueta de la franja de precio, o None si no hay precio."""
+    if precio is None:
+        return None
+    if precio <= 0:
+        return FREE_BAND
+    for upper, label in PRICE_BANDS:
+        if upper is None or precio < upper:
+            return label
+
+
+def price_band_expression():
+    """Expresión SQL equivalente a price_band() para recálculos por conjunto."""
+    whens = [(Curso.precio <= 0, FREE_BAND)]
+    whens += [(Curso.precio < upper, label) for upper, label in PRICE_BANDS if upper is not None]
+    return case(*whens, else_=PRICE_BANDS[-1][1])
+
+
+def _bool_value(value):
+    return 'true' if value else 'false'
+
+
+def facet_values(values):
+    """
+    Calcula los pares (faceta, valor) a los que contribuye un curso.
+
+    Args:
+        values (dict): Valores de las columnas FACET_COLUMNS del curso
+
+    Returns:
+        list: Pares (faceta, valor); vacía si el curso no está activo
+    """
+    if not values.get('activo'):
+        return []
+
+    pairs = []
+    if values.get('nivel'):
+        pairs.append(('nivel', values['nivel']))
+    if values.get('instructor'):
+        pairs.append(('instructor', values['instructor']))
+    band = price_band(values.get('precio'))
+    if band:
+        pairs.append(('precio', band))
+    pairs.append(('destacado', _bool_value(values.get('destacado'))))
+    return pairs
+
+
+def apply_facet_deltas(connection, deltas):
+    """
+    Suma los incrementos indicados a los recuentos de facetas.
+
+    Args:
+        connection: Conexión de la transacción en curso
+        deltas (Counter): Incremento por par (faceta, valor)
+    """
+    rows = [
+        {'facet': facet, 'value': value, 'total': delta}
+        for (facet, value), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+
+    stmt = dialect_insert(CursoFacet.__table__, connection)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['facet', 'value'],
+        set_={'total': CursoFacet.__table__.c.total + stmt.excluded.total}
+    )
+    connection.execute(stmt, rows)
+
+
+def _current_values(target):
+    return {column: getattr(target, column) for column in FACET_COLUMNS}
+
+
+def _previous_values(target):
+    previous = {}
+    for column in FACET_COLUMNS:
+        history = get_history(target, column)
+        previous[column] = history.deleted[0] if history.deleted else getattr(target, column)
+    return previous
+
+
+track_previous_values(*(getattr(Curso, column) for column in FACET_COLUMNS))
+
+
+@event.listens_for(Curso, 'after_insert')
+def _facets_after_insert(mapper, connection, target):
+    apply_facet_deltas(connection, Counter(facet_values(_current_values(target))))
+
+
+@event.listens_for(Curso, 'after_update')
+def _facets_after_update(mapper, connection, target):
+    deltas = Counter(facet_values(_current_values(target)))
+    deltas.subtract(facet_values(_previous_values(target)))
+    apply_facet_deltas(connection, deltas)
+
+
+@event.listens_for(Curso, 'after_delete')
+def _facets_after_delete(mapper, connection, target):
+    deltas = Counter()
+    deltas.subtract(facet_values(_previous_values(target)))
+    apply_facet_deltas(connection, deltas)
@@ -0,0 +1,58 @@
+"""
+Modelo para los cursos relacionados ("los estudiantes también compraron").
+
+Las filas se recalculan periódicamente con scripts/compute_related_courses.py
+(ver app.utils.recommendations). La clave primaria (curso_id, rank) permite
+obtener los vecinos de un curso ya ordenados con una sola búsqueda por índice.
+"""
+
+from app import db
+from app.models.curso import Curso
+
+
+class CursoRelated(db.Model):
+    """Curso relacionado con otro por compras, carritos y listas de deseos comunes."""
+
+    __tablename__ = 'curso_related'
+
+    curso_id = db.Column(db.Integer, db.ForeignKey('cursos.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)
+    related_id = db.Column(db.Integer, db.ForeignKey('cursos.id', ondelete='CASCADE'), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+
+    # Relaciones
+    related = db.relationship('Curso', foreign_keys=[related_id])
+
+    def __repr__(self):
+        return f'<CursoRelated {self.curso_id} -> {self.related_id} ({self.score:.3f})>'
+
+    @classmethod
+    def get_related(cls, curso_id, limit=10, fields=None):
+        """
+        Obtiene los cursos activos relacionados con un curso, por orden de similitud.
+
+        Args:
+            curso_id (int): ID del curso
+            limit (int, optional): Número máximo de resultados. Por defecto 10.
+            fields (tuple, optional): Campos de cada curso a incluir. Por defecto, todos.
+
+        Returns:
+            list: Diccionarios de los cursos con su puntuación en 'score'
+        """
+        fields = fields or Curso.SERIALIZABLE_FIELDS
+        rows = (
+            db.session.query(Curso, cls.score)
+            .join(cls, cls.related_id == Curso.id)
+            .options(Curso.load_only_fields(fields))
+            .filter(cls.curso_id == curso_id, Curso.activo.is_(True))
+            .order_by(cls.rank)
+            .limit(limit)
+            .all()
+        )
+
+        related = []
+        for curso, score in rows:
+            data = curso.to_dict(fields)
+            data['score'] = round(score, 4)
+            related.append(data)
+        return related
@@ -0,0 +1,211 @@
+"""
+Modelo para los contadores de ventas precalculados de cada curso.
+
+Las unidades vendidas y los ingresos de cada curso se actualizan de forma
+incremental en la misma transacción que registra un pedido pagado (o que lo
+deja de estar, por ejemplo al reembolsarlo), de modo que ordenar por más
+vendidos no requiere agregar la tabla de pedidos.
+"""
+
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy import event, Index, func, select, delete
+from sqlalchemy.orm.attributes import get_history
+from app import db
+from app.models.order import Order, OrderItem
+from app.utils.db_utils import dialect_insert, track_previous_values
+
+# Estado de los pedidos que cuentan como venta
+PAID_STATUS = 'paid'
+
+
+class CursoStats(db.Model):
+    """Ventas acumuladas de un curso."""
+
+    __tablename__ = 'curso_stats'
+
+    curso_id = db.Column(db.Integer, db.ForeignKey('cursos.id', ondelete='CASCADE'), primary_key=True)
+    sales_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    # Relaciones
+    curso = db.relationship('Curso', backref=db.backref('stats', uselist=False, lazy=True))
+
+    __table_args__ = (
+        Index('idx_curso_stats_sales', 'sales_count', 'curso_id'),
+        Index('idx_curso_stats_revenue', 'revenue', 'curso_id'),
+    )
+
+    def __repr__(self):
+        return f'<CursoStats {self.curso_id}: {self.sales_count} ventas>'
+
+    def to_dict(self):
+        """Convierte los contadores a un diccionario para la API."""
+        return {
+            'curso_id': self.curso_id,
+            'sales_count': self.sales_count,
+            'revenue': round(self.revenue or 0, 2)
+        }
+
+    @classmethod
+    def get_top(cls, limit=10, by='sales'):
+        """
+        Obtiene los cursos más vendidos a partir de los contadores.
+
+        Args:
+            limit (int, optional): Número de cursos. Por defecto 10.
+            by (str, optional): 'sales' (unidades) o 'revenue' (ingresos)
+
+        Returns:
+            list: Contadores de cada curso con su título
+        """
+        column = cls.revenue if by == 'revenue' else cls.sales_count
+        rows = (
+            cls.query
+            .options(db.joinedload(cls.curso))
+            .filter(column > 0)
+            .order_by(column.desc(), cls.curso_id.desc())
+            .limit(limit)
+            .all()
+        )
+        return [
+            dict(stats.to_dict(), titulo=stats.curso.titulo if stats.curso else None)
+            for stats in rows
+        ]
+
+    @classmethod
+    def rebuild(cls, connection=None):
+        """
+        Recalcula todos los contadores a partir de los pedidos pagados.
+
+        Args:
+            connection (optional): Conexión a usar. Por defecto, la de la sesión actual.
+        """
+        connection = connection or db.session.connection()
+        connection.execute(delete(cls.__table__))
+        rows = connection.execute(
+            select(
+                OrderItem.curso_id,
+                func.sum(func.coalesce(OrderItem.quantity, 1)),
+                func.sum(OrderItem.price * func.coalesce(OrderItem.quantity, 1))
+            )
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(Order.status == PAID_STATUS)
+            .group_by(OrderItem.curso_id)
+        ).all()
+        if rows:
+            connection.execute(cls.__table__.insert(), [
+                {'curso_id': curso_id, 'sales_count': sales, 'revenue': revenue or 0.0}
+                for curso_id, sales, revenue in rows
+            ])
+
+
+def apply_sales_deltas(connection, sales, revenue):
+    """
+    Suma incrementos a los contadores de ventas de varios cursos.
+
+    Args:
+        connection: Conexión de la transacción en curso
+        sales (Counter): Unidades vendidas por curso_id (negativas al restar)
+        revenue (Counter): Ingresos por curso_id
+    """
+    rows = [
+        {
+            'curso_id': curso_id,
+            'sales_count': sales.get(curso_id, 0),
+            'revenue': revenue.get(curso_id, 0.0),
+            'updated_at': datetime.now(timezone.utc)
+        }
+        for curso_id in set(sales) | set(revenue)
+        if sales.get(curso_id) or revenue.get(curso_id)
+    ]
+    if not rows:
+        return
+
+    table = CursoStats.__table__
+    stmt = dialect_insert(table, connection)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['curso_id'],
+        set_={
+            'sales_count': table.c.sales_count + stmt.excluded.sales_count,
+            'revenue': table.c.revenue + stmt.excluded.revenue,
+            'updated_at': stmt.excluded.updated_at
+        }
+    )
+    connection.execute(stmt, rows)
+
+
+def _apply_items(connection, items, sign):
+    sales, revenue = Counter(), Counter()
+    for curso_id, quantity, price in items:
+        quantity = quantity or 1
+        sales[curso_id] += sign * quantity
+        revenue[curso_id] += sign * quantity * (price or 0.0)
+    apply_sales_deltas(connection, sales, revenue)
+
+
+def _order_items(connection, order_id):
+    return connection.execute(
+        select(OrderItem.curso_id, OrderItem.quantity, OrderItem.price)
+        .where(OrderItem.order_id == order_id)
+    ).all()
+
+
+def _order_status(connection, order_id):
+    return connection.execute(select(Order.status).where(Order.id == order_id)).scalar()
+
+
+track_previous_values(Order.status, OrderItem.curso_id, OrderItem.quantity, OrderItem.price)
+
+
+@event.listens_for(Order, 'after_update')
+def _stats_after_order_update(mapper, connection, target):
+    # Un pedido que pasa a pagado suma sus líneas; uno que deja de estarlo las resta
+    history = get_history(target, 'status')
+    if not history.has_changes():
+        return
+    was_paid = PAID_STATUS in (history.deleted or ())
+    is_paid = target.status == PAID_STATUS
+    if was_paid != is_paid:
+        _apply_items(connection, _order_items(connection, target.id), 1 if is_paid else -1)
+
+
+@event.listens_for(Order, 'after_insert')
+def _stats_after_order_insert(mapper, connection, target):
+    # Normalmente las líneas se insertan después del pedido y se cuentan en
+    # _stats_after_item_insert; aquí solo se cuentan las ya existentes
+    if target.status == PAID_STATUS:
+        _apply_items(connection, _order_items(connection, target.id), 1)
+
+
+@event.listens_for(Order, 'after_delete')
+def _stats_after_order_delete(mapper, connection, target):
+    # Las líneas borradas por el ORM ya se han restado una a una; aquí solo
+    # quedan las que la base de datos borre en cascada
+    if target.status == PAID_STATUS:
+        _apply_items(connection, _order_items(connection, target.id), -1)
+
+
+@event.listens_for(OrderItem, 'after_insert')
+def _stats_after_item_insert(mapper, connection, target):
+    if _order_status(connection, target.order_id) == PAID_STATUS:
+        _apply_items(connection, [(target.curso_id, target.quantity, target.price)], 1)
+
+
+@event.listens_for(OrderItem, 'after_delete')
+def _stats_after_item_delete(mapper, connection, target):
+    if _order_status(connection, target.order_id) == PAID_STATUS:
+        _apply_items(connection, [(target.curso_id, target.quantity, target.price)], -1)
+
+
+@event.listens_for(OrderItem, 'after_update')
+def _stats_after_item_update(mapper, connection, target):
+    if _order_status(connection, target.order_id) != PAID_STATUS:
+        return
+    previous = []
+    for column in ('curso_id', 'quantity', 'price'):
+        history = get_history(target, column)
+        previous.append(history.deleted[0] if history.deleted else getattr(target, column))
+    _apply_items(connection, [tuple(previous)], -1)
+    _apply_items(connection, [(target.curso_id, target.quantity, target.price)], 1)
@@ -0,0 +1,50 @@
+"""
+Modelo para los registros de cursos eliminados (tombstones).
+
+Permite que la sincronización incremental (GET /api/cursos/changes) informe
+a los clientes de los cursos borrados desde su última sincronización. Las
+filas se escriben en la misma transacción que elimina el curso y se borran si
+se vuelve a crear un curso con el mismo ID.
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy import event, Index, delete
+from app import db
+from app.models.curso import Curso
+from app.utils.db_utils import dialect_insert
+
+
+class CursoTombstone(db.Model):
+    """Marca de eliminación de un curso."""
+
+    __tablename__ = 'curso_tombstones'
+
+    curso_id = db.Column(db.Integer, primary_key=True)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index('idx_curso_tombstones_deleted', 'deleted_at', 'curso_id'),
+    )
+
+    def __repr__(self):
+        return f'<CursoTombstone {self.curso_id}: {self.deleted_at}>'
+
+
+@event.listens_for(Curso, 'after_delete')
+def _tombstone_after_delete(mapper, connection, target):
+    table = CursoTombstone.__table__
+    stmt = dialect_insert(table, connection).values(
+        curso_id=target.id,
+        deleted_at=datetime.now(timezone.utc)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['curso_id'],
+        set_={'deleted_at': stmt.excluded.deleted_at}
+    )
+    connection.execute(stmt)
+
+
+@event.listens_for(Curso, 'after_insert')
+def _tombstone_after_insert(mapper, connection, target):
+    # Un ID reutilizado deja de estar eliminado
+    connection.execute(delete(CursoTombstone.__table__).where(CursoTombstone.curso_id == target.id))
@@ -0,0 +1,192 @@
+"""
+Modelo para los cursos a los que tiene acceso cada usuario (entitlements).
+
+Una fila por (usuario, curso) comprado. Las filas se escriben en la misma
+transacción que marca un pedido como pagado (o que deja de estarlo, por
+ejemplo al reembolsarlo), de modo que comprobar el acceso a un curso no
+requiere consultar los pedidos. Los cambios se registran con mark_changed
+para que la caché de cursos de cada usuario se actualice tras el commit
+(ver app.utils.entitlements).
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy import event, Index, delete, literal, select
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.attributes import get_history
+from app import db
+from app.models.curso_stats import PAID_STATUS
+from app.models.order import Order, OrderItem
+from app.utils.db_utils import dialect_insert, track_previous_values
+from app.utils.model_events import mark_changed
+
+
+class Entitlement(db.Model):
+    """Acceso de un usuario a un curso comprado."""
+
+    __tablename__ = 'entitlements'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    curso_id = db.Column(db.Integer, db.ForeignKey('cursos.id', ondelete='CASCADE'), primary_key=True)
+    # Pedido que concedió el acceso; sin clave foránea para poder borrar el
+    # pedido antes que sus filas dentro del mismo flush
+    order_id = db.Column(db.Integer, nullable=False)
+    granted_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index('idx_entitlements_order', 'order_id'),
+    )
+
+    def __repr__(self):
+        return f'<Entitlement User {self.user_id}, Curso {self.curso_id}>'
+
+    def to_dict(self):
+        """Convierte el acceso a un diccionario para la API."""
+        return {
+            'user_id': self.user_id,
+            'curso_id': self.curso_id,
+            'order_id': self.order_id,
+            'granted_at': self.granted_at.isoformat() if self.granted_at else None
+        }
+
+    @classmethod
+    def rebuild(cls, connection=None):
+        """
+        Recalcula todos los accesos a partir de los pedidos pagados.
+
+        Args:
+            connection (optional): Conexión a usar. Por defecto, la de la sesión actual.
+
+        Returns:
+            int: Número de accesos concedidos
+        """
+        connection = connection or db.session.connection()
+        connection.execute(delete(cls.__table__))
+        return connection.execute(_grant_statement(connection)).rowcount
+
+
+def _grant_statement(connection, *conditions):
+    """INSERT ... SELECT de los cursos de los pedidos pagados que cumplen las condiciones."""
+    source = (
+        select(Order.user_id, OrderItem.curso_id, Order.id, literal(datetime.now(timezone.utc)))
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .where(Order.status == PAID_STATUS, *conditions)
+    )
+    stmt = dialect_insert(Entitlement.__table__, connection).from_select(
+        ['user_id', 'curso_id', 'order_id', 'granted_at'], source
+    )
+    return stmt.on_conflict_do_nothing(index_elements=['user_id', 'curso_id'])
+
+
+def grant_order(connection, order_id, curso_ids=None):
+    """
+    Concede los cursos de un pedido pagado.
+
+    Args:
+        connection: Conexión de la transacción en curso
+        order_id (int): ID del pedido
+        curso_ids (iterable, optional): Limitar a estos cursos del pedido
+
+    Returns:
+        list: Pares (user_id, curso_id) concedidos
+    """
+    conditions = [Order.id == order_id]
+    if curso_ids is not None:
+        conditions.append(OrderItem.curso_id.in_(list(curso_ids)))
+    stmt = _grant_statement(connection, *conditions).returning(
+        Entitlement.__table__.c.user_id, Entitlement.__table__.c.curso_id
+    )
+    return [tuple(row) for row in connection.execute(stmt)]
+
+
+def revoke_order(connection, order_id, curso_ids=None):
+    """
+    Retira los cursos concedidos por un pedido.
+
+    Si el usuario tiene otro pedido pagado con el mismo curso, el acceso se
+    vuelve a conceder a partir de ese pedido.
+
+    Args:
+        connection: Conexión de la transacción en curso
+        order_id (int): ID del pedido
+        curso_ids (iterable, optional): Limitar a estos cursos del pedido
+
+    Returns:
+        list: Pares (user_id, curso_id) afectados
+    """
+    table = Entitlement.__table__
+    stmt = delete(table).where(table.c.order_id == order_id)
+    if curso_ids is not None:
+        stmt = stmt.where(table.c.curso_id.in_(list(curso_ids)))
+    revoked = [tuple(row) for row in connection.execute(stmt.returning(table.c.user_id, table.c.curso_id))]
+
+    if revoked:
+        # El pedido ya no está pagado (o su línea ya no existe) cuando se
+        # ejecuta esta sentencia, así que solo encuentra otras compras
+        connection.execute(_grant_statement(
+            connection,
+            Order.user_id == revoked[0][0],
+            OrderItem.curso_id.in_([curso_id for _, curso_id in revoked])
+        ))
+    return revoked
+
+
+def _order_status(connection, order_id):
+    return connection.execute(select(Order.status).where(Order.id == order_id)).scalar()
+
+
+def _mark(target, keys):
+    session = object_session(target)
+    if keys and session is not None:
+        mark_changed(session, Entitlement, upserted_ids=keys)
+
+
+track_previous_values(Order.status, OrderItem.curso_id)
+
+
+@event.listens_for(Order, 'after_update')
+def _entitlements_after_order_update(mapper, connection, target):
+    # Un pedido que pasa a pagado concede sus cursos; uno que deja de estarlo los retira
+    history = get_history(target, 'status')
+    if not history.has_changes():
+        return
+    was_paid = PAID_STATUS in (history.deleted or ())
+    is_paid = target.status == PAID_STATUS
+    if is_paid and not was_paid:
+        _mark(target, grant_order(connection, target.id))
+    elif was_paid and not is_paid:
+        _mark(target, revoke_order(connection, target.id))
+
+
+@event.listens_for(Order, 'after_insert')
+def _entitlements_after_order_insert(mapper, connection, target):
+    # Las líneas insertadas después del pedido se conceden en _entitlements_after_item_insert
+    if target.status == PAID_STATUS:
+        _mark(target, grant_order(connection, target.id))
+
+
+@event.listens_for(Order, 'after_delete')
+def _entitlements_after_order_delete(mapper, connection, target):
+    if target.status == PAID_STATUS:
+        _mark(target, revoke_order(connection, target.id))
+
+
+@event.listens_for(OrderItem, 'after_insert')
+def _entitlements_after_item_insert(mapper, connection, target):
+    if _order_status(connection, target.order_id) == PAID_STATUS:
+        _mark(target, grant_order(connection, target.order_id, [target.curso_id]))
+
+
+@event.listens_for(OrderItem, 'after_delete')
+def _entitlements_after_item_delete(mapper, connection, target):
+    if _order_status(connection, target.order_id) == PAID_STATUS:
+        _mark(target, revoke_order(connection, target.order_id, [target.curso_id]))
+
+
+@event.listens_for(OrderItem, 'after_update')
+def _entitlements_after_item_update(mapper, connection, target):
+    history = get_history(target, 'curso_id')
+    if not history.deleted or _order_status(connection, target.order_id) != PAID_STATUS:
+        return
+    keys = revoke_order(connection, target.order_id, history.deleted)
+    keys += grant_order(connection, target.order_id, [target.curso_id])
+    _mark(target, keys)
@@ -1,4 +1,5 @@
 from datetime import datetime, timezone
+from sqlalchemy import Index
 from app import db
 
 class Order(db.Model):
@@ -18,6 +19,12 @@ class Order(db.Model):
     # Relaciones
     user = db.relationship('User', backref=db.backref('orders', lazy=True))
     items = db.relationship('OrderItem', backref='order', lazy=True, cascade='all, delete-orphan')
+
+    __table_args__ = (
+        # El webhook de Stripe busca el pedido por el ID de la sesión de pago;
+        # al ser único, un evento reenviado no puede registrar el pago dos veces
+        Index('idx_orders_payment_id', 'payment_id', unique=True),
+    )
     
     def __repr__(self):
         """Representación en string de la orden."""
@@ -1,7 +1,11 @@
 from flask_login import UserMixin
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import inspect, update
 from sqlalchemy.ext.hybrid import hybrid_property
-from app import db, bcrypt, cache
+from app import db
+from app.utils.audit import audit
+from app.utils.password_hashing import PasswordHashingBusy, hash_password, needs_rehash, verify_password
+from app.utils.single_flight import single_flight_memoize
 
 class User(db.Model, UserMixin):
     """Modelo de usuario para la aplicación."""
@@ -37,37 +41,33 @@ class User(db.Model, UserMixin):
     def set_password(self, password):
         """Establece la contraseña del usuario."""
         try:
-            # Usar bcrypt para mayor seguridad
-            with open('password_debug.log', 'a') as f:
-                f.write(f"Estableciendo contraseña para usuario: {self.email}\n")
-
-            hashed = bcrypt.generate_password_hash(password).decode('utf-8')
-
-            with open('password_debug.log', 'a') as f:
-                f.write("Contraseña hasheada correctamente\n")
-
-            self.password_hash = hashed
-
-            with open('password_debug.log', 'a') as f:
-                f.write("Contraseña establecida correctamente\n")
+            # El hash se calcula en el pool de procesos (ver app.utils.password_hashing)
+            self.password_hash = hash_password(password)
+            audit('user.password.set', user_id=self.id, email=self.email)
         except Exception as e:
-            with open('password_debug.log', 'a') as f:
-                f.write(f"Error al establecer contraseña: {str(e)}\n")
-                import traceback
-                f.write(traceback.format_exc())
+            audit('user.password.error', user_id=self.id, email=self.email, error=str(e))
             raise
 
     def check_password(self, password):
-        """Verifica la contraseña del usuario."""
+        """
+        Verifica la contraseña del usuario.
+
+        Si es correcta y su hash se generó con otro coste de bcrypt, el hash se
+        actualiza al coste configurado (BCRYPT_LOG_ROUNDS).
+
+        Raises:
+            PasswordHashingBusy: Si el pool de hash está saturado
+        """
         # Si la cuenta está bloqueada, no permitir el login
         if self.is_locked:
             return False
 
         # Verificar contraseña
-        is_valid = bcrypt.check_password_hash(self.password_hash, password)
+        is_valid = verify_password(self.password_hash, password)
 
         # Actualizar intentos de login
         if is_valid:
+            self._upgrade_password_hash(password)
             self.failed_login_attempts = 0
             self.last_login = datetime.now(timezone.utc)
         else:
@@ -78,6 +78,21 @@ class User(db.Model, UserMixin):
 
         return is_valid
 
+    def _upgrade_password_hash(self, password):
+        """Vuelve a generar el hash si el coste de bcrypt ha cambiado."""
+        if not needs_rehash(self.password_hash):
+            return
+        try:
+            hashed = hash_password(password)
+        except PasswordHashingBusy:
+            # No es imprescindible: se reintenta en el siguiente login
+            return
+        self.password_hash = hashed
+        if inspect(self).detached:
+            # Usuario servido desde la caché de get_by_email: el cambio se
+            # escribe directamente; el login lo confirma en su propia transacción
+            db.session.execute(update(User).where(User.id == self.id).values(password_hash=hashed))
+
     @hybrid_property
     def is_locked(self):
         """Indica si la cuenta está bloqueada."""
@@ -103,7 +118,7 @@ class User(db.Model, UserMixin):
         }
 
     @classmethod
-    @cache.memoize(timeout=60)  # Caché de 1 minuto
+    @single_flight_memoize(timeout=60)  # Caché de 1 minuto
     def get_by_email(cls, email):
         """Obtiene un usuario por su email (con caché)."""
         return cls.query.filter_by(email=email).first()
@@ -112,15 +127,6 @@ class User(db.Model, UserMixin):
     def create_user(cls, full_name, email, password, postal_code, is_admin=False, is_confirmed=False):
         """Crea un nuevo usuario."""
         try:
-            with open('user_create_debug.log', 'a') as f:
-                f.write(f"Creando usuario: {full_name}, {email}, {postal_code}\n")
-
-            # No usamos db.session directamente, sino que lo obtenemos del contexto actual
-            from flask import current_app
-
-            with open('user_create_debug.log', 'a') as f:
-                f.write("Obteniendo contexto de la aplicación\n")
-
             user = cls(
                 full_name=full_name,
                 email=email,
@@ -128,35 +134,13 @@ class User(db.Model, UserMixin):
                 is_admin=is_admin,
                 is_confirmed=is_confirmed
             )
-
-            with open('user_create_debug.log', 'a') as f:
-                f.write("Usuario instanciado correctamente\n")
-
             user.set_password(password)
 
-            with open('user_create_debug.log', 'a') as f:
-                f.write("Contraseña establecida correctamente\n")
-
-            # Usamos la sesión de la aplicación actual
-            from app import db as current_db
-
-            with open('user_create_debug.log', 'a') as f:
-                f.write("Obtenida instancia de db\n")
-
-            current_db.session.add(user)
-
-            with open('user_create_debug.log', 'a') as f:
-                f.write("Usuario añadido a la sesión\n")
-
-            current_db.session.commit()
-
-            with open('user_create_debug.log', 'a') as f:
-                f.write(f"Commit realizado correctamente. ID de usuario: {user.id}\n")
+            db.session.add(user)
+            db.session.commit()
 
+            audit('user.created', user_id=user.id, email=email, is_admin=is_admin)
             return user
         except Exception as e:
-            with open('user_create_debug.log', 'a') as f:
-                f.write(f"Error al crear usuario: {str(e)}\n")
-                import traceback
-                f.write(traceback.format_exc())
+            audit('user.create.error', email=email, error=str(e))
             raise
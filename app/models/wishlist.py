@@ -3,6 +3,7 @@ Modelo para la lista de deseos (wishlist) de los usuarios.
 """
 
 from datetime import datetime, timezone
+from sqlalchemy import Index
 from app import db
 
 class Wishlist(db.Model):
@@ -18,6 +19,12 @@ class Wishlist(db.Model):
     # Relaciones
     user = db.relationship('User', backref=db.backref('wishlist_items', lazy=True))
     curso = db.relationship('Curso', backref=db.backref('wishlist_items', lazy=True))
+
+    __table_args__ = (
+        # Un curso aparece como mucho una vez por usuario; el índice también
+        # sirve para las consultas por user_id
+        Index('uq_wishlist_user_curso', 'user_id', 'curso_id', unique=True),
+    )
     
     def __init__(self, user_id, curso_id):
         self.user_id = user_id
@@ -7,6 +7,10 @@ from flask_jwt_extended import jwt_required
 from app import db
 from app.models.curso import Curso
 from app.utils.auth_middleware import admin_required
+from app.utils.course_import import (
+    import_courses, detect_format, IMPORT_FORMATS, IMPORT_BATCH_SIZE
+)
+from app.utils.repricing import preview_repricing, apply_repricing, RepricingError
 import logging
 
 # Configurar logger
@@ -15,6 +19,9 @@ logger = logging.getLogger(__name__)
 # Crear blueprint
 admin_courses_bp = Blueprint('admin_courses', __name__)
 
+# Límite de filas por transacción en la importación masiva
+MAX_IMPORT_BATCH_SIZE = 5000
+
 @admin_courses_bp.route('/courses', methods=['GET'])
 @jwt_required()
 @admin_required
@@ -185,4 +192,126 @@ def create_course():
             "success": False,
             "message": f"Error al crear curso: {str(e)}",
             "data": None
-        }), 500
\ No newline at end of file
+        }), 500
+
+@admin_courses_bp.route('/courses/import', methods=['POST'])
+@jwt_required()
+@admin_required
+def import_courses_endpoint():
+    """
+    Endpoint para importar cursos de forma masiva desde CSV o JSONL.
+
+    Acepta un fichero en el campo 'file' (multipart) o el contenido en el
+    cuerpo de la solicitud. El formato se indica con ?format=csv|jsonl o se
+    deduce de la extensión del fichero o del Content-Type. Con ?dry_run=true
+    solo se validan las filas.
+    """
+    try:
+        upload = request.files.get('file')
+        if upload:
+            stream = upload.stream
+            fmt = request.args.get('format') or detect_format(upload.filename, upload.mimetype)
+        else:
+            stream = request.stream
+            fmt = request.args.get('format') or detect_format(content_type=request.content_type)
+
+        if fmt not in IMPORT_FORMATS:
+            return jsonify({
+                "success": False,
+                "message": f"Indique el formato del fichero con ?format= ({', '.join(IMPORT_FORMATS)})",
+                "data": None
+            }), 400
+
+        batch_size = request.args.get('batch_size', IMPORT_BATCH_SIZE, type=int)
+        if batch_size < 1:
+            batch_size = IMPORT_BATCH_SIZE
+        dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+
+        report = import_courses(stream, fmt, batch_size=min(batch_size, MAX_IMPORT_BATCH_SIZE), dry_run=dry_run)
+
+        return jsonify({
+            "success": report["failed"] == 0,
+            "message": f"{report['imported']} cursos importados, {report['failed']} filas con error",
+            "data": report
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error al importar cursos: {str(e)}", exc_info=True)
+        return jsonify({
+            "success": False,
+            "message": f"Error al importar cursos: {str(e)}",
+            "data": None
+        }), 500
+
+def _repricing_request():
+    data = request.get_json(silent=True) or {}
+    return data.get('filter'), data.get('rule')
+
+@admin_courses_bp.route('/courses/reprice/preview', methods=['POST'])
+@jwt_required()
+@admin_required
+def preview_reprice_endpoint():
+    """
+    Endpoint para previsualizar un cambio masivo de precios.
+
+    Cuerpo: {"filter": {...}, "rule": {"percent": -20, "round": "charm"}}.
+    Devuelve la distribución de precios antes y después y el impacto
+    estimado en ingresos sin modificar ningún curso.
+    """
+    try:
+        filter_data, rule_data = _repricing_request()
+        preview = preview_repricing(filter_data, rule_data)
+
+        return jsonify({
+            "success": True,
+            "message": f"{preview['changed']} de {preview['selected']} cursos cambiarían de precio",
+            "data": preview
+        }), 200
+    except RepricingError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e),
+            "data": None
+        }), 400
+    except Exception as e:
+        logger.error(f"Error al previsualizar precios: {str(e)}", exc_info=True)
+        return jsonify({
+            "success": False,
+            "message": f"Error al previsualizar precios: {str(e)}",
+            "data": None
+        }), 500
+
+@admin_courses_bp.route('/courses/reprice', methods=['POST'])
+@jwt_required()
+@admin_required
+def reprice_endpoint():
+    """
+    Endpoint para aplicar un cambio masivo de precios.
+
+    Acepta el mismo cuerpo que /courses/reprice/preview y actualiza todos los
+    cursos seleccionados en una sola transacción.
+    """
+    try:
+        filter_data, rule_data = _repricing_request()
+        result = apply_repricing(filter_data, rule_data)
+
+        return jsonify({
+            "success": True,
+            "message": f"Precio actualizado en {result['changed']} cursos",
+            "data": result
+        }), 200
+    except RepricingError as e:
+        db.session.rollback()
+        return jsonify({
+            "success": False,
+            "message": str(e),
+            "data": None
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error al actualizar precios: {str(e)}", exc_info=True)
+        return jsonify({
+            "success": False,
+            "message": f"Error al actualizar precios: {str(e)}",
+            "data": None
+        }), 500
@@ -4,6 +4,8 @@ from app.models.user import User
 from app.models.contacto import Contacto
 from app.models.session import Session  # Asegúrate de importar el modelo Session
 from app.models.order import Order, OrderItem # Asegúrate de tener este modelo
+from app.models.curso_stats import CursoStats
+from app.utils.cart_sweeper import abandoned_carts_report
 from app import db
 from app.utils.auth_middleware import admin_required
 
@@ -35,7 +37,8 @@ def admin_dashboard():
                 # Aquí puedes añadir más estadísticas según sea necesario
             },
             "recent_users": recent_users_data,
-            "recent_contacts": recent_contacts_data
+            "recent_contacts": recent_contacts_data,
+            "top_courses": CursoStats.get_top(limit=5)
         }
         
         return jsonify({
@@ -287,3 +290,62 @@ def get_all_orders():
             "message": f"Error al obtener pedidos: {str(e)}",
             "data": None
         }), 500
+
+@admin_bp.route('/top-courses', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_top_courses():
+    """
+    Endpoint para obtener los cursos más vendidos
+
+    Lee los contadores precalculados de curso_stats. Parámetros: limit
+    (máximo 50) y by ('sales' para unidades vendidas o 'revenue' para ingresos).
+    """
+    try:
+        limit = max(1, min(request.args.get('limit', 10, type=int) or 10, 50))
+        by = request.args.get('by', 'sales')
+        if by not in ('sales', 'revenue'):
+            return jsonify({
+                "success": False,
+                "message": "El parámetro by debe ser 'sales' o 'revenue'",
+                "data": None
+            }), 400
+
+        return jsonify({
+            "success": True,
+            "message": "Cursos más vendidos obtenidos correctamente",
+            "data": CursoStats.get_top(limit=limit, by=by)
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Error al obtener los cursos más vendidos: {str(e)}",
+            "data": None
+        }), 500
+
+@admin_bp.route('/abandoned-carts', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_abandoned_carts():
+    """
+    Endpoint para obtener el informe de carritos abandonados
+
+    Resume los elementos archivados por scripts/sweep_abandoned_carts.py.
+    Parámetros: days (periodo, máximo 365) y limit (cursos más abandonados,
+    máximo 50).
+    """
+    try:
+        days = max(1, min(request.args.get('days', 30, type=int) or 30, 365))
+        limit = max(1, min(request.args.get('limit', 10, type=int) or 10, 50))
+
+        return jsonify({
+            "success": True,
+            "message": "Informe de carritos abandonados obtenido correctamente",
+            "data": abandoned_carts_report(days=days, limit=limit)
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Error al obtener el informe de carritos abandonados: {str(e)}",
+            "data": None
+        }), 500
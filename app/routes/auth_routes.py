@@ -5,7 +5,7 @@ Este módulo contiene las rutas para registro, login, perfil y otras funcionalid
 
 from flask import Blueprint, request, current_app, jsonify, g
 from app.models.user import User
-from app import db, mail, cache, limiter
+from app import db, mail, limiter
 from flask_mail import Message
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
 from flask_jwt_extended import (
@@ -16,6 +16,8 @@ import logging
 from datetime import datetime, timezone
 from app.utils import validate_email, validate_required_fields, standardize_response, log_api_call
 from app.models.session import Session
+from app.utils.audit import audit
+from app.utils.password_hashing import PasswordHashingBusy
 import os
 import jwt
 
@@ -34,16 +36,11 @@ auth = Blueprint('auth', __name__)
 def register():
     """Registra un nuevo usuario."""
     try:
-        # Registrar en un archivo para depuración
-        with open('register_debug.log', 'a') as f:
-            f.write("Recibida solicitud de registro\n")
-
         logger.info("Recibida solicitud de registro")
         data = request.get_json()
 
-        # Registrar datos recibidos
-        with open('register_debug.log', 'a') as f:
-            f.write(f"Datos recibidos: {data}\n")
+        # Solo se registran los nombres de los campos, nunca el cuerpo de la petición
+        audit('auth.register.received', fields=sorted(data) if isinstance(data, dict) else None)
 
         # Validar campos requeridos
         required_fields = ['full_name', 'postal_code', 'email', 'password']
@@ -51,8 +48,7 @@ def register():
 
         if not valid:
             logger.warning(f"Faltan campos obligatorios: {missing_fields}")
-            with open('register_debug.log', 'a') as f:
-                f.write(f"Faltan campos obligatorios: {missing_fields}\n")
+            audit('auth.register.rejected', reason='missing_fields', missing_fields=missing_fields)
             return standardize_response(
                 False,
                 f"Faltan campos obligatorios: {', '.join(missing_fields)}",
@@ -67,15 +63,13 @@ def register():
         # Validar formato de email
         if not validate_email(email):
             logger.warning(f"Formato de email inválido: {email}")
-            with open('register_debug.log', 'a') as f:
-                f.write(f"Formato de email inválido: {email}\n")
+            audit('auth.register.rejected', reason='invalid_email', email=email)
             return standardize_response(False, "Formato de email inválido", status_code=400)
 
         # Validar longitud de contraseña
         if len(password) < 8:
             logger.warning("Contraseña demasiado corta")
-            with open('register_debug.log', 'a') as f:
-                f.write("Contraseña demasiado corta\n")
+            audit('auth.register.rejected', reason='short_password', email=email)
             return standardize_response(
                 False,
                 "La contraseña debe tener al menos 8 caracteres",
@@ -83,83 +77,54 @@ def register():
             )
 
         # Verificar si el email ya está registrado
-        with open('register_debug.log', 'a') as f:
-            f.write(f"Verificando si el email ya está registrado: {email}\n")
-
         existing_user = User.get_by_email(email)
         if existing_user:
             logger.warning(f"Email ya registrado: {email}")
-            with open('register_debug.log', 'a') as f:
-                f.write(f"Email ya registrado: {email}\n")
+            audit('auth.register.rejected', reason='email_exists', email=email)
             return standardize_response(False, "Email ya registrado", status_code=400)
 
-        # Crear nuevo usuario usando el método de clase
-        with open('register_debug.log', 'a') as f:
-            f.write(f"Creando nuevo usuario: {full_name}, {email}\n")
-
-        try:
-            # Crear usuario directamente sin usar el método de clase
-            with open('register_debug.log', 'a') as f:
-                f.write("Creando usuario directamente en la ruta\n")
-
-            # Crear instancia de usuario
-            user = User(
-                full_name=full_name,
-                email=email,
-                postal_code=postal_code,
-                is_confirmed=True  # Confirmación automática para simplificar
-            )
-
-            with open('register_debug.log', 'a') as f:
-                f.write("Usuario instanciado correctamente\n")
-
-            # Establecer contraseña
-            user.set_password(password)
-
-            with open('register_debug.log', 'a') as f:
-                f.write("Contraseña establecida correctamente\n")
-
-            # Añadir a la sesión y hacer commit
-            db.session.add(user)
-
-            with open('register_debug.log', 'a') as f:
-                f.write("Usuario añadido a la sesión\n")
+        # Crear instancia de usuario
+        user = User(
+            full_name=full_name,
+            email=email,
+            postal_code=postal_code,
+            is_confirmed=True  # Confirmación automática para simplificar
+        )
 
-            db.session.commit()
+        # Establecer contraseña
+        user.set_password(password)
 
-            with open('register_debug.log', 'a') as f:
-                f.write(f"Usuario creado con ID: {user.id}\n")
+        # Añadir a la sesión y hacer commit
+        db.session.add(user)
+        db.session.commit()
 
-            logger.info(f"Usuario creado con ID: {user.id}")
+        logger.info(f"Usuario creado con ID: {user.id}")
+        audit('auth.register.success', user_id=user.id, email=email)
 
-            # Generar tokens
-            access_token = create_access_token(identity=user.id)
-            refresh_token = create_refresh_token(identity=user.id)
+        # Generar tokens
+        access_token = create_access_token(identity=user.id)
+        refresh_token = create_refresh_token(identity=user.id)
 
-            # Invalidar caché
-            cache.delete_memoized(User.get_by_email, User, email)
+        # Invalidar caché
+        User.get_by_email.invalidate(User, email)
 
-            return standardize_response(
-                True,
-                "Registro exitoso. Tu cuenta ha sido activada automáticamente.",
-                {
-                    "access_token": access_token,
-                    "refresh_token": refresh_token,
-                    "user": user.to_dict()
-                },
-                status_code=201
-            )
-        except Exception as e:
-            with open('register_debug.log', 'a') as f:
-                f.write(f"Error al crear usuario: {str(e)}\n")
-            raise
+        return standardize_response(
+            True,
+            "Registro exitoso. Tu cuenta ha sido activada automáticamente.",
+            {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "user": user.to_dict()
+            },
+            status_code=201
+        )
+    except PasswordHashingBusy:
+        # Respuesta 503 con Retry-After del manejador de la aplicación
+        raise
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error en el registro: {str(e)}", exc_info=True)
-        with open('register_debug.log', 'a') as f:
-            f.write(f"Error en el registro: {str(e)}\n")
-            import traceback
-            f.write(traceback.format_exc())
+        audit('auth.register.error', error=str(e))
         return standardize_response(False, "Error en el registro", status_code=500)
 
 @auth.route('/confirm-email/<token>', methods=['GET'])
@@ -197,7 +162,7 @@ def confirm_email(token):
         logger.info(f"Cuenta confirmada correctamente: {email}")
 
         # Invalidar caché
-        cache.delete_memoized(User.get_by_email, User, email)
+        User.get_by_email.invalidate(User, email)
 
         return standardize_response(
             True,
@@ -267,13 +232,27 @@ def login():
                 status_code=401
             )
 
-        # Verificar contraseña
-        if not user.check_password(password):
+        # Verificar contraseña (en el pool de hash; si está saturado, se
+        # rechaza el intento con un 503 sin contarlo como fallido)
+        previous_hash = user.password_hash
+        is_valid = user.check_password(password)
+
+        if not is_valid:
             # El método check_password ya incrementa los intentos fallidos
             db.session.commit()
             logger.warning(f"Contraseña incorrecta para: {email}")
             return standardize_response(False, "Credenciales inválidas", status_code=401)
 
+        if user.password_hash != previous_hash:
+            # Hash actualizado al coste configurado: se confirma en su propia
+            # transacción para que un fallo al registrar la sesión no lo pierda
+            try:
+                db.session.commit()
+                User.get_by_email.invalidate(User, email)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error al actualizar el hash de la contraseña: {str(e)}")
+
         # Verificar si la cuenta está confirmada
         if not user.is_confirmed:
             logger.warning(f"Cuenta no confirmada: {email}")
@@ -321,6 +300,9 @@ def login():
                 "user": user.to_dict()
             }
         )
+    except PasswordHashingBusy:
+        # Respuesta 503 con Retry-After del manejador de la aplicación
+        raise
     except Exception as e:
         logger.error(f"Error en el login: {str(e)}", exc_info=True)
         return standardize_response(False, "Error en el inicio de sesión", status_code=500)
@@ -1,30 +1,514 @@
-from flask import Blueprint, jsonify, request
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, jsonify, request, current_app
 from app.models.curso import Curso
-from app import db
+from app.models.curso_facet import CursoFacet
+from app.models.curso_related import CursoRelated
+from app.models.curso_tombstone import CursoTombstone
+from app.models.curso_stats import CursoStats
+from app import db, cache
+from app.utils.catalog_cache import CATALOG_FIELDS, get_catalog_snapshot, etag_matches
+from app.utils.pagination import (
+    encode_cursor, decode_cursor, encode_positions, decode_positions, keyset_order_by, keyset_condition
+)
+from app.utils.search import search_cursos
+from app.utils.autocomplete import autocomplete
+from app.utils.similar_index import find_similar
+from app.utils.cache_versions import get_version
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 cursos_bp = Blueprint('cursos', __name__)
 
+# Parámetros que activan el listado paginado y filtrado
+LISTING_PARAMS = {'limit', 'cursor', 'sort', 'activo', 'nivel', 'destacado', 'precio_min', 'precio_max'}
+
+# Criterios de ordenación admitidos (prefijo '-' para orden descendente)
+SORT_COLUMNS = {
+    'precio': Curso.precio,
+    'price': Curso.precio,
+    'titulo': Curso.titulo,
+    'created_at': Curso.created_at,
+    'bestsellers': CursoStats.sales_count,
+}
+
+# Ordenaciones descendentes por defecto (también sin el prefijo '-')
+DESCENDING_SORTS = {'bestsellers'}
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_SEARCH_RESULTS = 50
+MAX_BATCH_IDS = 200
+MAX_SUGGESTIONS = 10
+MAX_RELATED_RESULTS = 20  # Igual a recommendations.TOP_N
+FACETS_CACHE_KEY = 'catalog:facets:{version}'
+
+# Sincronización incremental: solo se devuelven cambios con al menos este
+# retraso, para no saltarse los de transacciones que aún no han hecho commit
+SYNC_LAG = timedelta(seconds=2)
+DEFAULT_SYNC_PAGE_SIZE = 100
+MAX_SYNC_PAGE_SIZE = 500
+
+
+def _parse_bool(value):
+    """Convierte un parámetro de consulta en booleano."""
+    normalized = value.strip().lower()
+    if normalized in ('1', 'true', 'si', 'sí', 'yes'):
+        return True
+    if normalized in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f"Valor booleano inválido: {value}")
+
+
+def _parse_float(name, value):
+    """Convierte un parámetro de consulta en número decimal."""
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"El parámetro {name} debe ser numérico")
+
+
+def _listar_mas_vendidos(query, cursor, limit):
+    """
+    Obtiene una página del listado ordenado por número de ventas.
+
+    La consulta parte de curso_stats y recorre idx_curso_stats_sales en orden
+    descendente (sales_count, curso_id); los cursos de la página se cargan
+    después por ID. Los cursos sin ventas no tienen fila en curso_stats y se
+    devuelven al final, ordenados por ID descendente. En el cursor, un valor
+    None indica que la página anterior terminó en esa cola.
+
+    Args:
+        query: Consulta de Curso con los filtros ya aplicados
+        cursor (tuple): (sales_count, id) de la última fila o None
+        limit (int): Tamaño de la página
+
+    Returns:
+        list: Pares (curso, sales_count) con hasta limit + 1 elementos
+    """
+    value, last_id = cursor or (None, None)
+    rows = []
+
+    if cursor is None or value is not None:
+        # curso_stats es la única tabla del FROM para que el orden salga del
+        # índice; los filtros del listado se comprueban por clave primaria
+        vendidos = db.session.query(CursoStats.curso_id, CursoStats.sales_count).filter(
+            query.filter(Curso.id == CursoStats.curso_id).exists()
+        )
+        if cursor is not None:
+            vendidos = vendidos.filter(db.or_(
+                CursoStats.sales_count < value,
+                db.and_(CursoStats.sales_count == value, CursoStats.curso_id < last_id)
+            ))
+        ventas = (
+            vendidos.order_by(CursoStats.sales_count.desc(), CursoStats.curso_id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+        if ventas:
+            cursos = {curso.id: curso for curso in query.filter(Curso.id.in_([curso_id for curso_id, _ in ventas]))}
+            rows = [
+                (cursos[curso_id], sales_count)
+                for curso_id, sales_count in ventas if curso_id in cursos
+            ]
+
+    if len(rows) <= limit:
+        sin_ventas = query.filter(
+            ~db.exists().where(CursoStats.curso_id == Curso.id)
+        )
+        if cursor is not None and value is None:
+            sin_ventas = sin_ventas.filter(Curso.id < last_id)
+        rows += [
+            (curso, None)
+            for curso in sin_ventas.order_by(Curso.id.desc()).limit(limit + 1 - len(rows)).all()
+        ]
+
+    return rows
+
+def _listar_cursos_paginados(args):
+    """
+    Devuelve una página de cursos filtrada y ordenada con paginación por cursor.
+
+    Args:
+        args: Parámetros de la consulta (request.args)
+
+    Returns:
+        dict: Cursos de la página e información de paginación
+
+    Raises:
+        ValueError: Si algún parámetro o el cursor son inválidos
+    """
+    sort = args.get('sort', 'titulo')
+    sort_key = sort.lstrip('-')
+    descending = sort.startswith('-') or sort_key in DESCENDING_SORTS
+    if sort_key not in SORT_COLUMNS:
+        raise ValueError(f"Ordenación no soportada: {sort}")
+    sort_column = SORT_COLUMNS[sort_key]
+
+    limit = args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    if limit is None or limit < 1:
+        raise ValueError("El parámetro limit debe ser un entero positivo")
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    fields = Curso.parse_fields(args.get('fields'))
+
+    # Por defecto solo se listan los cursos activos
+    activo = _parse_bool(args['activo']) if 'activo' in args else True
+    query = Curso.query.filter(Curso.activo == activo)
+
+    if args.get('nivel'):
+        query = query.filter(Curso.nivel == args['nivel'])
+    if 'destacado' in args:
+        query = query.filter(Curso.destacado == _parse_bool(args['destacado']))
+    if 'precio_min' in args:
+        query = query.filter(Curso.precio >= _parse_float('precio_min', args['precio_min']))
+    if 'precio_max' in args:
+        query = query.filter(Curso.precio <= _parse_float('precio_max', args['precio_max']))
+
+    if fields:
+        query = query.options(Curso.load_only_fields(fields))
+
+    cursor = decode_cursor(args['cursor'], sort) if args.get('cursor') else None
+
+    if sort_column.class_ is CursoStats:
+        rows = _listar_mas_vendidos(query, cursor, limit)
+    else:
+        if cursor:
+            value, last_id = cursor
+            query = query.filter(keyset_condition(sort_column, Curso.id, value, last_id, descending))
+
+        # La columna de ordenación se obtiene siempre para poder generar el cursor
+        rows = (
+            query.add_columns(sort_column)
+            .order_by(*keyset_order_by(sort_column, Curso.id, descending))
+            .limit(limit + 1)
+            .all()
+        )
+
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_next:
+        last, value = rows[-1]
+        next_cursor = encode_cursor(sort, value, last.id)
+
+    return {
+        "cursos": [curso.to_dict(fields) for curso, _ in rows],
+        "pagination": {
+            "limit": limit,
+            "sort": sort,
+            "has_next": has_next,
+            "next_cursor": next_cursor
+        }
+    }
+
+def _listar_cambios(args):
+    """
+    Devuelve los cursos modificados y eliminados posteriores a un cursor.
+
+    El cursor guarda una posición (updated_at, id) para los cursos y otra
+    (deleted_at, curso_id) para los tombstones. Sin cursor se devuelve todo el
+    catálogo y solo las eliminaciones posteriores a la solicitud.
+
+    Args:
+        args: Parámetros de la consulta (request.args)
+
+    Returns:
+        dict: Cursos modificados, IDs eliminados y el cursor siguiente
+
+    Raises:
+        ValueError: Si algún parámetro o el cursor son inválidos
+    """
+    limit = args.get('limit', DEFAULT_SYNC_PAGE_SIZE, type=int)
+    if limit is None or limit < 1:
+        raise ValueError("El parámetro limit debe ser un entero positivo")
+    limit = min(limit, MAX_SYNC_PAGE_SIZE)
+
+    fields = Curso.parse_fields(args.get('fields')) or CATALOG_FIELDS
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - SYNC_LAG
+
+    if args.get('since'):
+        positions = decode_positions(args['since'], 'changes', ('updated', 'deleted'))
+    else:
+        # updated_at NULL se ordena primero, por lo que (None, 0) incluye todo
+        positions = {'updated': (None, 0), 'deleted': (cutoff, 0)}
+
+    updated_at, last_id = positions['updated']
+    cursos = (
+        Curso.query
+        .options(Curso.load_only_fields(fields, Curso.updated_at))
+        .filter(db.or_(Curso.updated_at.is_(None), Curso.updated_at <= cutoff))
+        .filter(keyset_condition(Curso.updated_at, Curso.id, updated_at, last_id))
+        .order_by(*keyset_order_by(Curso.updated_at, Curso.id))
+        .limit(limit + 1)
+        .all()
+    )
+
+    deleted_at, last_deleted_id = positions['deleted']
+    tombstones = (
+        CursoTombstone.query
+        .filter(CursoTombstone.deleted_at <= cutoff)
+        .filter(keyset_condition(CursoTombstone.deleted_at, CursoTombstone.curso_id, deleted_at, last_deleted_id))
+        .order_by(*keyset_order_by(CursoTombstone.deleted_at, CursoTombstone.curso_id))
+        .limit(limit + 1)
+        .all()
+    )
+
+    has_more = len(cursos) > limit or len(tombstones) > limit
+    cursos, tombstones = cursos[:limit], tombstones[:limit]
+    if cursos:
+        positions['updated'] = (cursos[-1].updated_at, cursos[-1].id)
+    if tombstones:
+        positions['deleted'] = (tombstones[-1].deleted_at, tombstones[-1].curso_id)
+
+    return {
+        "updated": [curso.to_dict(fields) for curso in cursos],
+        "deleted": [tombstone.curso_id for tombstone in tombstones],
+        "has_more": has_more,
+        "next_cursor": encode_positions('changes', **positions)
+    }
+
 @cursos_bp.route('/', methods=['GET'])
 def get_cursos():
     """
     Obtiene todos los cursos disponibles
+
+    Sin parámetros, la respuesta se sirve desde una instantánea versionada del
+    catálogo y admite peticiones condicionales (If-None-Match -> 304 Not Modified).
+
+    Con alguno de los parámetros limit, cursor, sort, activo, nivel, destacado,
+    precio_min o precio_max devuelve una página filtrada con paginación por cursor.
+
+    En ambos casos, ?fields=id,titulo,precio limita los campos de cada curso.
     """
+    if LISTING_PARAMS & set(request.args.keys()):
+        try:
+            return jsonify({
+                "success": True,
+                "message": "Cursos obtenidos correctamente",
+                "data": _listar_cursos_paginados(request.args)
+            }), 200
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "message": str(e),
+                "data": None
+            }), 400
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "message": f"Error al obtener cursos: {str(e)}",
+                "data": None
+            }), 500
+
+    try:
+        fields = Curso.parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e),
+            "data": None
+        }), 400
+
+    try:
+        body, etag = get_catalog_snapshot(fields)
+
+        if etag_matches(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(body, status=200, mimetype='application/json')
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Error al obtener cursos: {str(e)}",
+            "data": None
+        }), 500
+
+@cursos_bp.route('/search', methods=['GET'])
+def buscar_cursos():
+    """
+    Busca cursos por texto en título, descripción, instructor y nivel
+
+    Parámetros: q (texto, con coincidencia por prefijo), limit y activo.
+    Los resultados se ordenan por relevancia (BM25) e incluyen el título y un
+    fragmento de la descripción con las coincidencias marcadas con <mark>.
+    """
+    query_text = request.args.get('q', '').strip()
+    if not query_text:
+        return jsonify({
+            "success": False,
+            "message": "El parámetro q es requerido",
+            "data": None
+        }), 400
+
+    try:
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        if limit is None or limit < 1:
+            raise ValueError("El parámetro limit debe ser un entero positivo")
+        activo = _parse_bool(request.args['activo']) if 'activo' in request.args else True
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e),
+            "data": None
+        }), 400
+
+    try:
+        resultados = search_cursos(query_text, limit=min(limit, MAX_SEARCH_RESULTS), activo=activo)
+        return jsonify({
+            "success": True,
+            "message": "Búsqueda realizada correctamente",
+            "data": resultados
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Error al buscar cursos: {str(e)}",
+            "data": None
+        }), 500
+
+@cursos_bp.route('/autocomplete', methods=['GET'])
+def autocompletar_cursos():
+    """
+    Sugiere títulos de cursos e instructores para el texto escrito
+
+    Parámetros: q (prefijo de cualquier palabra del título o del nombre del
+    instructor) y limit (máximo MAX_SUGGESTIONS). Las sugerencias se sirven
+    desde un índice en memoria y se ordenan por popularidad.
+    """
+    query_text = request.args.get('q', '')
+    limit = request.args.get('limit', 8, type=int) or 8
+    limit = max(1, min(limit, MAX_SUGGESTIONS))
+
     try:
-        cursos = Curso.query.all()
-        resultado = []
-        for curso in cursos:
-            resultado.append({
-                'id': curso.id,
-                'titulo': curso.titulo,
-                'descripcion': curso.descripcion,
-                'duracion': curso.duracion,
-                'precio': curso.precio
-            })
+        return jsonify({
+            "success": True,
+            "message": "Sugerencias obtenidas correctamente",
+            "data": autocomplete(query_text, limit=limit)
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Error al obtener sugerencias: {str(e)}",
+            "data": None
+        }), 500
+
+@cursos_bp.route('/changes', methods=['GET'])
+def get_cambios_cursos():
+    """
+    Sincronización incremental del catálogo
+
+    Devuelve los cursos creados o modificados y los IDs de los eliminados
+    desde el cursor ?since= (el next_cursor de la respuesta anterior). Sin
+    cursor se devuelve el catálogo completo paginado. Mientras has_more sea
+    true, el cliente debe volver a llamar con next_cursor. Admite ?limit= y
+    ?fields=.
+    """
+    try:
+        return jsonify({
+            "success": True,
+            "message": "Cambios obtenidos correctamente",
+            "data": _listar_cambios(request.args)
+        }), 200
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e),
+            "data": None
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Error al obtener cambios: {str(e)}",
+            "data": None
+        }), 500
+
+@cursos_bp.route('/facets', methods=['GET'])
+def get_facetas():
+    """
+    Obtiene los recuentos de cursos activos por nivel, instructor, franja de precio y destacado
+
+    Los recuentos están precalculados (ver CursoFacet), por lo que el coste
+    depende del número de valores de cada faceta y no del tamaño del catálogo.
+    """
+    try:
+        key = FACETS_CACHE_KEY.format(version=get_version('curso'))
+        facetas = cache.get(key)
+        if facetas is None:
+            facetas = CursoFacet.get_facets()
+            cache.set(key, facetas)
+
+        return jsonify({
+            "success": True,
+            "message": "Facetas obtenidas correctamente",
+            "data": facetas
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Error al obtener facetas: {str(e)}",
+            "data": None
+        }), 500
+
+@cursos_bp.route('/batch', methods=['GET'])
+def get_cursos_batch():
+    """
+    Obtiene varios cursos por sus IDs en una sola solicitud
+
+    Parámetro ids: lista de IDs separados por comas (máximo MAX_BATCH_IDS).
+    Los cursos se devuelven en el orden solicitado; los IDs inexistentes se
+    indican en not_found. Admite ?fields= para limitar los campos.
+    """
+    raw_ids = request.args.get('ids', '')
+    try:
+        curso_ids = list(dict.fromkeys(int(value) for value in raw_ids.split(',') if value.strip()))
+    except ValueError:
+        return jsonify({
+            "success": False,
+            "message": "El parámetro ids debe ser una lista de enteros separados por comas",
+            "data": None
+        }), 400
+
+    try:
+        fields = Curso.parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e),
+            "data": None
+        }), 400
+
+    if not curso_ids:
+        return jsonify({
+            "success": False,
+            "message": "El parámetro ids es requerido",
+            "data": None
+        }), 400
+
+    if len(curso_ids) > MAX_BATCH_IDS:
+        return jsonify({
+            "success": False,
+            "message": f"Se pueden solicitar como máximo {MAX_BATCH_IDS} cursos",
+            "data": None
+        }), 400
+
+    try:
+        cursos = Curso.get_dicts_by_ids(curso_ids)
+        if fields:
+            cursos = {
+                curso_id: {field: curso_dict[field] for field in fields}
+                for curso_id, curso_dict in cursos.items()
+            }
         return jsonify({
             "success": True,
             "message": "Cursos obtenidos correctamente",
-            "data": resultado
+            "data": {
+                "cursos": [cursos[curso_id] for curso_id in curso_ids if curso_id in cursos],
+                "not_found": [curso_id for curso_id in curso_ids if curso_id not in cursos]
+            }
         }), 200
     except Exception as e:
         return jsonify({
@@ -36,10 +520,19 @@ def get_cursos():
 @cursos_bp.route('/<int:curso_id>', methods=['GET'])
 def get_curso(curso_id):
     """
-    Obtiene un curso específico por su ID
+    Obtiene un curso específico por su ID (admite ?fields= para limitar los campos)
     """
     try:
-        curso = Curso.query.get(curso_id)
+        fields = Curso.parse_fields(request.args.get('fields')) or CATALOG_FIELDS
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e),
+            "data": None
+        }), 400
+
+    try:
+        curso = Curso.query.options(Curso.load_only_fields(fields)).get(curso_id)
         if not curso:
             return jsonify({
                 "success": False,
@@ -50,13 +543,7 @@ def get_curso(curso_id):
         return jsonify({
             "success": True,
             "message": "Curso obtenido correctamente",
-            "data": {
-                'id': curso.id,
-                'titulo': curso.titulo,
-                'descripcion': curso.descripcion,
-                'duracion': curso.duracion,
-                'precio': curso.precio
-            }
+            "data": curso.to_dict(fields)
         }), 200
     except Exception as e:
         return jsonify({
@@ -65,6 +552,84 @@ def get_curso(curso_id):
             "data": None
         }), 500
 
+@cursos_bp.route('/<int:curso_id>/related', methods=['GET'])
+def get_cursos_relacionados(curso_id):
+    """
+    Obtiene los cursos que también compraron los estudiantes de un curso
+
+    Los vecinos se precalculan con scripts/compute_related_courses.py.
+    Admite ?limit= (máximo MAX_RELATED_RESULTS) y ?fields=.
+    """
+    try:
+        fields = Curso.parse_fields(request.args.get('fields')) or CATALOG_FIELDS
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e),
+            "data": None
+        }), 400
+
+    limit = request.args.get('limit', 10, type=int)
+    limit = max(1, min(limit, MAX_RELATED_RESULTS))
+
+    try:
+        return jsonify({
+            "success": True,
+            "message": "Cursos relacionados obtenidos correctamente",
+            "data": CursoRelated.get_related(curso_id, limit=limit, fields=fields)
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Error al obtener cursos relacionados: {str(e)}",
+            "data": None
+        }), 500
+
+@cursos_bp.route('/<int:curso_id>/similar', methods=['GET'])
+def get_cursos_similares(curso_id):
+    """
+    Obtiene los cursos activos con contenido más parecido (título y descripción)
+
+    A diferencia de /related, no depende del historial de compras, por lo que
+    también sirve para cursos nuevos. Admite ?limit= y ?fields=.
+    """
+    try:
+        fields = Curso.parse_fields(request.args.get('fields')) or CATALOG_FIELDS
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e),
+            "data": None
+        }), 400
+
+    limit = request.args.get('limit', 10, type=int)
+    limit = max(1, min(limit, MAX_RELATED_RESULTS))
+
+    try:
+        # Se piden candidatos de más para compensar los cursos inactivos
+        scores = dict(find_similar(curso_id, k=limit * 2))
+        cursos = Curso.get_dicts_by_ids(scores)
+
+        similares = []
+        for similar_id, score in scores.items():
+            curso = cursos.get(similar_id)
+            if curso and curso.get('activo'):
+                data = {field: curso[field] for field in fields}
+                data['score'] = round(score, 4)
+                similares.append(data)
+
+        return jsonify({
+            "success": True,
+            "message": "Cursos similares obtenidos correctamente",
+            "data": similares[:limit]
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Error al obtener cursos similares: {str(e)}",
+            "data": None
+        }), 500
+
 @cursos_bp.route('/', methods=['POST'])
 @jwt_required()
 def crear_curso():
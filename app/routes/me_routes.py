@@ -0,0 +1,52 @@
+"""
+Rutas con el estado agregado del usuario autenticado.
+"""
+
+from flask import Blueprint
+from flask_jwt_extended import jwt_required, current_user
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.utils import standardize_response, log_api_call
+from app.utils.user_state import get_user_state
+import logging
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Crear blueprint
+me_bp = Blueprint('me', __name__)
+
+# Endpoint con todo lo que necesita el frontend tras iniciar sesión
+@me_bp.route('/bootstrap', methods=['GET'])
+@jwt_required()
+@log_api_call
+def bootstrap():
+    """
+    Obtiene el perfil, el carrito, la lista de deseos, los cursos comprados y
+    el número de sesiones activas del usuario autenticado.
+
+    Sustituye a las llamadas separadas a /api/auth/profile, /api/user/cart,
+    /api/user/wishlist, /api/payment/history y /api/sessions/. El perfil es
+    el usuario ya cargado al validar el token; el resto sale de la caché o
+    de una única consulta.
+    """
+    try:
+        if current_user is None:
+            return standardize_response(False, "Usuario no encontrado", status_code=404)
+
+        state = get_user_state(current_user.id)
+
+        return standardize_response(
+            True,
+            "Estado del usuario obtenido correctamente",
+            dict(state, profile=current_user.to_dict())
+        )
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Error al obtener el estado del usuario: {str(e)}", exc_info=True)
+        return standardize_response(
+            False,
+            "Error al obtener el estado del usuario",
+            status_code=500
+        )
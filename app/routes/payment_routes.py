@@ -6,6 +6,9 @@ from app import db
 from app.models.user import User
 from app.models.curso import Curso
 from app.models.order import Order, OrderItem
+from app.utils.checkout import (
+    CheckoutError, as_dict, cart_checkout_courses, cart_metadata, items_from_session, line_item, record_paid_order
+)
 from datetime import datetime
 
 payment_bp = Blueprint('payment', __name__)
@@ -17,7 +20,7 @@ stripe.api_key = os.environ.get('STRIPE_SECRET_KEY', 'sk_test_51NXwqnLZIKXBHZxxx
 @jwt_required()
 def create_checkout_session():
     """
-    Crea una sesión de checkout de Stripe para un curso.
+    Crea una sesión de checkout de Stripe para un curso o para todo el carrito.
 
     Requiere autenticación JWT.
 
@@ -26,6 +29,11 @@ def create_checkout_session():
         "courseId": "curso-de-maquillaje-profesional"
     }
 
+    o, para pagar todos los cursos del carrito en una sola sesión:
+    {
+        "fromCart": true
+    }
+
     Returns:
         JSON con el ID de la sesión de Stripe
     """
@@ -42,48 +50,57 @@ def create_checkout_session():
             }), 404
 
         # Obtener datos del cuerpo de la solicitud
-        data = request.get_json()
+        data = request.get_json(silent=True)
 
-        if not data or 'courseId' not in data:
-            return jsonify({
-                "success": False,
-                "message": "Datos incompletos. Se requiere courseId",
-                "data": None
-            }), 400
+        if data and data.get('fromCart'):
+            # Una sola sesión con una línea por curso del carrito
+            try:
+                courses = cart_checkout_courses(user.id)
+            except CheckoutError as e:
+                return jsonify({
+                    "success": False,
+                    "message": str(e),
+                    "data": None
+                }), 400
+            metadata = cart_metadata(user.id, courses)
+        else:
+            if not data or 'courseId' not in data:
+                return jsonify({
+                    "success": False,
+                    "message": "Datos incompletos. Se requiere courseId o fromCart",
+                    "data": None
+                }), 400
 
-        course_id = data['courseId']
+            course_id = data['courseId']
 
-        # Buscar el curso en la base de datos
-        course = Curso.query.filter_by(id=course_id).first()
+            # Buscar el curso en la base de datos
+            course = Curso.query.filter_by(id=course_id).first()
 
-        if not course:
-            return jsonify({
-                "success": False,
-                "message": f"Curso con ID {course_id} no encontrado",
-                "data": None
-            }), 404
+            if not course:
+                return jsonify({
+                    "success": False,
+                    "message": f"Curso con ID {course_id} no encontrado",
+                    "data": None
+                }), 404
+
+            if course.precio is None:
+                return jsonify({
+                    "success": False,
+                    "message": f"El curso con ID {course_id} no tiene precio",
+                    "data": None
+                }), 400
+
+            courses = [course]
+            metadata = {
+                'user_id': user_id,
+                'course_id': course_id,
+            }
 
         # Crear la sesión de checkout de Stripe
         checkout_session = stripe.checkout.Session.create(
             payment_method_types=['card'],
-            line_items=[
-                {
-                    'price_data': {
-                        'currency': 'eur',
-                        'product_data': {
-                            'name': course.title,
-                            'description': course.description,
-                            'images': [course.image_url] if course.image_url else [],
-                        },
-                        'unit_amount': int(course.price * 100),  # Convertir a centavos
-                    },
-                    'quantity': 1,
-                },
-            ],
-            metadata={
-                'user_id': user_id,
-                'course_id': course_id,
-            },
+            line_items=[line_item(course) for course in courses],
+            metadata=metadata,
             mode='payment',
             success_url=f"{request.host_url.rstrip('/')}/payment/success?session_id={{CHECKOUT_SESSION_ID}}",
             cancel_url=f"{request.host_url.rstrip('/')}/payment/cancel",
@@ -93,7 +110,8 @@ def create_checkout_session():
             "success": True,
             "message": "Sesión de checkout creada correctamente",
             "data": {
-                "sessionId": checkout_session.id
+                "sessionId": checkout_session.id,
+                "courseIds": [course.id for course in courses]
             }
         }), 200
     except stripe.error.StripeError as e:
@@ -135,37 +153,26 @@ def webhook():
 
     # Manejar el evento
     if event['type'] == 'checkout.session.completed':
-        session = event['data']['object']
+        session = as_dict(event['data']['object'])
 
-        # Extraer metadatos
+        # Extraer metadatos (un curso o todos los del carrito)
         user_id = session.get('metadata', {}).get('user_id')
-        course_id = session.get('metadata', {}).get('course_id')
 
-        if user_id and course_id:
+        try:
+            items = items_from_session(session)
+        except ValueError:
+            return jsonify({"success": False, "message": "Metadatos de la sesión no válidos"}), 400
+
+        if user_id and items:
             try:
-                # Crear un nuevo pedido
-                order = Order(
-                    user_id=user_id,
-                    total_amount=session.get('amount_total', 0) / 100,  # Convertir de centavos a euros
-                    payment_status='completed',
-                    payment_id=session.get('id'),
-                    payment_method='stripe',
-                    created_at=datetime.now()
+                # Un pedido con todas sus líneas en una sola inserción; si
+                # Stripe reenvía el evento, el pedido ya existe y no se duplica
+                record_paid_order(
+                    int(user_id),
+                    session.get('id'),
+                    items,
+                    session.get('amount_total', 0) / 100  # Convertir de centavos a euros
                 )
-                db.session.add(order)
-                db.session.flush()  # Para obtener el ID del pedido
-
-                # Crear un elemento de pedido para el curso
-                order_item = OrderItem(
-                    order_id=order.id,
-                    course_id=course_id,
-                    price=session.get('amount_total', 0) / 100,
-                    quantity=1
-                )
-                db.session.add(order_item)
-
-                # Guardar en la base de datos
-                db.session.commit()
 
                 return jsonify({"success": True, "message": "Pago procesado correctamente"}), 200
             except Exception as e:
@@ -203,16 +210,19 @@ def check_payment_status(session_id):
                 if session.payment_status == 'paid':
                     # El pago se completó, pero no se registró en nuestra base de datos
                     # Esto podría suceder si el webhook falló
-                    course_id = session.metadata.get('course_id')
-                    course = Curso.query.filter_by(id=course_id).first()
+                    curso_ids = [curso_id for curso_id, _ in items_from_session(session)]
+                    names = dict(
+                        db.session.query(Curso.id, Curso.titulo).filter(Curso.id.in_(curso_ids)).all()
+                    ) if curso_ids else {}
 
                     return jsonify({
                         "success": True,
                         "message": "Pago completado (verificado con Stripe)",
                         "data": {
                             "paymentStatus": "completed",
-                            "courseId": course_id,
-                            "courseName": course.title if course else "Curso desconocido",
+                            "courseId": curso_ids[0] if curso_ids else None,
+                            "courseName": names.get(curso_ids[0], "Curso desconocido") if curso_ids else "Curso desconocido",
+                            "courseIds": curso_ids,
                             "amount": session.amount_total / 100,
                             "paymentDate": datetime.now().isoformat(),
                             "orderId": f"STRIPE-{session_id[:8]}"
@@ -241,26 +251,30 @@ def check_payment_status(session_id):
                 "data": None
             }), 403
 
-        # Obtener el primer elemento del pedido (asumimos que solo hay uno)
-        order_item = OrderItem.query.filter_by(order_id=order.id).first()
+        # Obtener las líneas del pedido con el título de cada curso
+        order_items = (
+            db.session.query(OrderItem.curso_id, Curso.titulo)
+            .outerjoin(Curso, Curso.id == OrderItem.curso_id)
+            .filter(OrderItem.order_id == order.id)
+            .order_by(OrderItem.id)
+            .all()
+        )
 
-        if not order_item:
+        if not order_items:
             return jsonify({
                 "success": False,
                 "message": "No se encontraron detalles del pedido",
                 "data": None
             }), 404
 
-        # Obtener información del curso
-        course = Curso.query.filter_by(id=order_item.course_id).first()
-
         return jsonify({
             "success": True,
             "message": "Estado del pago obtenido correctamente",
             "data": {
-                "paymentStatus": order.payment_status,
-                "courseId": order_item.course_id,
-                "courseName": course.title if course else "Curso desconocido",
+                "paymentStatus": order.status,
+                "courseId": order_items[0].curso_id,
+                "courseName": order_items[0].titulo or "Curso desconocido",
+                "courseIds": [item.curso_id for item in order_items],
                 "amount": order.total_amount,
                 "paymentDate": order.created_at.isoformat(),
                 "orderId": f"ORD-{order.id}"
@@ -303,11 +317,11 @@ def get_payment_history():
 
             for item in order_items:
                 # Obtener información del curso
-                course = Curso.query.filter_by(id=item.course_id).first()
+                course = Curso.query.filter_by(id=item.curso_id).first()
 
                 items.append({
-                    "courseId": item.course_id,
-                    "courseName": course.title if course else "Curso desconocido",
+                    "courseId": item.curso_id,
+                    "courseName": course.titulo if course else "Curso desconocido",
                     "price": item.price,
                     "quantity": item.quantity
                 })
@@ -315,7 +329,7 @@ def get_payment_history():
             payment_history.append({
                 "orderId": order.id,
                 "totalAmount": order.total_amount,
-                "paymentStatus": order.payment_status,
+                "paymentStatus": order.status,
                 "paymentMethod": order.payment_method,
                 "paymentId": order.payment_id,
                 "createdAt": order.created_at.isoformat(),
@@ -9,9 +9,15 @@ from app.models.user import User
 from app.models.curso import Curso
 from app.models.wishlist import Wishlist
 from app.models.cart import Cart
+from sqlalchemy import delete
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from app.utils import standardize_response, log_api_call
+from app.utils.cart_batch import apply_operations, add_item, CartBatchError
+from app.utils.cart_summary import get_cart_summary, invalidate_cart_summary
+from app.utils.user_state import invalidate_user_state
+from app.utils.entitlements import get_owned_course_ids
+from app.utils.auth_middleware import course_access_required
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -19,6 +25,44 @@ logger = logging.getLogger(__name__)
 # Crear blueprint
 user_courses_bp = Blueprint('user_courses', __name__)
 
+def _items_with_courses(model, user_id):
+    """
+    Obtiene los elementos de un usuario junto con su curso en una sola consulta.
+
+    Args:
+        model: Wishlist o Cart
+        user_id (int): ID del usuario
+
+    Returns:
+        list: Pares (elemento, curso) en el orden en que se añadieron
+    """
+    return (
+        db.session.query(model, Curso)
+        .join(Curso, Curso.id == model.curso_id)
+        .filter(model.user_id == user_id)
+        .order_by(model.created_at, model.id)
+        .all()
+    )
+
+def _cart_state(user_id):
+    """Contenido del carrito de un usuario con el precio total."""
+    cart = [
+        {
+            'cart_id': item.id,
+            'curso': curso.to_dict()
+        }
+        for item, curso in _items_with_courses(Cart, user_id)
+    ]
+
+    # El total se calcula con un agregado SQL y se comparte con /cart/summary
+    summary = get_cart_summary(user_id)
+
+    return {
+        "cart": cart,
+        "total": summary["total"],
+        "items_count": len(cart)
+    }
+
 # Endpoint para obtener la lista de deseos del usuario
 @user_courses_bp.route('/wishlist', methods=['GET'])
 @jwt_required()
@@ -29,19 +73,14 @@ def get_wishlist():
         # Obtener el ID del usuario desde el token JWT
         user_id = get_jwt_identity()
 
-        # Buscar los cursos en la lista de deseos del usuario
-        wishlist_items = Wishlist.query.filter_by(user_id=user_id).all()
-
-        # Obtener los detalles de cada curso
-        wishlist = []
-        for item in wishlist_items:
-            curso = Curso.query.get(item.curso_id)
-            if curso:
-                curso_dict = curso.to_dict()
-                wishlist.append({
-                    'wishlist_id': item.id,
-                    'curso': curso_dict
-                })
+        # Cargar los elementos de la lista de deseos con sus cursos en una sola consulta
+        wishlist = [
+            {
+                'wishlist_id': item.id,
+                'curso': curso.to_dict()
+            }
+            for item, curso in _items_with_courses(Wishlist, user_id)
+        ]
 
         logger.info(f"Lista de deseos obtenida para usuario {user_id}: {len(wishlist)} cursos")
 
@@ -69,13 +108,13 @@ def add_to_wishlist():
     """Añade un curso a la lista de deseos del usuario autenticado."""
     try:
         # Obtener el ID del usuario desde el token JWT
-        user_id = get_jwt_identity()
+        user_id = int(get_jwt_identity())
 
         # Obtener el ID del curso desde el cuerpo de la solicitud
         data = request.get_json()
         curso_id = data.get('curso_id')
 
-        if not curso_id:
+        if not curso_id or not str(curso_id).isdigit():
             logger.warning(f"Intento de añadir curso a wishlist sin ID de curso: usuario {user_id}")
             return standardize_response(
                 False,
@@ -83,9 +122,11 @@ def add_to_wishlist():
                 status_code=400
             )
 
-        # Verificar si el curso existe
-        curso = Curso.query.get(curso_id)
-        if not curso:
+        # Añadir el curso con una sola sentencia que comprueba que existe y
+        # no lo duplica aunque lleguen varias solicitudes a la vez
+        wishlist_item, created = add_item(Wishlist, user_id, int(curso_id))
+
+        if wishlist_item is None:
             logger.warning(f"Intento de añadir curso inexistente a wishlist: usuario {user_id}, curso {curso_id}")
             return standardize_response(
                 False,
@@ -93,31 +134,23 @@ def add_to_wishlist():
                 status_code=404
             )
 
-        # Verificar si el curso ya está en la lista de deseos
-        existing_item = Wishlist.query.filter_by(
-            user_id=user_id,
-            curso_id=curso_id
-        ).first()
-
-        if existing_item:
+        if not created:
             logger.info(f"Curso ya en wishlist: usuario {user_id}, curso {curso_id}")
             return standardize_response(
-                False,
+                True,
                 "El curso ya está en la lista de deseos",
-                status_code=400
+                {"wishlist_item": wishlist_item}
             )
 
-        # Añadir el curso a la lista de deseos
-        wishlist_item = Wishlist(user_id=user_id, curso_id=curso_id)
-        db.session.add(wishlist_item)
         db.session.commit()
+        invalidate_user_state(user_id)
 
         logger.info(f"Curso añadido a wishlist: usuario {user_id}, curso {curso_id}")
 
         return standardize_response(
             True,
             "Curso añadido a la lista de deseos",
-            {"wishlist_item": wishlist_item.to_dict()},
+            {"wishlist_item": wishlist_item},
             status_code=201
         )
 
@@ -184,36 +217,14 @@ def get_cart():
         # Obtener el ID del usuario desde el token JWT
         user_id = get_jwt_identity()
 
-        # Buscar los cursos en el carrito del usuario
-        cart_items = Cart.query.filter_by(user_id=user_id).all()
-
-        # Obtener los detalles de cada curso
-        cart = []
-        total = 0
-
-        for item in cart_items:
-            curso = Curso.query.get(item.curso_id)
-            if curso:
-                curso_dict = curso.to_dict()
-                cart.append({
-                    'cart_id': item.id,
-                    'curso': curso_dict
-                })
+        cart = _cart_state(user_id)
 
-                # Sumar al total si el precio está disponible
-                if curso.precio:
-                    total += float(curso.precio)
-
-        logger.info(f"Carrito obtenido para usuario {user_id}: {len(cart)} cursos")
+        logger.info(f"Carrito obtenido para usuario {user_id}: {cart['items_count']} cursos")
 
         return standardize_response(
             True,
             "Carrito obtenido correctamente",
-            {
-                "cart": cart,
-                "total": total,
-                "items_count": len(cart)
-            }
+            cart
         )
 
     except SQLAlchemyError as e:
@@ -225,6 +236,30 @@ def get_cart():
             status_code=500
         )
 
+# Endpoint ligero con el número de cursos y el total del carrito
+@user_courses_bp.route('/cart/summary', methods=['GET'])
+@jwt_required()
+def get_cart_summary_endpoint():
+    """Obtiene el número de cursos y el total del carrito del usuario autenticado."""
+    try:
+        # Obtener el ID del usuario desde el token JWT
+        user_id = int(get_jwt_identity())
+
+        return standardize_response(
+            True,
+            "Resumen del carrito obtenido correctamente",
+            get_cart_summary(user_id)
+        )
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Error al obtener el resumen del carrito: {str(e)}", exc_info=True)
+        return standardize_response(
+            False,
+            "Error al obtener el resumen del carrito",
+            status_code=500
+        )
+
 # Endpoint para añadir un curso al carrito
 @user_courses_bp.route('/cart', methods=['POST'])
 @jwt_required()
@@ -234,13 +269,13 @@ def add_to_cart():
     """Añade un curso al carrito de compras del usuario autenticado."""
     try:
         # Obtener el ID del usuario desde el token JWT
-        user_id = get_jwt_identity()
+        user_id = int(get_jwt_identity())
 
         # Obtener el ID del curso desde el cuerpo de la solicitud
         data = request.get_json()
         curso_id = data.get('curso_id')
 
-        if not curso_id:
+        if not curso_id or not str(curso_id).isdigit():
             logger.warning(f"Intento de añadir curso a carrito sin ID de curso: usuario {user_id}")
             return standardize_response(
                 False,
@@ -248,9 +283,11 @@ def add_to_cart():
                 status_code=400
             )
 
-        # Verificar si el curso existe
-        curso = Curso.query.get(curso_id)
-        if not curso:
+        # Añadir el curso con una sola sentencia que comprueba que existe y
+        # no lo duplica aunque lleguen varias solicitudes a la vez
+        cart_item, created = add_item(Cart, user_id, int(curso_id))
+
+        if cart_item is None:
             logger.warning(f"Intento de añadir curso inexistente a carrito: usuario {user_id}, curso {curso_id}")
             return standardize_response(
                 False,
@@ -258,42 +295,32 @@ def add_to_cart():
                 status_code=404
             )
 
-        # Verificar si el curso ya está en el carrito
-        existing_item = Cart.query.filter_by(
-            user_id=user_id,
-            curso_id=curso_id
-        ).first()
-
-        if existing_item:
+        if not created:
             logger.info(f"Curso ya en carrito: usuario {user_id}, curso {curso_id}")
             return standardize_response(
-                False,
+                True,
                 "El curso ya está en el carrito",
-                status_code=400
+                {"cart_item": cart_item}
             )
 
-        # Añadir el curso al carrito
-        cart_item = Cart(user_id=user_id, curso_id=curso_id)
-        db.session.add(cart_item)
-
         # Si el curso estaba en la lista de deseos, eliminarlo de allí
-        wishlist_item = Wishlist.query.filter_by(
-            user_id=user_id,
-            curso_id=curso_id
-        ).first()
+        removed = db.session.execute(
+            delete(Wishlist).where(Wishlist.user_id == user_id, Wishlist.curso_id == curso_id)
+        ).rowcount
 
-        if wishlist_item:
-            db.session.delete(wishlist_item)
+        if removed:
             logger.info(f"Curso eliminado de wishlist al añadirlo al carrito: usuario {user_id}, curso {curso_id}")
 
         db.session.commit()
+        invalidate_cart_summary(user_id)
+        invalidate_user_state(user_id)
 
         logger.info(f"Curso añadido al carrito: usuario {user_id}, curso {curso_id}")
 
         return standardize_response(
             True,
             "Curso añadido al carrito",
-            {"cart_item": cart_item.to_dict()},
+            {"cart_item": cart_item},
             status_code=201
         )
 
@@ -333,6 +360,7 @@ def remove_from_cart(curso_id):
         # Eliminar el elemento del carrito
         db.session.delete(cart_item)
         db.session.commit()
+        invalidate_cart_summary(user_id)
 
         logger.info(f"Curso eliminado del carrito: usuario {user_id}, curso {curso_id}")
 
@@ -349,3 +377,87 @@ def remove_from_cart(curso_id):
             "Error al eliminar el curso del carrito",
             status_code=500
         )
+
+# Endpoint para aplicar varias operaciones sobre el carrito en una sola transacción
+@user_courses_bp.route('/cart/batch', methods=['POST'])
+@jwt_required()
+@limiter.limit("20/minute")
+@log_api_call
+def batch_cart_operations():
+    """
+    Aplica un lote de operaciones sobre el carrito y la lista de deseos.
+
+    Cuerpo: {"operations": [{"op": "add", "curso_ids": [1, 2]},
+    {"op": "remove", "curso_id": 3}, {"op": "move_to_wishlist", "curso_id": 4},
+    {"op": "add_all_from_wishlist"}]}. Devuelve el carrito resultante.
+    """
+    try:
+        # Obtener el ID del usuario desde el token JWT
+        user_id = int(get_jwt_identity())
+
+        data = request.get_json(silent=True) or {}
+        result = apply_operations(user_id, data.get('operations'))
+        invalidate_cart_summary(user_id)
+        invalidate_user_state(user_id)
+
+        cart = _cart_state(user_id)
+        cart["changes"] = result
+
+        return standardize_response(
+            True,
+            "Operaciones aplicadas al carrito",
+            cart
+        )
+
+    except CartBatchError as e:
+        logger.warning(f"Lote de operaciones no válido: usuario {get_jwt_identity()}: {str(e)}")
+        return standardize_response(
+            False,
+            str(e),
+            status_code=400
+        )
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Error al aplicar operaciones al carrito: {str(e)}", exc_info=True)
+        return standardize_response(
+            False,
+            "Error al aplicar las operaciones al carrito",
+            status_code=500
+        )
+
+# Endpoint para obtener los cursos comprados por el usuario
+@user_courses_bp.route('/courses', methods=['GET'])
+@jwt_required()
+def get_owned_courses():
+    """Obtiene los IDs de los cursos comprados por el usuario autenticado."""
+    try:
+        # Obtener el ID del usuario desde el token JWT
+        user_id = int(get_jwt_identity())
+
+        return standardize_response(
+            True,
+            "Cursos comprados obtenidos correctamente",
+            {"curso_ids": sorted(get_owned_course_ids(user_id))}
+        )
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Error al obtener los cursos comprados: {str(e)}", exc_info=True)
+        return standardize_response(
+            False,
+            "Error al obtener los cursos comprados",
+            status_code=500
+        )
+
+# Endpoint para comprobar el acceso al contenido de un curso
+@user_courses_bp.route('/courses/<int:curso_id>/access', methods=['GET'])
+@jwt_required()
+@course_access_required
+def check_course_access(curso_id):
+    """Confirma que el usuario autenticado puede acceder al contenido de un curso."""
+    return standardize_response(
+        True,
+        "Acceso permitido",
+        {"curso_id": curso_id, "access": True}
+    )
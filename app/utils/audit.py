@@ -0,0 +1,217 @@
+"""
+Registro de auditoría asíncrono en formato JSONL.
+
+audit() construye el evento, elimina los campos sensibles (contraseñas,
+tokens, cuerpos de petición) y lo deja en una cola en memoria sin esperar: si
+la cola está llena, el evento se descarta y se cuenta en lugar de bloquear la
+petición. Un hilo en segundo plano vacía la cola por lotes de AUDIT_BATCH_SIZE
+eventos (o cada AUDIT_FLUSH_INTERVAL segundos) y los escribe en AUDIT_LOG_PATH,
+que se rota al superar AUDIT_LOG_MAX_BYTES conservando AUDIT_LOG_BACKUP_COUNT
+ficheros anteriores (audit.jsonl.1, audit.jsonl.2, ...).
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from flask import has_request_context, request
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+REDACTED = '[REDACTED]'
+# Campos que nunca se escriben, a cualquier nivel de anidamiento
+SENSITIVE_FIELDS = frozenset({
+    'password', 'new_password', 'old_password', 'current_password', 'password_hash',
+    'token', 'access_token', 'refresh_token', 'authorization', 'secret', 'api_key',
+    'body', 'raw_body', 'request_body', 'payload'
+})
+
+_settings = {'enabled': False}
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def redact(value):
+    """
+    Copia de un valor sin los campos sensibles.
+
+    Args:
+        value: Diccionario, lista o valor simple
+
+    Returns:
+        El valor con los campos de SENSITIVE_FIELDS sustituidos por REDACTED
+    """
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in SENSITIVE_FIELDS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [redact(item) for item in value]
+    return value
+
+
+class AuditWriter:
+    """Hilo que escribe por lotes los eventos de la cola en un fichero rotado."""
+
+    def __init__(self, path, max_bytes, backup_count, queue_size, batch_size, flush_interval):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._thread.start()
+
+    def put(self, record):
+        """Encola un evento sin bloquear; devuelve False si se ha descartado."""
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def stop(self, timeout=5.0):
+        """Detiene el hilo después de escribir los eventos pendientes."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _take_batch(self):
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stop.is_set() and self.queue.empty()):
+            batch = self._take_batch()
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+            except Exception as e:
+                # Nunca debe detener el hilo: el lote se pierde y se registra
+                self.dropped += len(batch)
+                logger.error(f"Error al escribir el registro de auditoría: {e}")
+
+    def _write(self, batch):
+        lines = [(json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8') for record in batch]
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        chunk = []
+        for line in lines:
+            # Un lote puede repartirse entre varios ficheros para respetar el tamaño máximo
+            if self.max_bytes and size and size + len(line) > self.max_bytes:
+                self._append(chunk)
+                self._rotate()
+                chunk, size = [], 0
+            chunk.append(line)
+            size += len(line)
+        self._append(chunk)
+
+    def _append(self, chunk):
+        if chunk:
+            with open(self.path, 'ab') as f:
+                f.write(b''.join(chunk))
+
+    def _rotate(self):
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f'{self.path}.{index}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.path}.{index + 1}')
+        os.replace(self.path, f'{self.path}.1')
+
+
+def init_audit(app):
+    """
+    Configura el registro de auditoría con la configuración de la aplicación.
+
+    El hilo de escritura se arranca con el primer evento de cada proceso.
+
+    Args:
+        app: Aplicación Flask
+    """
+    config = app.config
+    _settings.update(
+        enabled=config['AUDIT_LOG_ENABLED'],
+        path=config['AUDIT_LOG_PATH'],
+        max_bytes=config['AUDIT_LOG_MAX_BYTES'],
+        backup_count=config['AUDIT_LOG_BACKUP_COUNT'],
+        queue_size=config['AUDIT_QUEUE_SIZE'],
+        batch_size=config['AUDIT_BATCH_SIZE'],
+        flush_interval=config['AUDIT_FLUSH_INTERVAL']
+    )
+
+
+def _get_writer():
+    global _writer
+    with _writer_lock:
+        # Tras un fork (workers de gunicorn) el hilo no existe en el hijo
+        if _writer is None or _writer.pid != os.getpid():
+            settings = {key: value for key, value in _settings.items() if key != 'enabled'}
+            _writer = AuditWriter(**settings)
+            _writer.pid = os.getpid()
+            _writer.start()
+        return _writer
+
+
+def audit(event, **fields):
+    """
+    Registra un evento de auditoría sin bloquear la petición.
+
+    Args:
+        event (str): Nombre del evento (por ejemplo, 'auth.register.success')
+        **fields: Datos del evento; los campos sensibles se eliminan aquí
+
+    Returns:
+        bool: False si el evento se ha descartado (registro desactivado o cola llena)
+    """
+    if not _settings['enabled']:
+        return False
+
+    record = {'ts': datetime.now(timezone.utc).isoformat(), 'event': event}
+    if has_request_context():
+        record['ip'] = request.remote_addr
+        record['method'] = request.method
+        record['path'] = request.path
+    record.update(redact(fields))
+    return _get_writer().put(record)
+
+
+def audit_stats():
+    """Eventos pendientes y descartados del proceso actual."""
+    writer = _writer if _writer is not None and _writer.pid == os.getpid() else None
+    return {
+        'pending': writer.queue.qsize() if writer else 0,
+        'dropped': writer.dropped if writer else 0
+    }
+
+
+@atexit.register
+def flush_audit():
+    """Escribe los eventos pendientes y detiene el hilo de escritura."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None and _writer.pid == os.getpid():
+            _writer.stop()
+        _writer = None
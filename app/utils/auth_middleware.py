@@ -1,7 +1,8 @@
 from functools import wraps
 from flask import jsonify, request
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request, current_user
 from app.models.user import User
+from app.utils.entitlements import user_owns_course
 
 def admin_required(fn):
     """
@@ -63,3 +64,27 @@ def role_required(role_name):
         return wrapper
     
     return decorator
+
+def course_access_required(fn):
+    """
+    Decorador para proteger el contenido de un curso: solo pueden acceder los
+    usuarios que lo han comprado (y los administradores).
+    Debe usarse después del decorador jwt_required(). El ID del curso se toma
+    del argumento curso_id de la ruta.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        # jwt_required() ya ha validado el token y cargado el usuario; la
+        # compra se comprueba con una sola lectura de caché
+        user = current_user
+        if not user or not (user.is_admin or user_owns_course(user.id, kwargs['curso_id'])):
+            return jsonify({
+                "success": False,
+                "message": "Debe comprar el curso para acceder a este recurso",
+                "data": None
+            }), 403
+
+        # Si el usuario tiene acceso, continuar con la función original
+        return fn(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,212 @@
+"""
+Autocompletado en memoria de títulos de cursos e instructores.
+
+Cada worker mantiene un índice de arrays ordenados: una lista de claves
+normalizadas (el título completo, cada sufijo del título a partir de una
+palabra y el nombre del instructor) y, en paralelo, la sugerencia a la que
+apunta cada clave. Las sugerencias de un prefijo ocupan un rango contiguo
+que se localiza con dos búsquedas binarias; dentro del rango se eligen las
+más populares.
+
+El índice se reconstruye cuando cambia la versión de la entidad 'curso'
+(ver app.utils.cache_versions), comprobándola como mucho una vez cada
+VERSION_CHECK_INTERVAL segundos para no consultar la caché en cada tecla.
+"""
+
+import heapq
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from sqlalchemy import func, select
+from app import db
+from app.models.cart import Cart
+from app.models.curso import Curso
+from app.models.curso_stats import CursoStats
+from app.models.wishlist import Wishlist
+from app.utils.cache_versions import get_version, versioned_timeout
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+VERSION_CHECK_INTERVAL = 1.0  # Segundos entre comprobaciones de la versión
+MAX_SCAN = 512                # Rango máximo que se recorre sin memoizar
+MIN_PREFIX_LENGTH = 1
+
+# Peso de cada interacción en la popularidad de un curso
+POPULARITY_WEIGHTS = {
+    'purchase': 3,
+    'cart': 1,
+    'wishlist': 1,
+}
+FEATURED_BONUS = 1
+
+
+def normalize(text):
+    """Minúsculas, sin acentos y con los espacios colapsados."""
+    text = unicodedata.normalize('NFKD', text or '').lower()
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.split())
+
+
+class AutocompleteIndex:
+    """Índice inmutable de sugerencias construido a partir del catálogo."""
+
+    def __init__(self, suggestions):
+        """
+        Args:
+            suggestions (list): Tuplas (texto, tipo, curso_id, popularidad)
+        """
+        self.suggestions = suggestions
+        pairs = []
+        for position, (text, kind, _, _) in enumerate(suggestions):
+            words = normalize(text).split(' ')
+            # Cada sufijo desde el inicio de una palabra: "maquillaje" encuentra
+            # también "Curso de maquillaje"
+            for start in range(len(words) if kind == 'curso' else 1):
+                pairs.append((' '.join(words[start:]), position))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.positions = [position for _, position in pairs]
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.suggestions)
+
+    def _ranked(self, lo, hi, limit):
+        """Posiciones distintas del rango [lo, hi) ordenadas por popularidad."""
+        positions = set(self.positions[lo:hi])
+        return heapq.nlargest(
+            limit, positions,
+            key=lambda position: (self.suggestions[position][3], -position)
+        )
+
+    def complete(self, prefix, limit=8):
+        """
+        Devuelve las sugerencias más populares que empiezan por un prefijo.
+
+        Args:
+            prefix (str): Texto escrito por el usuario
+            limit (int, optional): Número máximo de sugerencias. Por defecto 8.
+
+        Returns:
+            list: Tuplas (texto, tipo, curso_id, popularidad)
+        """
+        prefix = normalize(prefix)
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return []
+
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + '\uffff', lo)
+        if hi - lo <= MAX_SCAN:
+            ranked = self._ranked(lo, hi, limit)
+        else:
+            # Los prefijos cortos abarcan rangos grandes; su resultado se
+            # memoiza hasta la siguiente reconstrucción del índice
+            key = (prefix, limit)
+            ranked = self._memo.get(key)
+            if ranked is None:
+                ranked = self._ranked(lo, hi, limit)
+                with self._memo_lock:
+                    self._memo[key] = ranked
+        return [self.suggestions[position] for position in ranked]
+
+
+def _popularity_query():
+    """Popularidad de cada curso a partir de compras, carritos y listas de deseos."""
+    interactions = (
+        # Las ventas ya están precalculadas en curso_stats
+        select(CursoStats.curso_id, CursoStats.sales_count),
+        select(Cart.curso_id, func.count()).group_by(Cart.curso_id),
+        select(Wishlist.curso_id, func.count()).group_by(Wishlist.curso_id),
+    )
+    return zip(('purchase', 'cart', 'wishlist'), interactions)
+
+
+def build_index():
+    """
+    Construye el índice de autocompletado a partir de los cursos activos.
+
+    Returns:
+        AutocompleteIndex: Índice con una sugerencia por curso y por instructor
+    """
+    popularity = {}
+    for kind, query in _popularity_query():
+        for curso_id, total in db.session.execute(query):
+            popularity[curso_id] = popularity.get(curso_id, 0) + total * POPULARITY_WEIGHTS[kind]
+
+    suggestions = []
+    instructors = {}
+    rows = db.session.execute(
+        select(Curso.id, Curso.titulo, Curso.instructor, Curso.destacado).where(Curso.activo.is_(True))
+    )
+    for curso_id, titulo, instructor, destacado in rows:
+        score = popularity.get(curso_id, 0) + (FEATURED_BONUS if destacado else 0)
+        if titulo:
+            suggestions.append((titulo, 'curso', curso_id, score))
+        if instructor and instructor.strip():
+            # Un instructor es tan popular como la suma de sus cursos
+            name = ' '.join(instructor.split())
+            instructors[name] = instructors.get(name, 0) + score
+
+    suggestions.extend((name, 'instructor', None, score) for name, score in instructors.items())
+    return AutocompleteIndex(suggestions)
+
+
+_state = {'index': None, 'version': None, 'checked_at': 0.0, 'built_at': 0.0}
+_rebuild_lock = threading.Lock()
+
+
+def get_autocomplete_index():
+    """
+    Devuelve el índice del proceso, reconstruyéndolo si el catálogo ha cambiado.
+
+    Mientras un hilo reconstruye el índice, el resto sigue usando el anterior.
+    """
+    index = _state['index']
+    now = time.monotonic()
+    if index is not None and now - _state['checked_at'] < VERSION_CHECK_INTERVAL:
+        return index
+
+    version = get_version('curso')
+    _state['checked_at'] = now
+    # Con una caché local a cada proceso este worker no ve las versiones de
+    # los demás: el índice se reconstruye también cuando supera ese TTL
+    max_age = versioned_timeout(float('inf'))
+    if index is not None and version == _state['version'] and now - _state['built_at'] < max_age:
+        return index
+
+    if not _rebuild_lock.acquire(blocking=index is None):
+        return index
+    try:
+        if _state['index'] is None or _state['version'] != version or now - _state['built_at'] >= max_age:
+            start = time.perf_counter()
+            _state['index'] = build_index()
+            _state['version'] = version
+            _state['built_at'] = now
+            logger.info(
+                f"Índice de autocompletado reconstruido con {len(_state['index'])} sugerencias "
+                f"en {(time.perf_counter() - start) * 1000:.1f} ms"
+            )
+        return _state['index']
+    finally:
+        _rebuild_lock.release()
+
+
+def autocomplete(prefix, limit=8):
+    """
+    Obtiene sugerencias de cursos e instructores para un prefijo.
+
+    Args:
+        prefix (str): Texto escrito por el usuario
+        limit (int, optional): Número máximo de sugerencias
+
+    Returns:
+        list: Sugerencias con texto, tipo ('curso' o 'instructor') y curso_id
+    """
+    return [
+        {'text': text, 'type': kind, 'curso_id': curso_id}
+        for text, kind, curso_id, _ in get_autocomplete_index().complete(prefix, limit)
+    ]
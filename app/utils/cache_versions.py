@@ -0,0 +1,162 @@
+"""
+Claves de versión por entidad para invalidar la caché.
+
+Cada entidad (por ejemplo 'curso') tiene una versión de colección y, si se
+indica un ID, una versión por registro. Las entradas de caché que dependen de
+una entidad incluyen su versión en la clave, de forma que incrementar la
+versión invalida todas esas entradas a la vez sin tener que enumerarlas.
+
+La invalidación solo llega a todos los workers si la caché es compartida
+(por ejemplo, CACHE_TYPE=RedisCache). Con un backend local a cada proceso
+(SimpleCache o NullCache) el resto de workers no ve las versiones nuevas, así
+que el tiempo de validez de las entradas versionadas se limita a
+LOCAL_CACHE_MAX_TIMEOUT para acotar cuánto tiempo pueden servir datos antiguos.
+"""
+
+import logging
+import uuid
+from functools import wraps
+from flask import current_app
+from app import cache
+from app.utils.single_flight import single_flight_memoize
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'version:{entity}:{entity_id}'
+
+# Backends de Flask-Caching cuyo contenido es local a cada proceso
+LOCAL_CACHE_TYPES = ('null', 'nullcache', 'simple', 'simplecache')
+LOCAL_CACHE_MAX_TIMEOUT = 300  # El mismo límite que CACHE_DEFAULT_TIMEOUT
+
+
+def is_shared_cache(app=None):
+    """Indica si el backend de caché configurado es compartido entre procesos."""
+    cache_type = str((app or current_app).config.get('CACHE_TYPE') or 'null')
+    return cache_type.rsplit('.', 1)[-1].lower() not in LOCAL_CACHE_TYPES
+
+
+def versioned_timeout(timeout):
+    """
+    Tiempo de validez de una entrada que depende de claves de versión.
+
+    Args:
+        timeout (int): Tiempo deseado en segundos
+
+    Returns:
+        int: El mismo tiempo con una caché compartida; como máximo
+        LOCAL_CACHE_MAX_TIMEOUT con una caché local a cada proceso
+    """
+    if is_shared_cache():
+        return timeout
+    return min(timeout, LOCAL_CACHE_MAX_TIMEOUT)
+
+
+def check_cache_backend(app):
+    """Avisa al arrancar si la invalidación por versiones no llega a todos los workers."""
+    if not is_shared_cache(app):
+        logger.warning(
+            f"CACHE_TYPE={app.config.get('CACHE_TYPE')} es local a cada proceso: los cambios "
+            f"solo invalidan la caché del worker que los hace y el resto puede servir datos "
+            f"de hasta {LOCAL_CACHE_MAX_TIMEOUT}s de antigüedad. Usa RedisCache en producción."
+        )
+
+
+def _version_key(entity, entity_id=None):
+    return VERSION_KEY.format(entity=entity, entity_id='*' if entity_id is None else entity_id)
+
+
+def _new_version():
+    # Un valor aleatorio evita reutilizar una versión antigua si la clave
+    # se pierde (por ejemplo, al reiniciar un backend de caché en memoria)
+    return uuid.uuid4().hex
+
+
+def get_version(entity, entity_id=None):
+    """
+    Obtiene la versión actual de una entidad, creándola si no existe.
+
+    Args:
+        entity (str): Nombre de la entidad (por ejemplo 'curso')
+        entity_id (any, optional): ID del registro. Si es None, versión de la colección.
+
+    Returns:
+        str: Identificador opaco de la versión
+    """
+    key = _version_key(entity, entity_id)
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        # add() evita pisar una versión creada en paralelo por otro worker
+        if not cache.add(key, version, timeout=0):
+            version = cache.get(key) or version
+    return version
+
+
+def get_versions(entity, entity_ids):
+    """
+    Obtiene las versiones de varios registros con una sola lectura de caché.
+
+    Args:
+        entity (str): Nombre de la entidad
+        entity_ids (list): IDs de los registros
+
+    Returns:
+        dict: Versión de cada ID
+    """
+    entity_ids = list(entity_ids)
+    keys = [_version_key(entity, entity_id) for entity_id in entity_ids]
+    versions = dict(zip(entity_ids, cache.get_many(*keys))) if keys else {}
+
+    missing = {entity_id: _new_version() for entity_id, version in versions.items() if version is None}
+    if missing:
+        cache.set_many({_version_key(entity, entity_id): version for entity_id, version in missing.items()}, timeout=0)
+        versions.update(missing)
+    return versions
+
+
+def bump_versions(entity, entity_ids=(), collection=True):
+    """
+    Invalida las entradas de caché de una entidad con una sola escritura.
+
+    Args:
+        entity (str): Nombre de la entidad
+        entity_ids (iterable, optional): IDs de los registros modificados
+        collection (bool, optional): Invalidar también la versión de la colección
+    """
+    keys = {_version_key(entity, entity_id): _new_version() for entity_id in entity_ids}
+    if collection:
+        keys[_version_key(entity)] = _new_version()
+    if keys:
+        cache.set_many(keys, timeout=0)
+
+
+def versioned_memoize(entity, timeout=300, id_arg=None):
+    """
+    Decorador de memoización cuya clave incluye la versión de una entidad.
+
+    Usa single_flight_memoize, por lo que también evita estampidas cuando la
+    entrada caduca o cambia de versión.
+
+    Args:
+        entity (str): Entidad de la que depende el resultado
+        timeout (int, optional): Tiempo de validez en segundos (ver
+            versioned_timeout). Por defecto 300.
+        id_arg (int, optional): Posición del argumento con el ID del registro.
+            Si es None, se usa la versión de la colección.
+
+    Returns:
+        function: Decorador configurado
+    """
+    def decorator(func):
+        versioned = single_flight_memoize(
+            timeout=lambda: versioned_timeout(timeout),
+            key_prefix=f"sf:{func.__module__}.{func.__qualname__}"
+        )(lambda version, *args, **kwargs: func(*args, **kwargs))
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            entity_id = args[id_arg] if id_arg is not None else None
+            return versioned(get_version(entity, entity_id), *args, **kwargs)
+        return wrapper
+    return decorator
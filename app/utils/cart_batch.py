@@ -0,0 +1,197 @@
+"""
+Operaciones por lotes sobre el carrito y la lista de deseos de un usuario.
+
+Las operaciones se reducen primero al estado final de cada curso (en el orden
+en que se reciben) y después se aplican con como mucho cuatro sentencias por
+conjunto (altas y bajas en cada tabla) y un único commit. Las altas
+individuales de POST /cart y POST /wishlist usan la misma sentencia.
+"""
+
+import logging
+from datetime import datetime, timezone
+from sqlalchemy import delete, literal, select
+from app import db
+from app.models.cart import Cart
+from app.models.curso import Curso
+from app.models.wishlist import Wishlist
+from app.utils.db_utils import dialect_insert
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_OPERATIONS = 100
+OPERATIONS = ('add', 'remove', 'move_to_wishlist', 'add_all_from_wishlist')
+
+
+class CartBatchError(ValueError):
+    """Lote de operaciones no válido."""
+
+
+def _curso_ids(operation, position):
+    raw = operation.get('curso_ids')
+    if raw is None and operation.get('curso_id') is not None:
+        raw = [operation['curso_id']]
+    if not isinstance(raw, list) or not raw:
+        raise CartBatchError(f"La operación {position} requiere 'curso_id' o 'curso_ids'")
+    try:
+        return [int(curso_id) for curso_id in raw]
+    except (TypeError, ValueError):
+        raise CartBatchError(f"La operación {position} contiene IDs de curso no válidos")
+
+
+def plan_operations(operations, wishlist_ids=()):
+    """
+    Reduce una lista de operaciones al estado final de cada curso.
+
+    Args:
+        operations (list): Diccionarios con 'op' y 'curso_id' o 'curso_ids'
+        wishlist_ids (iterable, optional): Cursos actuales de la lista de deseos,
+            necesarios para 'add_all_from_wishlist'
+
+    Returns:
+        tuple: (cart, wishlist), diccionarios curso_id -> True (debe estar) o
+        False (no debe estar)
+
+    Raises:
+        CartBatchError: Si alguna operación no es válida
+    """
+    if not isinstance(operations, list) or not operations:
+        raise CartBatchError("Se requiere una lista de operaciones")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise CartBatchError(f"Como máximo {MAX_BATCH_OPERATIONS} operaciones por solicitud")
+
+    cart, wishlist = {}, {}
+    for position, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get('op') not in OPERATIONS:
+            raise CartBatchError(f"Operación {position} no válida. Use una de: {', '.join(OPERATIONS)}")
+
+        op = operation['op']
+        if op == 'add_all_from_wishlist':
+            # La lista de deseos tal como la han dejado las operaciones anteriores
+            curso_ids = [curso_id for curso_id in wishlist_ids if wishlist.get(curso_id, True)]
+            curso_ids += [curso_id for curso_id, present in wishlist.items() if present and curso_id not in curso_ids]
+        else:
+            curso_ids = _curso_ids(operation, position)
+        for curso_id in curso_ids:
+            if op in ('add', 'add_all_from_wishlist'):
+                # Igual que POST /cart: el curso sale de la lista de deseos
+                cart[curso_id] = True
+                wishlist[curso_id] = False
+            elif op == 'remove':
+                cart[curso_id] = False
+            else:
+                cart[curso_id] = False
+                wishlist[curso_id] = True
+    return cart, wishlist
+
+
+def _insert_statement(model, user_id, curso_ids, now):
+    """
+    INSERT ... SELECT que solo añade cursos existentes e ignora los repetidos.
+
+    La comprobación de que el curso existe y la de que no está ya añadido las
+    hace la base de datos en la misma sentencia, sin condiciones de carrera.
+    """
+    source = select(literal(user_id), Curso.id, literal(now)).where(Curso.id.in_(curso_ids))
+    stmt = dialect_insert(model.__table__, db.session).from_select(['user_id', 'curso_id', 'created_at'], source)
+    return stmt.on_conflict_do_nothing(index_elements=['user_id', 'curso_id'])
+
+
+def _insert_items(model, user_id, curso_ids, now):
+    if not curso_ids:
+        return 0
+    return db.session.execute(_insert_statement(model, user_id, curso_ids, now)).rowcount
+
+
+def add_item(model, user_id, curso_id):
+    """
+    Añade un curso al carrito o a la lista de deseos con una sola sentencia.
+
+    La operación es idempotente: si el curso ya estaba añadido no se modifica
+    nada. No hace commit.
+
+    Args:
+        model: Cart o Wishlist
+        user_id (int): ID del usuario
+        curso_id (int): ID del curso
+
+    Returns:
+        tuple: (elemento, creado). El elemento es un diccionario como el de
+        to_dict(), o None si el curso no existe.
+    """
+    table = model.__table__
+    stmt = _insert_statement(model, user_id, [curso_id], datetime.now(timezone.utc)).returning(*table.c)
+    row = db.session.execute(stmt).mappings().first()
+    if row is not None:
+        return _item_dict(row), True
+
+    # Nada insertado: o ya estaba añadido o el curso no existe
+    row = db.session.execute(
+        select(*table.c).where(table.c.user_id == user_id, table.c.curso_id == curso_id)
+    ).mappings().first()
+    return (_item_dict(row) if row is not None else None), False
+
+
+def _item_dict(row):
+    return {
+        'id': row['id'],
+        'user_id': row['user_id'],
+        'curso_id': row['curso_id'],
+        'created_at': row['created_at'].isoformat() if row['created_at'] else None
+    }
+
+
+def _delete_items(model, user_id, curso_ids):
+    if not curso_ids:
+        return 0
+    return db.session.execute(
+        delete(model).where(model.user_id == user_id, model.curso_id.in_(curso_ids))
+    ).rowcount
+
+
+def apply_operations(user_id, operations):
+    """
+    Aplica un lote de operaciones sobre el carrito y la lista de deseos.
+
+    Operaciones admitidas:
+        - add: añade cursos al carrito (y los quita de la lista de deseos)
+        - remove: quita cursos del carrito
+        - move_to_wishlist: pasa cursos del carrito a la lista de deseos
+        - add_all_from_wishlist: pasa al carrito todos los cursos de la lista de deseos
+
+    Args:
+        user_id (int): ID del usuario
+        operations (list): Operaciones en orden
+
+    Returns:
+        dict: Filas añadidas y eliminadas en cada tabla e IDs de curso inexistentes
+
+    Raises:
+        CartBatchError: Si alguna operación no es válida
+    """
+    wishlist_ids = ()
+    if isinstance(operations, list) and any(
+        isinstance(operation, dict) and operation.get('op') == 'add_all_from_wishlist' for operation in operations
+    ):
+        wishlist_ids = db.session.execute(
+            select(Wishlist.curso_id).where(Wishlist.user_id == user_id).order_by(Wishlist.created_at, Wishlist.id)
+        ).scalars().all()
+    cart, wishlist = plan_operations(operations, wishlist_ids)
+
+    added_ids = [curso_id for curso_id, present in cart.items() if present]
+    wished_ids = [curso_id for curso_id, present in wishlist.items() if present]
+    requested = set(added_ids) | set(wished_ids)
+    existing = set(db.session.execute(select(Curso.id).where(Curso.id.in_(requested))).scalars()) if requested else set()
+
+    now = datetime.now(timezone.utc)
+    result = {
+        'cart_added': _insert_items(Cart, user_id, added_ids, now),
+        'cart_removed': _delete_items(Cart, user_id, [curso_id for curso_id, present in cart.items() if not present]),
+        'wishlist_added': _insert_items(Wishlist, user_id, wished_ids, now),
+        'wishlist_removed': _delete_items(Wishlist, user_id, [curso_id for curso_id, present in wishlist.items() if not present]),
+        'invalid_curso_ids': sorted(requested - existing)
+    }
+    db.session.commit()
+
+    logger.info(f"Lote de {len(operations)} operaciones aplicado al carrito del usuario {user_id}: {result}")
+    return result
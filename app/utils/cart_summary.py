@@ -0,0 +1,71 @@
+"""
+Resumen cacheado del carrito de cada usuario (número de cursos y total).
+
+El resumen se calcula con un único agregado SQL y se guarda en la caché con
+una clave que incluye la versión del carrito del usuario y la del catálogo de
+cursos: las escrituras en el carrito renuevan la primera (invalidate_cart_summary)
+y los cambios de precio renuevan la segunda (ver app.models.curso). Mientras la
+entrada es válida, consultar el resumen no accede a la base de datos.
+"""
+
+import logging
+from sqlalchemy import func, select
+from app import db
+from app.models.cart import Cart
+from app.models.curso import Curso
+from app.utils.cache_versions import get_version, bump_versions, versioned_timeout
+from app.utils.single_flight import get_or_compute
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+CART_SUMMARY_KEY = 'cart:summary:{user_id}:{cart_version}:{curso_version}'
+CART_SUMMARY_TIMEOUT = 3600  # La clave ya incluye las versiones
+
+
+def compute_cart_summary(user_id):
+    """
+    Calcula el número de cursos y el precio total del carrito de un usuario.
+
+    Args:
+        user_id (int): ID del usuario
+
+    Returns:
+        dict: {'items_count': int, 'total': float}
+    """
+    count, total = db.session.execute(
+        select(func.count(Cart.id), func.coalesce(func.sum(Curso.precio), 0))
+        .join(Curso, Curso.id == Cart.curso_id)
+        .where(Cart.user_id == user_id)
+    ).one()
+    return {'items_count': count, 'total': round(float(total), 2)}
+
+
+def get_cart_summary(user_id):
+    """
+    Obtiene el resumen del carrito de un usuario, desde la caché si es posible.
+
+    Args:
+        user_id (int): ID del usuario
+
+    Returns:
+        dict: {'items_count': int, 'total': float}
+    """
+    key = CART_SUMMARY_KEY.format(
+        user_id=user_id,
+        cart_version=get_version('cart', user_id),
+        curso_version=get_version('curso')
+    )
+    return get_or_compute(key, lambda: compute_cart_summary(user_id), versioned_timeout(CART_SUMMARY_TIMEOUT))
+
+
+def invalidate_cart_summary(*user_ids):
+    """
+    Invalida el resumen del carrito de varios usuarios con una sola escritura.
+
+    Debe llamarse después del commit que modifica sus carritos.
+
+    Args:
+        *user_ids: IDs de los usuarios
+    """
+    bump_versions('cart', user_ids, collection=False)
@@ -0,0 +1,193 @@
+"""
+Barrido periódico de carritos abandonados.
+
+Un carrito está abandonado cuando su usuario no ha añadido ningún curso en
+CART_ABANDON_DAYS días. El barrido recorre los elementos anteriores al límite
+por el índice (created_at, id), en lotes de CART_SWEEP_BATCH_SIZE filas y con
+un commit por lote, de modo que nunca mantiene un bloqueo de escritura largo.
+Los elementos se eliminan de cart y los eliminados se copian a cart_archive
+(para los informes de carritos abandonados).
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import delete, distinct, exists, func, select
+from sqlalchemy.orm import aliased
+from app import db
+from app.models.cart import Cart, CartArchive
+from app.models.curso import Curso
+from app.utils.cart_summary import invalidate_cart_summary
+from app.utils.pagination import keyset_condition, keyset_order_by
+from app.utils.user_state import invalidate_user_state
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+
+def _sweep_batch(ids, cutoff, now, archive):
+    """
+    Elimina los elementos del lote que siguen abandonados y archiva los eliminados.
+
+    La exclusión de usuarios con actividad posterior al límite se repite en el
+    DELETE: si el usuario añade un curso entre la lectura del lote y el
+    borrado, sus elementos se conservan. Solo se archivan las filas que el
+    DELETE ha eliminado realmente (DELETE ... RETURNING).
+
+    Returns:
+        list: Filas eliminadas (id, user_id, curso_id, created_at)
+    """
+    recent = aliased(Cart)
+    deleted = db.session.execute(
+        delete(Cart)
+        .where(
+            Cart.id.in_(ids),
+            Cart.created_at < cutoff,
+            ~exists().where(recent.user_id == Cart.user_id, recent.created_at >= cutoff)
+        )
+        .returning(Cart.id, Cart.user_id, Cart.curso_id, Cart.created_at)
+    ).all()
+    if archive and deleted:
+        db.session.execute(CartArchive.__table__.insert(), [
+            {
+                'cart_id': row.id,
+                'user_id': row.user_id,
+                'curso_id': row.curso_id,
+                'created_at': row.created_at,
+                'archived_at': now
+            }
+            for row in deleted
+        ])
+    return deleted
+
+
+def sweep_abandoned_carts(days=None, batch_size=None, archive=True, dry_run=False, pause=0.0):
+    """
+    Retira los elementos de los carritos abandonados en lotes acotados.
+
+    Args:
+        days (int, optional): Días sin actividad. Por defecto, CART_ABANDON_DAYS.
+        batch_size (int, optional): Filas por lote. Por defecto, CART_SWEEP_BATCH_SIZE.
+        archive (bool, optional): Copiar los elementos a cart_archive antes de
+            eliminarlos. Por defecto True.
+        dry_run (bool, optional): Solo contar, sin modificar nada
+        pause (float, optional): Segundos de espera entre lotes
+
+    Returns:
+        dict: Recuento de elementos, usuarios y valor de los carritos retirados
+    """
+    days = days or current_app.config['CART_ABANDON_DAYS']
+    batch_size = batch_size or current_app.config['CART_SWEEP_BATCH_SIZE']
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=days)
+
+    report = {
+        'cutoff': cutoff.isoformat(),
+        'dry_run': dry_run,
+        'archived': archive and not dry_run,
+        'items': 0,
+        'users': 0,
+        'value': 0.0,
+        'skipped_active': 0,
+        'batches': 0,
+        'seconds': 0.0
+    }
+    start = time.perf_counter()
+    position = None
+    users = set()
+
+    while True:
+        query = (
+            select(Cart.id, Cart.user_id, Cart.created_at, Curso.precio)
+            .outerjoin(Curso, Curso.id == Cart.curso_id)
+            .where(Cart.created_at < cutoff)
+        )
+        if position is not None:
+            query = query.where(keyset_condition(Cart.created_at, Cart.id, *position))
+        rows = db.session.execute(query.order_by(*keyset_order_by(Cart.created_at, Cart.id)).limit(batch_size)).all()
+        if not rows:
+            break
+        position = (rows[-1].created_at, rows[-1].id)
+
+        # Los usuarios que han añadido algún curso después del límite siguen
+        # usando el carrito: sus elementos antiguos se conservan
+        user_ids = {row.user_id for row in rows}
+        active = set(db.session.execute(
+            select(distinct(Cart.user_id)).where(Cart.user_id.in_(user_ids), Cart.created_at >= cutoff)
+        ).scalars())
+        stale = [row for row in rows if row.user_id not in active]
+
+        if stale and not dry_run:
+            prices = {row.id: row.precio for row in stale}
+            swept = _sweep_batch(list(prices), cutoff, now, archive)
+            db.session.commit()
+            swept_users = {row.user_id for row in swept}
+            invalidate_cart_summary(*swept_users)
+            invalidate_user_state(*swept_users)
+            swept_value = sum(prices[row.id] or 0 for row in swept)
+        else:
+            # Cerrar la transacción de lectura entre lotes
+            db.session.rollback()
+            swept = stale
+            swept_users = user_ids - active
+            swept_value = sum(row.precio or 0 for row in stale)
+
+        report['skipped_active'] += len(rows) - len(swept)
+        report['items'] += len(swept)
+        users |= swept_users
+        report['value'] += swept_value
+        report['batches'] += 1
+
+        if pause:
+            time.sleep(pause)
+
+    report['users'] = len(users)
+    report['value'] = round(report['value'], 2)
+    report['seconds'] = round(time.perf_counter() - start, 3)
+    logger.info(
+        f"Barrido de carritos abandonados (límite {cutoff:%Y-%m-%d}): {report['items']} elementos de "
+        f"{report['users']} usuarios ({report['value']} EUR) en {report['batches']} lotes"
+        f"{' [simulación]' if dry_run else ''}"
+    )
+    return report
+
+
+def abandoned_carts_report(days=30, limit=10):
+    """
+    Resume los carritos abandonados archivados en los últimos días.
+
+    Args:
+        days (int, optional): Periodo en días. Por defecto 30.
+        limit (int, optional): Número de cursos más abandonados. Por defecto 10.
+
+    Returns:
+        dict: Elementos, usuarios y valor archivados y cursos más abandonados
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    recent = CartArchive.archived_at >= since
+
+    items, users, value = db.session.execute(
+        select(func.count(CartArchive.id), func.count(distinct(CartArchive.user_id)), func.coalesce(func.sum(Curso.precio), 0))
+        .outerjoin(Curso, Curso.id == CartArchive.curso_id)
+        .where(recent)
+    ).one()
+    top = db.session.execute(
+        select(CartArchive.curso_id, Curso.titulo, func.count().label('total'))
+        .outerjoin(Curso, Curso.id == CartArchive.curso_id)
+        .where(recent)
+        .group_by(CartArchive.curso_id, Curso.titulo)
+        .order_by(func.count().desc(), CartArchive.curso_id)
+        .limit(limit)
+    ).all()
+
+    return {
+        'days': days,
+        'items': items,
+        'users': users,
+        'value': round(float(value), 2),
+        'top_courses': [
+            {'curso_id': curso_id, 'titulo': titulo, 'count': total}
+            for curso_id, titulo, total in top
+        ]
+    }
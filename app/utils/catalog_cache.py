@@ -0,0 +1,92 @@
+"""
+Instantánea versionada del catálogo público de cursos.
+
+El listado de cursos se serializa una sola vez por versión del catálogo y se
+guarda en la caché como bytes JSON junto con su ETag. Cada commit que modifica
+un curso renueva la versión de la entidad 'curso' (ver app.models.curso), de
+modo que la siguiente petición reconstruye la instantánea.
+"""
+
+import hashlib
+import logging
+from flask import current_app, request
+from app.models.curso import Curso
+from app.utils.cache_versions import get_version, versioned_timeout
+from app.utils.single_flight import get_or_compute
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+CATALOG_SNAPSHOT_KEY = 'catalog:snapshot:{version}:{fields}'
+CATALOG_SNAPSHOT_TIMEOUT = 86400  # 24 horas con caché compartida; la clave ya incluye la versión
+
+# Campos del listado público cuando no se indica ?fields=
+CATALOG_FIELDS = ('id', 'titulo', 'descripcion', 'duracion', 'precio')
+
+
+def build_catalog_payload(fields=CATALOG_FIELDS):
+    """
+    Construye la respuesta completa del listado público de cursos.
+
+    Args:
+        fields (tuple, optional): Campos a incluir de cada curso
+
+    Returns:
+        dict: Respuesta estandarizada con la lista de cursos
+    """
+    cursos = Curso.query.options(Curso.load_only_fields(fields)).order_by(Curso.id).all()
+
+    return {
+        "success": True,
+        "message": "Cursos obtenidos correctamente",
+        "data": [curso.to_dict(fields) for curso in cursos]
+    }
+
+
+def get_catalog_snapshot(fields=None):
+    """
+    Devuelve la instantánea serializada del catálogo para la versión actual.
+
+    Cada selección de campos (ver Curso.parse_fields) tiene su propia instantánea.
+
+    Args:
+        fields (tuple, optional): Campos a incluir. Por defecto, CATALOG_FIELDS.
+
+    Returns:
+        tuple: (bytes, str) - Cuerpo JSON y ETag fuerte del contenido
+    """
+    fields = fields or CATALOG_FIELDS
+    key = CATALOG_SNAPSHOT_KEY.format(version=get_version('curso'), fields=','.join(fields))
+
+    def build():
+        body = current_app.json.dumps(build_catalog_payload(fields)).encode('utf-8')
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        logger.info(f"Instantánea del catálogo reconstruida ({len(body)} bytes)")
+        return body, etag
+
+    # Tras un cambio de versión, solo una petición reconstruye la instantánea
+    return get_or_compute(key, build, versioned_timeout(CATALOG_SNAPSHOT_TIMEOUT))
+
+
+def etag_matches(etag):
+    """
+    Comprueba si la cabecera If-None-Match de la solicitud coincide con el ETag.
+
+    Flask-Compress añade el sufijo ':<algoritmo>' al ETag de las respuestas
+    comprimidas, por lo que también se aceptan esas variantes.
+
+    Args:
+        etag (str): ETag (sin comillas) de la representación actual
+
+    Returns:
+        bool: True si el cliente ya tiene la representación actual
+    """
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return False
+    if if_none_match.star_tag:
+        return True
+    return any(
+        tag == etag or tag.startswith(f"{etag}:")
+        for tag in if_none_match.as_set(include_weak=True)
+    )
@@ -0,0 +1,216 @@
+"""
+Pago de varios cursos con una sola sesión de Stripe.
+
+El checkout desde el carrito lee todos los cursos del carrito con una sola
+consulta y crea una única sesión de Stripe con una línea por curso. Los IDs y
+los importes cobrados viajan en los metadatos de la sesión, de modo que el
+webhook registra el pedido con una inserción del pedido y una inserción masiva
+de sus líneas, sin volver a consultar los precios.
+
+Las líneas se insertan sin pasar por el ORM, así que los contadores de ventas
+y los accesos a los cursos, que normalmente mantienen los eventos de OrderItem,
+se actualizan aquí de forma explícita dentro de la misma transacción.
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.cart import Cart
+from app.models.curso import Curso
+from app.models.curso_stats import PAID_STATUS, apply_sales_deltas
+from app.models.entitlement import Entitlement, grant_order
+from app.models.order import Order, OrderItem
+from app.utils.cart_summary import invalidate_cart_summary
+from app.utils.model_events import mark_changed
+from app.utils.user_state import invalidate_user_state
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Stripe admite 100 líneas por sesión y 500 caracteres por valor de metadatos
+MAX_CHECKOUT_ITEMS = 50
+
+
+class CheckoutError(ValueError):
+    """No se puede crear el checkout solicitado."""
+
+
+def to_cents(precio):
+    """Convierte un precio en euros a céntimos (redondeo al céntimo más próximo)."""
+    return int(round(precio * 100))
+
+
+def cart_checkout_courses(user_id):
+    """
+    Cursos del carrito de un usuario que puede comprar, con una sola consulta.
+
+    Se excluyen los cursos que el usuario ya tiene comprados.
+
+    Args:
+        user_id (int): ID del usuario
+
+    Returns:
+        list: Filas (id, titulo, descripcion, imagen_url, precio) en el orden del carrito
+
+    Raises:
+        CheckoutError: Si el carrito está vacío, es demasiado grande o contiene
+            cursos sin precio
+    """
+    owned = select(Entitlement.curso_id).where(Entitlement.user_id == user_id)
+    rows = db.session.execute(
+        select(Curso.id, Curso.titulo, Curso.descripcion, Curso.imagen_url, Curso.precio)
+        .join(Cart, Cart.curso_id == Curso.id)
+        .where(Cart.user_id == user_id, Curso.id.not_in(owned))
+        .order_by(Cart.created_at, Cart.id)
+    ).all()
+
+    if not rows:
+        raise CheckoutError("El carrito no contiene cursos pendientes de compra")
+    if len(rows) > MAX_CHECKOUT_ITEMS:
+        raise CheckoutError(f"El carrito no puede tener más de {MAX_CHECKOUT_ITEMS} cursos para el pago")
+    without_price = [row.id for row in rows if row.precio is None]
+    if without_price:
+        raise CheckoutError(f"Cursos sin precio en el carrito: {without_price}")
+    return rows
+
+
+def line_item(curso):
+    """
+    Línea de la sesión de Stripe para un curso.
+
+    Args:
+        curso: Curso o fila con titulo, descripcion, imagen_url y precio
+
+    Returns:
+        dict: Elemento de line_items
+    """
+    return {
+        'price_data': {
+            'currency': 'eur',
+            'product_data': {
+                'name': curso.titulo,
+                'description': curso.descripcion,
+                'images': [curso.imagen_url] if curso.imagen_url else [],
+            },
+            'unit_amount': to_cents(curso.precio),
+        },
+        'quantity': 1,
+    }
+
+
+def cart_metadata(user_id, courses):
+    """Metadatos de la sesión con los IDs de los cursos y los importes cobrados."""
+    return {
+        'user_id': str(user_id),
+        'source': 'cart',
+        'course_ids': ','.join(str(curso.id) for curso in courses),
+        'unit_amounts': ','.join(str(to_cents(curso.precio)) for curso in courses),
+    }
+
+
+def as_dict(stripe_object):
+    """Convierte un objeto de Stripe en diccionario (las versiones recientes no lo son)."""
+    return stripe_object.to_dict() if hasattr(stripe_object, 'to_dict') else stripe_object
+
+
+def items_from_session(session):
+    """
+    Líneas del pedido a partir de una sesión de Stripe completada.
+
+    Args:
+        session: Objeto checkout.session (StripeObject o diccionario)
+
+    Returns:
+        list: Pares (curso_id, precio en euros); vacía si faltan los metadatos
+    """
+    session = as_dict(session)
+    metadata = session.get('metadata') or {}
+    if metadata.get('course_ids'):
+        curso_ids = [int(value) for value in metadata['course_ids'].split(',')]
+        amounts = [int(value) for value in metadata.get('unit_amounts', '').split(',') if value]
+        if len(amounts) != len(curso_ids):
+            raise ValueError("Los metadatos de la sesión no tienen un importe por curso")
+        return [(curso_id, amount / 100) for curso_id, amount in zip(curso_ids, amounts)]
+    if metadata.get('course_id'):
+        # Sesiones de un solo curso
+        return [(int(metadata['course_id']), (session.get('amount_total') or 0) / 100)]
+    return []
+
+
+def record_paid_order(user_id, payment_id, items, total_amount, payment_method='stripe'):
+    """
+    Registra un pedido pagado con todas sus líneas y vacía esos cursos del carrito.
+
+    Es idempotente respecto a payment_id: si Stripe reenvía el evento, se
+    devuelve el pedido ya registrado sin volver a escribirlo. Si dos entregas
+    del evento llegan a la vez, el índice único de payment_id rechaza la
+    segunda inserción y también se devuelve el pedido de la primera.
+
+    Args:
+        user_id (int): ID del usuario
+        payment_id (str): ID de la sesión de Stripe
+        items (list): Pares (curso_id, precio)
+        total_amount (float): Importe total cobrado
+        payment_method (str, optional): Método de pago. Por defecto 'stripe'.
+
+    Returns:
+        tuple: (order_id, created)
+    """
+    existing = db.session.execute(
+        select(Order.id).where(Order.payment_id == payment_id)
+    ).scalar()
+    if existing is not None:
+        return existing, False
+
+    order = Order(
+        user_id=user_id,
+        total_amount=total_amount,
+        status=PAID_STATUS,
+        payment_id=payment_id,
+        payment_method=payment_method,
+        created_at=datetime.now(timezone.utc)
+    )
+    db.session.add(order)
+    try:
+        db.session.flush()  # Para obtener el ID del pedido
+    except IntegrityError:
+        db.session.rollback()
+        existing = db.session.execute(
+            select(Order.id).where(Order.payment_id == payment_id)
+        ).scalar()
+        if existing is None:
+            raise
+        logger.info(f"Pago {payment_id} ya registrado en el pedido {existing}")
+        return existing, False
+    order_id = order.id
+
+    connection = db.session.connection()
+    connection.execute(OrderItem.__table__.insert(), [
+        {'order_id': order_id, 'curso_id': curso_id, 'price': price, 'quantity': 1}
+        for curso_id, price in items
+    ])
+
+    # Los eventos de OrderItem no se disparan con la inserción masiva
+    sales, revenue = Counter(), Counter()
+    for curso_id, price in items:
+        sales[curso_id] += 1
+        revenue[curso_id] += price
+    apply_sales_deltas(connection, sales, revenue)
+    granted = grant_order(connection, order_id)
+    if granted:
+        mark_changed(db.session, Entitlement, upserted_ids=granted)
+
+    curso_ids = [curso_id for curso_id, _ in items]
+    removed = connection.execute(
+        delete(Cart).where(Cart.user_id == user_id, Cart.curso_id.in_(curso_ids))
+    ).rowcount
+    db.session.commit()
+
+    if removed:
+        invalidate_cart_summary(user_id)
+        invalidate_user_state(user_id)
+    logger.info(f"Pedido {order_id} registrado ({len(items)} cursos, pago {payment_id})")
+    return order_id, True
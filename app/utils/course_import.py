@@ -0,0 +1,305 @@
+"""
+Importación masiva de cursos desde CSV o JSONL.
+
+Las filas se leen y validan de una en una a partir de un stream y se insertan
+en lotes con un único INSERT de varias filas (executemany) por transacción, de
+modo que el consumo de memoria no depende del tamaño del fichero. El informe
+de errores por fila se limita a MAX_REPORTED_ERRORS entradas.
+
+Los INSERT masivos no pasan por el flush del ORM, así que los recuentos de
+facetas, los tombstones y las versiones de caché de los cursos se actualizan
+explícitamente en cada lote.
+"""
+
+import codecs
+import csv
+import json
+import logging
+from collections import Counter
+from sqlalchemy import insert, delete
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models.curso import Curso
+from app.models.curso_facet import facet_values, apply_facet_deltas
+from app.models.curso_tombstone import CursoTombstone
+from app.utils.model_events import mark_changed
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+# Nombres alternativos aceptados en los ficheros (los del panel de administración)
+FIELD_ALIASES = {
+    'title': 'titulo',
+    'description': 'descripcion',
+    'duration': 'duracion',
+    'price': 'precio',
+    'image_url': 'imagen_url',
+    'level': 'nivel',
+    'featured': 'destacado',
+    'active': 'activo',
+}
+
+# Campos de texto importables y su longitud máxima (None = sin límite)
+TEXT_FIELDS = {
+    'titulo': 100,
+    'descripcion': None,
+    'duracion': 50,
+    'imagen_url': 255,
+    'nivel': 50,
+    'instructor': 100,
+}
+REQUIRED_FIELDS = ('titulo', 'descripcion')
+BOOLEAN_FIELDS = ('destacado', 'activo')
+
+TRUE_VALUES = {'1', 'true', 'yes', 'si', 'sí', 'on'}
+FALSE_VALUES = {'0', 'false', 'no', 'off', ''}
+
+
+class ImportFormatError(ValueError):
+    """Formato de importación no soportado."""
+
+
+def detect_format(filename=None, content_type=None):
+    """
+    Deduce el formato de importación a partir del nombre o el tipo de contenido.
+
+    Args:
+        filename (str, optional): Nombre del fichero subido
+        content_type (str, optional): Cabecera Content-Type de la solicitud
+
+    Returns:
+        str: 'csv', 'jsonl' o None si no se puede deducir
+    """
+    if filename:
+        extension = filename.rsplit('.', 1)[-1].lower()
+        if extension == 'csv':
+            return 'csv'
+        if extension in ('jsonl', 'ndjson'):
+            return 'jsonl'
+    if content_type:
+        mimetype = content_type.split(';', 1)[0].strip().lower()
+        if mimetype == 'text/csv':
+            return 'csv'
+        if mimetype in ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines'):
+            return 'jsonl'
+    return None
+
+
+def _text_lines(stream):
+    """Decodifica un stream binario (o de texto) línea a línea en UTF-8."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    for line in stream:
+        yield decoder.decode(line) if isinstance(line, bytes) else line
+
+
+def iter_csv_rows(stream):
+    """
+    Recorre las filas de un CSV con cabecera.
+
+    Yields:
+        tuple: (número de línea, dict de la fila o None, error o None)
+    """
+    reader = csv.DictReader(_text_lines(stream))
+    for row in reader:
+        if None in row:
+            yield reader.line_num, None, "La fila tiene más columnas que la cabecera"
+        else:
+            yield reader.line_num, row, None
+
+
+def iter_jsonl_rows(stream):
+    """
+    Recorre las líneas de un fichero JSONL (un objeto JSON por línea).
+
+    Yields:
+        tuple: (número de línea, dict de la fila o None, error o None)
+    """
+    for line_number, line in enumerate(_text_lines(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"JSON no válido: {str(e)}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Cada línea debe ser un objeto JSON"
+            continue
+        yield line_number, row, None
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError
+
+
+def validate_row(row):
+    """
+    Valida una fila y la convierte en los valores de columna de Curso.
+
+    Args:
+        row (dict): Fila leída del fichero
+
+    Returns:
+        tuple: (dict con los valores, lista de errores)
+    """
+    data = {FIELD_ALIASES.get(str(key).strip().lower(), str(key).strip().lower()): value
+            for key, value in row.items()}
+    values = {}
+    errors = []
+
+    for field, max_length in TEXT_FIELDS.items():
+        value = data.get(field)
+        value = str(value).strip() if value is not None else ''
+        if not value:
+            if field in REQUIRED_FIELDS:
+                errors.append(f"El campo '{field}' es requerido")
+            continue
+        if max_length and len(value) > max_length:
+            errors.append(f"El campo '{field}' supera los {max_length} caracteres")
+            continue
+        values[field] = value
+
+    precio = data.get('precio')
+    if precio is not None and str(precio).strip() != '':
+        try:
+            values['precio'] = float(str(precio).strip().replace(',', '.'))
+            if values['precio'] < 0:
+                errors.append("El campo 'precio' no puede ser negativo")
+        except ValueError:
+            errors.append("El campo 'precio' debe ser numérico")
+
+    for field in BOOLEAN_FIELDS:
+        if data.get(field) is None:
+            continue
+        try:
+            values[field] = _parse_bool(data[field])
+        except ValueError:
+            errors.append(f"El campo '{field}' debe ser booleano")
+
+    return values, errors
+
+
+def _insert_batch(batch):
+    """
+    Inserta un lote de cursos en una transacción y actualiza facetas y cachés.
+
+    Args:
+        batch (list): Valores de columna de cada curso
+
+    Returns:
+        int: Número de cursos insertados
+    """
+    table = Curso.__table__
+    # Todas las filas deben tener las mismas claves para el executemany
+    rows = []
+    for values in batch:
+        row = {column: values.get(column) for column in TEXT_FIELDS}
+        row['precio'] = values.get('precio')
+        row['destacado'] = values.get('destacado', False)
+        row['activo'] = values.get('activo', True)
+        rows.append(row)
+
+    ids = db.session.scalars(insert(table).returning(table.c.id), rows).all()
+
+    # IDs reutilizados de cursos eliminados dejan de estar eliminados
+    db.session.execute(delete(CursoTombstone.__table__).where(CursoTombstone.curso_id.in_(ids)))
+
+    deltas = Counter()
+    for row in rows:
+        deltas.update(facet_values(row))
+    apply_facet_deltas(db.session.connection(), deltas)
+
+    mark_changed(db.session, Curso, upserted_ids=ids)
+    db.session.commit()
+    return len(ids)
+
+
+def import_courses(stream, fmt, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Importa cursos desde un stream CSV o JSONL.
+
+    Las filas válidas se insertan en lotes de batch_size; las no válidas se
+    omiten y se incluyen en el informe de errores.
+
+    Args:
+        stream: Stream binario o de texto con el contenido del fichero
+        fmt (str): 'csv' o 'jsonl'
+        batch_size (int, optional): Filas por transacción. Por defecto IMPORT_BATCH_SIZE.
+        dry_run (bool, optional): Solo validar, sin insertar
+
+    Returns:
+        dict: Recuentos de filas procesadas, importadas y con error, y los errores por fila
+    """
+    if fmt == 'csv':
+        rows = iter_csv_rows(stream)
+    elif fmt == 'jsonl':
+        rows = iter_jsonl_rows(stream)
+    else:
+        raise ImportFormatError(f"Formato no soportado: {fmt}. Use uno de: {', '.join(IMPORT_FORMATS)}")
+
+    report = {
+        "processed": 0,
+        "imported": 0,
+        "failed": 0,
+        "dry_run": dry_run,
+        "errors": [],
+        "errors_truncated": False
+    }
+
+    def add_error(line_number, messages):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"row": line_number, "errors": messages})
+        else:
+            report["errors_truncated"] = True
+
+    def flush(batch, line_numbers):
+        if dry_run:
+            report["imported"] += len(batch)
+            return
+        try:
+            report["imported"] += _insert_batch(batch)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Error al insertar un lote de cursos: {str(e)}", exc_info=True)
+            for line_number in line_numbers:
+                add_error(line_number, [f"Error de base de datos al insertar el lote: {e.__class__.__name__}"])
+
+    batch = []
+    line_numbers = []
+    for line_number, row, error in rows:
+        report["processed"] += 1
+        if error:
+            add_error(line_number, [error])
+            continue
+
+        values, errors = validate_row(row)
+        if errors:
+            add_error(line_number, errors)
+            continue
+
+        batch.append(values)
+        line_numbers.append(line_number)
+        if len(batch) >= batch_size:
+            flush(batch, line_numbers)
+            batch, line_numbers = [], []
+
+    if batch:
+        flush(batch, line_numbers)
+
+    logger.info(
+        f"Importación de cursos: {report['processed']} filas, "
+        f"{report['imported']} importadas, {report['failed']} con error"
+    )
+    return report
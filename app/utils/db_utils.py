@@ -0,0 +1,55 @@
+"""
+Utilidades para construir sentencias SQL dependientes del motor de base de
+datos y para los eventos de modelo que necesitan los valores anteriores.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def dialect_insert(table, bind):
+    """
+    Devuelve un INSERT con soporte de ON CONFLICT para el motor de la conexión.
+
+    Solo SQLite y PostgreSQL admiten on_conflict_do_nothing() y
+    on_conflict_do_update(), que usan todos los llamadores.
+
+    Args:
+        table: Tabla o modelo sobre el que insertar
+        bind: Conexión, sesión o engine (se usa su dialecto)
+
+    Returns:
+        Insert: Sentencia INSERT del dialecto correspondiente
+
+    Raises:
+        NotImplementedError: Si el motor no admite INSERT ... ON CONFLICT
+    """
+    dialect = bind.get_bind().dialect.name if hasattr(bind, 'get_bind') else bind.dialect.name
+    if dialect == 'sqlite':
+        return sqlite.insert(table)
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    raise NotImplementedError(
+        f"INSERT ... ON CONFLICT no está disponible para el motor '{dialect}'; "
+        "la aplicación requiere SQLite o PostgreSQL"
+    )
+
+
+
+def _ignore_set(target, value, oldvalue, initiator):
+    pass
+
+
+def track_previous_values(*attributes):
+    """
+    Hace que get_history() devuelva siempre el valor anterior de los atributos.
+
+    Por defecto, al asignar un atributo de un objeto expirado (por ejemplo,
+    después de un commit) SQLAlchemy no carga el valor anterior, y los eventos
+    after_update no pueden saber qué ha cambiado.
+
+    Args:
+        *attributes: Atributos instrumentados del modelo (p. ej. Curso.nivel)
+    """
+    for attribute in attributes:
+        event.listen(attribute, 'set', _ignore_set, active_history=True)
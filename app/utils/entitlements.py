@@ -0,0 +1,98 @@
+"""
+Caché por usuario de los cursos comprados, para comprobar el acceso.
+
+Cada usuario tiene en la caché el conjunto de IDs de sus cursos, de modo que
+comprobar el acceso a un curso es una sola lectura de caché. Tras cada commit
+que modifica la tabla entitlements, los conjuntos de los usuarios afectados se
+recalculan y se escriben (write-through). Las lecturas que no encuentran la
+entrada la rellenan con add(), que nunca pisa un valor escrito tras un commit.
+"""
+
+import logging
+from collections import defaultdict
+from sqlalchemy import select
+from app import db, cache
+from app.models.entitlement import Entitlement
+from app.utils.cache_versions import versioned_timeout
+from app.utils.model_events import on_commit
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+ENTITLEMENTS_KEY = 'entitlements:{user_id}'
+ENTITLEMENTS_TIMEOUT = 86400  # 24 horas con caché compartida; se actualiza tras cada cambio
+MAX_REFRESH_USERS = 1000      # Por encima, las entradas se borran en lugar de recalcularse
+
+
+def _key(user_id):
+    return ENTITLEMENTS_KEY.format(user_id=int(user_id))
+
+
+def _load(connection, user_ids):
+    owned = defaultdict(set)
+    rows = connection.execute(
+        select(Entitlement.user_id, Entitlement.curso_id).where(Entitlement.user_id.in_(user_ids))
+    )
+    for user_id, curso_id in rows:
+        owned[user_id].add(curso_id)
+    return {user_id: frozenset(owned[user_id]) for user_id in user_ids}
+
+
+def get_owned_course_ids(user_id):
+    """
+    Obtiene los IDs de los cursos comprados por un usuario.
+
+    Args:
+        user_id (int): ID del usuario
+
+    Returns:
+        frozenset: IDs de los cursos
+    """
+    key = _key(user_id)
+    owned = cache.get(key)
+    if owned is None:
+        owned = _load(db.session, [int(user_id)])[int(user_id)]
+        cache.add(key, owned, timeout=versioned_timeout(ENTITLEMENTS_TIMEOUT))
+    return owned
+
+
+def user_owns_course(user_id, curso_id):
+    """
+    Comprueba si un usuario ha comprado un curso.
+
+    Args:
+        user_id (int): ID del usuario
+        curso_id (int): ID del curso
+
+    Returns:
+        bool: True si tiene acceso al curso
+    """
+    return int(curso_id) in get_owned_course_ids(user_id)
+
+
+def refresh_entitlements(user_ids):
+    """
+    Recalcula y guarda en la caché los cursos de varios usuarios.
+
+    Debe llamarse después del commit que modifica sus accesos.
+
+    Args:
+        user_ids (iterable): IDs de los usuarios
+    """
+    user_ids = sorted({int(user_id) for user_id in user_ids})
+    if not user_ids:
+        return
+    if len(user_ids) > MAX_REFRESH_USERS:
+        # Cambios masivos (por ejemplo, la reconstrucción completa)
+        cache.delete_many(*(_key(user_id) for user_id in user_ids))
+        return
+    # La sesión ya no puede emitir SQL tras el commit: se usa otra conexión
+    with db.engine.connect() as connection:
+        owned = _load(connection, user_ids)
+    cache.set_many({_key(user_id): courses for user_id, courses in owned.items()}, timeout=versioned_timeout(ENTITLEMENTS_TIMEOUT))
+
+
+@on_commit(Entitlement)
+def _actualizar_cursos_comprados(changes):
+    """Actualiza la caché de los usuarios con accesos concedidos o retirados."""
+    refresh_entitlements(user_id for user_id, _ in changes.ids)
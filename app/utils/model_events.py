@@ -0,0 +1,175 @@
+"""
+Notificación de cambios en los modelos tras el commit de la transacción.
+
+Durante cada flush se recogen los registros insertados, modificados y
+eliminados de los modelos con callbacks registrados. Cuando la transacción
+se confirma, cada callback recibe un ChangeSet con esos cambios; si se
+deshace, los cambios pendientes se descartan. Así la caché solo se invalida
+con datos que ya son visibles para el resto de workers.
+"""
+
+import logging
+from itertools import chain
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as SASession
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = 'model_changes'
+
+# Modelo -> lista de callbacks a ejecutar tras el commit
+_commit_callbacks = {}
+
+
+class ChangeSet:
+    """Registros de un modelo modificados en una transacción."""
+
+    def __init__(self):
+        self.upserted = {}  # ID -> valores de las columnas cargadas
+        self.deleted = {}   # ID -> valores de las columnas cargadas
+        self.changed = {}   # ID -> columnas modificadas (None: todas o desconocidas)
+
+    @property
+    def ids(self):
+        """IDs de todos los registros afectados."""
+        return set(self.upserted) | set(self.deleted)
+
+    def _add_changed(self, entity_id, attributes):
+        if attributes is None:
+            self.changed[entity_id] = None
+        elif entity_id not in self.changed:
+            self.changed[entity_id] = set(attributes)
+        elif self.changed[entity_id] is not None:
+            self.changed[entity_id].update(attributes)
+
+    def changed_any(self, entity_id, *attributes):
+        """
+        Indica si alguna de las columnas de un registro insertado o modificado ha cambiado.
+
+        Los registros insertados, y los registrados con mark_changed sin
+        indicar columnas, cuentan como cambiados en todas sus columnas.
+
+        Args:
+            entity_id: ID del registro
+            *attributes: Nombres de las columnas
+
+        Returns:
+            bool: True si alguna de las columnas ha cambiado o no se sabe
+        """
+        changed = self.changed.get(entity_id)
+        return changed is None or not changed.isdisjoint(attributes)
+
+    def __bool__(self):
+        return bool(self.upserted or self.deleted)
+
+
+def on_commit(model):
+    """
+    Registra un callback que recibe el ChangeSet de un modelo tras cada commit.
+
+    Args:
+        model: Clase del modelo a observar
+
+    Returns:
+        function: Decorador que registra el callback
+    """
+    def decorator(func):
+        _commit_callbacks.setdefault(model, []).append(func)
+        return func
+    return decorator
+
+
+def _pending(session, model):
+    changes = session.info.setdefault(_PENDING_KEY, {})
+    if model not in changes:
+        changes[model] = ChangeSet()
+    return changes[model]
+
+
+def _snapshot(state):
+    """Valores de las columnas ya cargadas, sin provocar nuevas consultas."""
+    return {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict
+    }
+
+
+def _modified_columns(state):
+    """Columnas con cambios pendientes en el registro."""
+    return [
+        attr.key for attr in state.mapper.column_attrs
+        if state.attrs[attr.key].history.has_changes()
+    ]
+
+
+def mark_changed(session, model, upserted_ids=(), deleted_ids=(), attributes=None):
+    """
+    Registra cambios hechos con sentencias masivas que no pasan por el flush del ORM.
+
+    Args:
+        session: Sesión de SQLAlchemy en la que se ejecutaron las sentencias
+        model: Clase del modelo afectado
+        upserted_ids (iterable, optional): IDs insertados o modificados
+        deleted_ids (iterable, optional): IDs eliminados
+        attributes (iterable, optional): Columnas modificadas en upserted_ids.
+            Por defecto se consideran modificadas todas.
+    """
+    changes = _pending(session, model)
+    for entity_id in upserted_ids:
+        changes.upserted.setdefault(entity_id, {})
+        changes._add_changed(entity_id, attributes)
+    for entity_id in deleted_ids:
+        changes.upserted.pop(entity_id, None)
+        changes.changed.pop(entity_id, None)
+        changes.deleted.setdefault(entity_id, {})
+
+
+@event.listens_for(SASession, 'after_flush')
+def _collect_changes(session, flush_context):
+    if not _commit_callbacks:
+        return
+
+    for obj in chain(session.new, session.dirty, session.deleted):
+        model = type(obj)
+        if model not in _commit_callbacks:
+            continue
+
+        state = inspect(obj)
+        identity = state.identity or state.mapper.primary_key_from_instance(obj)
+        entity_id = identity[0] if len(identity) == 1 else tuple(identity)
+        changes = _pending(session, model)
+
+        if obj in session.deleted:
+            changes.upserted.pop(entity_id, None)
+            changes.changed.pop(entity_id, None)
+            changes.deleted[entity_id] = _snapshot(state)
+        elif obj in session.new:
+            changes.upserted.setdefault(entity_id, {}).update(_snapshot(state))
+            changes._add_changed(entity_id, None)
+        elif session.is_modified(obj, include_collections=False):
+            changes.upserted.setdefault(entity_id, {}).update(_snapshot(state))
+            changes._add_changed(entity_id, _modified_columns(state))
+
+
+@event.listens_for(SASession, 'after_commit')
+def _dispatch_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    for model, changes in pending.items():
+        if not changes:
+            continue
+        for callback in _commit_callbacks.get(model, []):
+            try:
+                callback(changes)
+            except Exception as e:
+                # La transacción ya está confirmada: solo se registra el error
+                logger.error(f"Error en callback tras commit de {model.__name__}: {e}", exc_info=True)
+
+
+@event.listens_for(SASession, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,180 @@
+"""
+Utilidades para la paginación por cursor (keyset pagination).
+
+En lugar de OFFSET, cada página continúa a partir de la última fila de la
+anterior, de modo que el coste de una página no depende de su posición.
+El cursor es opaco para el cliente: codifica la clave de ordenación y el ID
+de la última fila devuelta.
+"""
+
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+class InvalidCursorError(ValueError):
+    """Se lanza cuando el cursor recibido no se puede decodificar."""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def _pack(data):
+    raw = json.dumps(data, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _unpack(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+
+
+def encode_cursor(sort, value, last_id):
+    """
+    Codifica la posición de la última fila de una página.
+
+    Args:
+        sort (str): Criterio de ordenación con el que se generó la página
+        value (any): Valor de la columna de ordenación de la última fila
+        last_id (int): ID de la última fila
+
+    Returns:
+        str: Cursor opaco en base64 apto para URLs
+    """
+    return _pack({'s': sort, 'v': _encode_value(value), 'id': last_id})
+
+
+def decode_cursor(cursor, sort):
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Args:
+        cursor (str): Cursor recibido del cliente
+        sort (str): Criterio de ordenación de la solicitud actual
+
+    Returns:
+        tuple: (valor, id) de la última fila de la página anterior
+
+    Raises:
+        InvalidCursorError: Si el cursor es inválido o no corresponde a la ordenación
+    """
+    try:
+        data = _unpack(cursor)
+        value, last_id = _decode_value(data['v']), int(data['id'])
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError("Cursor inválido") from e
+
+    if data.get('s') != sort:
+        raise InvalidCursorError("El cursor no corresponde a la ordenación solicitada")
+
+    return value, last_id
+
+
+def encode_positions(kind, **positions):
+    """
+    Codifica varias posiciones (valor, id) independientes en un solo cursor.
+
+    Se usa cuando una respuesta recorre varias tablas, cada una con su propio
+    keyset (por ejemplo, cursos modificados y cursos eliminados).
+
+    Args:
+        kind (str): Tipo de cursor, para rechazar cursores de otros endpoints
+        **positions: Tuplas (valor, id) por nombre de posición
+
+    Returns:
+        str: Cursor opaco en base64 apto para URLs
+    """
+    return _pack({
+        's': kind,
+        'p': {name: [_encode_value(value), last_id] for name, (value, last_id) in positions.items()}
+    })
+
+
+def decode_positions(cursor, kind, names):
+    """
+    Decodifica un cursor generado por encode_positions.
+
+    Args:
+        cursor (str): Cursor recibido del cliente
+        kind (str): Tipo de cursor esperado
+        names (iterable): Nombres de las posiciones requeridas
+
+    Returns:
+        dict: Tupla (valor, id) por nombre de posición
+
+    Raises:
+        InvalidCursorError: Si el cursor es inválido o de otro tipo
+    """
+    try:
+        data = _unpack(cursor)
+        positions = {
+            name: (_decode_value(data['p'][name][0]), int(data['p'][name][1]))
+            for name in names
+        }
+    except (ValueError, TypeError, KeyError, IndexError) as e:
+        raise InvalidCursorError("Cursor inválido") from e
+
+    if data.get('s') != kind:
+        raise InvalidCursorError("El cursor no corresponde a este recurso")
+
+    return positions
+
+
+def keyset_order_by(column, id_column, descending=False):
+    """
+    Devuelve las cláusulas ORDER BY para una paginación por cursor.
+
+    Los NULL se ordenan primero en orden ascendente y al final en orden
+    descendente (el comportamiento por defecto de SQLite), de forma explícita
+    para que el resultado sea el mismo en otros motores.
+    """
+    if descending:
+        return [column.desc().nulls_last(), id_column.desc()]
+    return [column.asc().nulls_first(), id_column.asc()]
+
+
+def keyset_condition(column, id_column, value, last_id, descending=False):
+    """
+    Construye la condición WHERE que selecciona las filas posteriores al cursor.
+
+    Es coherente con el orden de keyset_order_by, incluido el tratamiento de
+    los valores NULL en la columna de ordenación.
+
+    Args:
+        column: Columna de ordenación
+        id_column: Columna ID usada como desempate
+        value (any): Valor de la columna de ordenación de la última fila
+        last_id (int): ID de la última fila
+        descending (bool): True si el orden es descendente
+
+    Returns:
+        Expresión SQLAlchemy para filtrar la consulta
+    """
+    if descending:
+        if value is None:
+            return and_(column.is_(None), id_column < last_id)
+        return or_(
+            column < value,
+            and_(column == value, id_column < last_id),
+            column.is_(None)
+        )
+
+    if value is None:
+        return or_(
+            and_(column.is_(None), id_column > last_id),
+            column.isnot(None)
+        )
+    return or_(
+        column > value,
+        and_(column == value, id_column > last_id)
+    )
@@ -0,0 +1,153 @@
+"""
+Hash y verificación de contraseñas con bcrypt en un pool de procesos acotado.
+
+bcrypt es deliberadamente costoso en CPU: ejecutado en el hilo de la petición,
+un pico de logins deja todos los workers ocupados calculando hashes y el resto
+de endpoints esperan. Aquí el trabajo se envía a un ProcessPoolExecutor con
+PASSWORD_HASH_WORKERS procesos y, como mucho, PASSWORD_HASH_MAX_PENDING
+operaciones en curso o en cola. Cuando el pool está lleno, la operación se
+rechaza con PasswordHashingBusy en lugar de acumular peticiones. La
+aplicación tiene un manejador de errores para esta excepción que responde 503
+con Retry-After, así que las rutas que capturan Exception deben dejarla pasar.
+
+El coste de bcrypt se configura con BCRYPT_LOG_ROUNDS; needs_rehash indica si
+un hash se generó con otro coste para actualizarlo en el siguiente login.
+Los hashes son compatibles con los generados por Flask-Bcrypt.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import bcrypt
+from flask import current_app
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_pid = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+class PasswordHashingBusy(RuntimeError):
+    """El pool de hash de contraseñas está saturado."""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _verify(hashed, password):
+    return bcrypt.checkpw(password, hashed)
+
+
+def _get_pool(workers, max_pending):
+    """Pool del proceso actual (se crea al primer uso y tras un fork)."""
+    global _pool, _pool_pid, _slots
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # spawn evita heredar los hilos y conexiones del servidor
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_pid = os.getpid()
+            _slots = threading.BoundedSemaphore(max(max_pending, workers))
+        return _pool, _slots
+
+
+def shutdown_pool():
+    """Detiene el pool de procesos (se vuelve a crear si se necesita)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def _run(func, *args):
+    """Ejecuta func en el pool respetando el límite de operaciones pendientes."""
+    config = current_app.config
+    workers = config['PASSWORD_HASH_WORKERS']
+    if workers <= 0:
+        # Sin pool (scripts, pruebas): se ejecuta en el hilo actual
+        return func(*args)
+
+    pool, slots = _get_pool(workers, config['PASSWORD_HASH_MAX_PENDING'])
+    if not slots.acquire(timeout=config['PASSWORD_HASH_QUEUE_TIMEOUT']):
+        logger.warning("Pool de hash de contraseñas saturado: operación rechazada")
+        raise PasswordHashingBusy("Demasiadas operaciones de contraseña en curso")
+    try:
+        future = pool.submit(func, *args)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+
+    try:
+        return future.result(timeout=config['PASSWORD_HASH_TIMEOUT'])
+    except FutureTimeoutError:
+        raise PasswordHashingBusy("La operación de contraseña ha tardado demasiado")
+
+
+def hash_password(password, rounds=None):
+    """
+    Genera el hash bcrypt de una contraseña.
+
+    Args:
+        password (str): Contraseña en claro
+        rounds (int, optional): Coste de bcrypt. Por defecto, BCRYPT_LOG_ROUNDS.
+
+    Returns:
+        str: Hash bcrypt
+
+    Raises:
+        PasswordHashingBusy: Si el pool está saturado
+    """
+    rounds = rounds or current_app.config['BCRYPT_LOG_ROUNDS']
+    return _run(_hash, password.encode('utf-8'), rounds)
+
+
+def verify_password(hashed, password):
+    """
+    Comprueba una contraseña contra su hash bcrypt.
+
+    Args:
+        hashed (str): Hash almacenado
+        password (str): Contraseña en claro
+
+    Returns:
+        bool: True si la contraseña es correcta
+
+    Raises:
+        PasswordHashingBusy: Si el pool está saturado
+    """
+    return _run(_verify, hashed.encode('utf-8'), password.encode('utf-8'))
+
+
+def hash_rounds(hashed):
+    """Coste con el que se generó un hash bcrypt ($2b$<coste>$...), o None."""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed, rounds=None):
+    """
+    Indica si un hash se generó con un coste distinto del configurado.
+
+    Args:
+        hashed (str): Hash almacenado
+        rounds (int, optional): Coste esperado. Por defecto, BCRYPT_LOG_ROUNDS.
+
+    Returns:
+        bool: True si conviene volver a generar el hash
+    """
+    rounds = rounds or current_app.config['BCRYPT_LOG_ROUNDS']
+    return hash_rounds(hashed) != rounds
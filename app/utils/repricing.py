@@ -0,0 +1,325 @@
+"""
+Cambio masivo de precios de cursos con vista previa.
+
+Los cursos se seleccionan con un filtro y los nuevos precios se calculan con
+NumPy sobre todas las filas seleccionadas a la vez. La vista previa resume la
+distribución de precios antes y después y el impacto en ingresos estimado con
+las ventas acumuladas (curso_stats). Al aplicar, los mismos precios se
+escriben con un único UPDATE por conjunto desde una tabla temporal, en la
+misma transacción que actualiza las facetas de precio; las versiones de caché
+de todos los cursos afectados se renuevan con una sola escritura tras el commit.
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import Column, Float, Integer, MetaData, Table, select, update
+from app import db
+from app.models.curso import Curso
+from app.models.curso_facet import PRICE_BANDS, FREE_BAND, price_band, apply_facet_deltas
+from app.models.curso_stats import CursoStats
+from app.utils.model_events import mark_changed
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+ROUNDING_MODES = ('cents', 'integer', 'charm')
+MAX_PERCENT_CHANGE = 100  # Como máximo, duplicar el precio
+PREVIEW_SAMPLE_SIZE = 20
+
+
+class RepricingError(ValueError):
+    """Filtro o regla de precios no válidos."""
+
+
+def _number(data, key, minimum=None):
+    if data.get(key) is None:
+        return None
+    try:
+        value = float(data[key])
+    except (TypeError, ValueError):
+        raise RepricingError(f"El campo '{key}' debe ser numérico")
+    if minimum is not None and value < minimum:
+        raise RepricingError(f"El campo '{key}' debe ser mayor o igual que {minimum}")
+    return value
+
+
+def build_filter(data):
+    """
+    Convierte el filtro de la solicitud en condiciones SQL sobre Curso.
+
+    Claves admitidas: ids, nivel, instructor, activo, destacado, precio_min
+    y precio_max. Los cursos sin precio nunca se seleccionan.
+
+    Args:
+        data (dict): Filtro recibido en la solicitud
+
+    Returns:
+        list: Condiciones para Curso
+
+    Raises:
+        RepricingError: Si alguna clave no es válida
+    """
+    data = data or {}
+    if not isinstance(data, dict):
+        raise RepricingError("El filtro debe ser un objeto")
+
+    conditions = [Curso.precio.isnot(None)]
+    if data.get('ids') is not None:
+        try:
+            conditions.append(Curso.id.in_([int(curso_id) for curso_id in data['ids']]))
+        except (TypeError, ValueError):
+            raise RepricingError("El campo 'ids' debe ser una lista de enteros")
+    for key in ('nivel', 'instructor'):
+        if data.get(key):
+            conditions.append(getattr(Curso, key) == data[key])
+    for key in ('activo', 'destacado'):
+        if data.get(key) is not None:
+            if not isinstance(data[key], bool):
+                raise RepricingError(f"El campo '{key}' debe ser booleano")
+            conditions.append(getattr(Curso, key).is_(data[key]))
+
+    precio_min = _number(data, 'precio_min')
+    precio_max = _number(data, 'precio_max')
+    if precio_min is not None:
+        conditions.append(Curso.precio >= precio_min)
+    if precio_max is not None:
+        conditions.append(Curso.precio <= precio_max)
+    return conditions
+
+
+def parse_rule(data):
+    """
+    Valida la regla de precios.
+
+    Claves admitidas: percent (variación porcentual), round ('cents',
+    'integer' o 'charm' para terminar en ,99), min_price y max_price.
+
+    Args:
+        data (dict): Regla recibida en la solicitud
+
+    Returns:
+        dict: Regla normalizada
+
+    Raises:
+        RepricingError: Si la regla no es válida
+    """
+    if not isinstance(data, dict):
+        raise RepricingError("La regla debe ser un objeto")
+
+    rule = {
+        'percent': _number(data, 'percent') or 0.0,
+        'round': data.get('round') or 'cents',
+        'min_price': _number(data, 'min_price', minimum=0),
+        'max_price': _number(data, 'max_price', minimum=0),
+    }
+    if not -100 < rule['percent'] <= MAX_PERCENT_CHANGE:
+        raise RepricingError(f"El campo 'percent' debe estar entre -100 (excluido) y {MAX_PERCENT_CHANGE}")
+    if rule['round'] not in ROUNDING_MODES:
+        raise RepricingError(f"Redondeo no soportado. Use uno de: {', '.join(ROUNDING_MODES)}")
+    if rule['min_price'] is not None and rule['max_price'] is not None and rule['min_price'] > rule['max_price']:
+        raise RepricingError("min_price no puede ser mayor que max_price")
+    if rule['percent'] == 0 and rule['round'] == 'cents' and rule['min_price'] is None and rule['max_price'] is None:
+        raise RepricingError("La regla no modifica ningún precio")
+    return rule
+
+
+def _round_half_up(values, decimals=0):
+    """Redondeo a la mitad hacia arriba (los precios nunca son negativos)."""
+    factor = 10.0 ** decimals
+    return np.floor(values * factor + 0.5) / factor
+
+
+def compute_prices(prices, rule):
+    """
+    Aplica una regla a un array de precios.
+
+    Args:
+        prices (ndarray): Precios actuales
+        rule (dict): Regla normalizada por parse_rule
+
+    Returns:
+        ndarray: Nuevos precios, redondeados a céntimos
+    """
+    # Se redondea primero a céntimos para evitar errores de coma flotante
+    # del tipo 19.999999 al aplicar el porcentaje
+    new_prices = _round_half_up(prices * (1 + rule['percent'] / 100.0), 2)
+
+    if rule['round'] == 'integer':
+        new_prices = _round_half_up(new_prices)
+    elif rule['round'] == 'charm':
+        # 24.30 -> 23.99, 24.60 -> 24.99; los cursos gratuitos siguen siéndolo
+        new_prices = np.where(new_prices > 0, np.maximum(_round_half_up(new_prices) - 0.01, 0.99), 0.0)
+
+    if rule['min_price'] is not None:
+        new_prices = np.where(prices > 0, np.maximum(new_prices, rule['min_price']), new_prices)
+    if rule['max_price'] is not None:
+        new_prices = np.minimum(new_prices, rule['max_price'])
+    return np.round(new_prices, 2)
+
+
+def _load_selection(conditions):
+    rows = db.session.execute(
+        select(Curso.id, Curso.titulo, Curso.precio, Curso.activo, CursoStats.sales_count)
+        .outerjoin(CursoStats, CursoStats.curso_id == Curso.id)
+        .where(*conditions)
+        .order_by(Curso.id)
+    ).all()
+    ids = np.array([row.id for row in rows], dtype=np.int64)
+    prices = np.array([row.precio for row in rows], dtype=np.float64)
+    active = np.array([bool(row.activo) for row in rows], dtype=bool)
+    sales = np.array([row.sales_count or 0 for row in rows], dtype=np.int64)
+    titles = [row.titulo for row in rows]
+    return ids, titles, prices, active, sales
+
+
+def _summary(prices):
+    if not len(prices):
+        return None
+    return {
+        'min': round(float(prices.min()), 2),
+        'max': round(float(prices.max()), 2),
+        'mean': round(float(prices.mean()), 2),
+        'median': round(float(np.median(prices)), 2),
+    }
+
+
+def _band_counts(prices):
+    labels = [FREE_BAND] + [label for _, label in PRICE_BANDS]
+    counts = Counter(price_band(price) for price in prices.tolist())
+    return {label: counts.get(label, 0) for label in labels}
+
+
+def preview_repricing(filter_data, rule_data):
+    """
+    Calcula el resultado de una regla de precios sin modificar nada.
+
+    Args:
+        filter_data (dict): Filtro de cursos (ver build_filter)
+        rule_data (dict): Regla de precios (ver parse_rule)
+
+    Returns:
+        dict: Resumen de precios, distribución por franjas, impacto en
+        ingresos y una muestra de cambios
+    """
+    conditions = build_filter(filter_data)
+    rule = parse_rule(rule_data)
+    ids, titles, prices, active, sales = _load_selection(conditions)
+    new_prices = compute_prices(prices, rule)
+    changed = new_prices != prices
+
+    before_bands = _band_counts(prices)
+    after_bands = _band_counts(new_prices)
+    revenue_before = float(np.dot(prices, sales))
+    revenue_after = float(np.dot(new_prices, sales))
+
+    sample = np.flatnonzero(changed)[:PREVIEW_SAMPLE_SIZE]
+    return {
+        'rule': rule,
+        'selected': int(len(ids)),
+        'changed': int(changed.sum()),
+        'active': int(active.sum()),
+        'before': _summary(prices),
+        'after': _summary(new_prices),
+        'distribution': [
+            {'band': band, 'before': before_bands[band], 'after': after_bands[band]}
+            for band in before_bands
+        ],
+        'revenue_impact': {
+            # Estimación: las mismas ventas acumuladas a los nuevos precios
+            'units': int(sales.sum()),
+            'before': round(revenue_before, 2),
+            'after': round(revenue_after, 2),
+            'difference': round(revenue_after - revenue_before, 2),
+        },
+        'sample': [
+            {
+                'id': int(ids[position]),
+                'titulo': titles[position],
+                'precio': float(prices[position]),
+                'nuevo_precio': float(new_prices[position])
+            }
+            for position in sample.tolist()
+        ]
+    }
+
+
+def apply_repricing(filter_data, rule_data):
+    """
+    Aplica una regla de precios con un único UPDATE en una transacción.
+
+    Los precios se recalculan con los valores actuales (iguales a los de la
+    vista previa si nadie los ha cambiado entretanto). El UPDATE solo modifica
+    los cursos cuyo precio sigue siendo el leído: si otra petición lo cambia
+    entre la lectura y la escritura, ese curso se omite en lugar de
+    sobrescribir su precio con uno calculado a partir del valor anterior.
+
+    Args:
+        filter_data (dict): Filtro de cursos (ver build_filter)
+        rule_data (dict): Regla de precios (ver parse_rule)
+
+    Returns:
+        dict: Número de cursos seleccionados, modificados y omitidos por
+        haber cambiado de precio durante la operación
+    """
+    conditions = build_filter(filter_data)
+    rule = parse_rule(rule_data)
+    ids, _, prices, _, _ = _load_selection(conditions)
+    new_prices = compute_prices(prices, rule)
+    changed = new_prices != prices
+    if not changed.any():
+        return {'selected': int(len(ids)), 'changed': 0, 'skipped': 0}
+
+    ids, prices, new_prices = ids[changed], prices[changed], new_prices[changed]
+    connection = db.session.connection()
+    cursos = Curso.__table__
+
+    # Los precios leídos y los nuevos se cargan en una tabla temporal y se
+    # copian con un solo UPDATE correlacionado que compara el precio actual
+    # con el leído (compare-and-set)
+    staging = Table(
+        'repricing_staging', MetaData(),
+        Column('id', Integer, primary_key=True),
+        Column('precio_anterior', Float, nullable=False),
+        Column('precio', Float, nullable=False),
+        prefixes=['TEMPORARY']
+    )
+    staging.create(connection, checkfirst=True)
+    try:
+        connection.execute(staging.delete())
+        connection.execute(staging.insert(), [
+            {'id': curso_id, 'precio_anterior': old, 'precio': new}
+            for curso_id, old, new in zip(ids.tolist(), prices.tolist(), new_prices.tolist())
+        ])
+        new_price = select(staging.c.precio).where(staging.c.id == cursos.c.id).scalar_subquery()
+        unchanged = select(staging.c.id).where(staging.c.precio_anterior == cursos.c.precio)
+        updated = connection.execute(
+            update(cursos)
+            .where(cursos.c.id.in_(unchanged))
+            .values(precio=new_price, updated_at=datetime.now(timezone.utc))
+            .returning(cursos.c.id, cursos.c.activo)
+        ).all()
+    finally:
+        staging.drop(connection)
+
+    # Las facetas se ajustan solo con las filas realmente modificadas; las
+    # franjas de precio solo cuentan cursos activos
+    old_prices = dict(zip(ids.tolist(), prices.tolist()))
+    updated_prices = dict(zip(ids.tolist(), new_prices.tolist()))
+    deltas = Counter()
+    for curso_id, activo in updated:
+        if activo:
+            deltas[('precio', price_band(old_prices[curso_id]))] -= 1
+            deltas[('precio', price_band(updated_prices[curso_id]))] += 1
+    apply_facet_deltas(connection, deltas)
+
+    updated_ids = [curso_id for curso_id, _ in updated]
+    mark_changed(db.session, Curso, upserted_ids=updated_ids, attributes=('precio', 'updated_at'))
+    db.session.commit()
+
+    skipped = len(ids) - len(updated_ids)
+    if skipped:
+        logger.warning(f"{skipped} cursos omitidos en el cambio de precios: su precio cambió durante la operación")
+    logger.info(f"Precios actualizados en {len(updated_ids)} cursos con la regla {rule}")
+    return {'selected': int(len(changed)), 'changed': len(updated_ids), 'skipped': skipped}
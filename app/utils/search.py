@@ -0,0 +1,122 @@
+"""
+Búsqueda de texto completo sobre el catálogo de cursos con SQLite FTS5.
+
+Se mantiene una tabla virtual FTS5 de contenido externo (cursos_fts) sobre
+titulo, descripcion, instructor y nivel. Los triggers de la tabla cursos la
+mantienen sincronizada con cualquier escritura, incluidas las que no pasan
+por el ORM. La tabla y los triggers se crean con la migración 61ea0255af9e
+(flask db upgrade).
+"""
+
+import html
+import re
+import logging
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import db
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'cursos_fts'
+
+# Pesos BM25 por columna: titulo, descripcion, instructor, nivel
+BM25_WEIGHTS = (10.0, 1.0, 4.0, 2.0)
+
+MAX_QUERY_TERMS = 10
+
+# FTS5 delimita las coincidencias con caracteres de control que no aparecen en
+# el texto de los cursos; se sustituyen por <mark> después de escapar el HTML
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+def build_match_query(query_text):
+    """
+    Convierte el texto introducido por el usuario en una expresión MATCH segura.
+
+    Cada término se escapa entre comillas y se busca por prefijo, de modo que
+    los operadores de FTS5 escritos por el usuario no se interpretan.
+
+    Args:
+        query_text (str): Texto de búsqueda
+
+    Returns:
+        str: Expresión MATCH, o None si no hay términos válidos
+    """
+    terms = re.findall(r'\w+', query_text or '')[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def mark_matches(text):
+    """
+    Escapa el HTML de un texto resaltado por FTS5 y marca las coincidencias.
+
+    El texto de los cursos puede contener HTML: se escapa completo y solo
+    después se insertan las etiquetas <mark>, de modo que el resultado es
+    seguro para insertarlo como HTML.
+
+    Args:
+        text (str): Texto devuelto por highlight() o snippet()
+
+    Returns:
+        str: HTML escapado con las coincidencias entre <mark> y </mark>
+    """
+    if text is None:
+        return None
+    escaped = html.escape(text, quote=True)
+    return escaped.replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+
+
+def search_cursos(query_text, limit=20, activo=True):
+    """
+    Busca cursos por texto con ranking BM25 y fragmentos resaltados.
+
+    Args:
+        query_text (str): Texto de búsqueda
+        limit (int, optional): Número máximo de resultados. Por defecto 20.
+        activo (bool, optional): Filtrar por cursos activos. Por defecto True.
+
+    Returns:
+        list: Resultados ordenados por relevancia
+    """
+    match = build_match_query(query_text)
+    if match is None:
+        return []
+
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    try:
+        rows = db.session.execute(text(f"""
+            SELECT c.id, c.titulo, c.precio, c.nivel, c.instructor, c.imagen_url,
+                   highlight({FTS_TABLE}, 0, :start, :end) AS titulo_resaltado,
+                   snippet({FTS_TABLE}, 1, :start, :end, '…', 16) AS fragmento,
+                   bm25({FTS_TABLE}, {weights}) AS score
+            FROM {FTS_TABLE}
+            JOIN cursos c ON c.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH :match AND c.activo = :activo
+            ORDER BY score
+            LIMIT :limit
+        """), {
+            'match': match, 'activo': activo, 'limit': limit, 'start': MATCH_START, 'end': MATCH_END
+        }).mappings().all()
+    except OperationalError as e:
+        # Base de datos sin migrar: la búsqueda no devuelve resultados
+        if f'no such table: {FTS_TABLE}' not in str(e):
+            raise
+        db.session.rollback()
+        logger.error("El índice de búsqueda no existe; ejecuta flask db upgrade")
+        return []
+
+    return [{
+        'id': row['id'],
+        'titulo': row['titulo'],
+        'precio': float(row['precio']) if row['precio'] is not None else None,
+        'nivel': row['nivel'],
+        'instructor': row['instructor'],
+        'imagen_url': row['imagen_url'],
+        'titulo_resaltado': mark_matches(row['titulo_resaltado']),
+        'fragmento': mark_matches(row['fragmento']),
+        # bm25() devuelve valores negativos: cuanto menor, más relevante
+        'score': round(-row['score'], 4)
+    } for row in rows]
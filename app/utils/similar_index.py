@@ -0,0 +1,429 @@
+"""
+Índice de similitud por contenido entre cursos (título y descripción).
+
+Cada curso se representa con un vector TF-IDF disperso obtenido con el truco
+del hashing sobre unigramas y bigramas normalizados, de modo que no hace falta
+mantener un vocabulario. El espacio tiene 2**18 columnas para que las
+colisiones entre términos distintos sean raras; como cada curso solo ocupa
+unas decenas de columnas, la matriz se guarda en formato CSR (scipy.sparse).
+
+Los arrays de la matriz se guardan como ficheros .npy en un directorio por
+segmento y el fichero CURRENT apunta a los segmentos vigentes: una base con
+todos los cursos y, opcionalmente, un delta pequeño con los cursos indexados
+después y los IDs de las filas de la base que ya no valen. Cada escritura crea
+un segmento nuevo y sustituye CURRENT de forma atómica, así que los workers
+que están leyendo nunca ven un índice a medio escribir.
+
+El IDF se calcula en cada reconstrucción completa (scripts/build_similar_index.py)
+y se reutiliza para indexar de forma incremental, tras cada commit, los cursos
+creados o cuyo título o descripción ha cambiado. Esos cambios solo reescriben
+el delta; cuando supera DELTA_MAX_ROWS filas se fusiona con la base. Las
+peticiones nunca construyen el índice: si no existe, la búsqueda de cursos
+similares no devuelve resultados.
+"""
+
+import logging
+import os
+import re
+import shutil
+import time
+import unicodedata
+import zlib
+import numpy as np
+from filelock import FileLock
+from flask import current_app
+from scipy import sparse
+from sqlalchemy import select
+from app import db
+from app.models.curso import Curso
+from app.utils.model_events import on_commit
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+DIM = 2 ** 18
+TITLE_WEIGHT = 2.0
+INDEXED_COLUMNS = ('titulo', 'descripcion')
+BUILD_BATCH_SIZE = 5000
+
+# Arrays del segmento base: IDs de las filas, matriz CSR e IDF
+ARRAY_NAMES = ('ids', 'data', 'indices', 'indptr', 'idf')
+# Arrays del segmento delta: filas nuevas o reindexadas y filas de la base ocultas
+DELTA_ARRAY_NAMES = ('ids', 'data', 'indices', 'indptr', 'removed')
+DELTA_MAX_ROWS = 1000  # Filas del delta a partir de las que se fusiona con la base
+CURRENT_FILE = 'CURRENT'
+LOCK_FILE = '.lock'
+
+TOKEN_RE = re.compile(r'\w{2,}')
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', text or '').lower()
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def _features(text, weight):
+    """Unigramas y bigramas del texto con su peso."""
+    tokens = TOKEN_RE.findall(_normalize(text))
+    for token in tokens:
+        yield token, weight
+    for first, second in zip(tokens, tokens[1:]):
+        yield f'{first} {second}', weight
+
+
+def hash_documents(documents):
+    """
+    Calcula la matriz dispersa de frecuencias hasheadas de varios documentos.
+
+    Cada característica suma su peso (con un signo también derivado del hash,
+    para que las colisiones tiendan a anularse) en la columna hash % DIM.
+
+    Args:
+        documents (list): Tuplas (titulo, descripcion)
+
+    Returns:
+        csr_matrix: Matriz float32 de forma (len(documents), DIM)
+    """
+    rows, hashes, weights = [], [], []
+    for row, (titulo, descripcion) in enumerate(documents):
+        for feature, weight in (*_features(titulo, TITLE_WEIGHT), *_features(descripcion, 1.0)):
+            rows.append(row)
+            hashes.append(zlib.crc32(feature.encode('utf-8')))
+            weights.append(weight)
+
+    hashes = np.array(hashes, dtype=np.int64)
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+    matrix = sparse.csr_matrix(
+        (np.array(weights) * signs, (np.array(rows, dtype=np.int64), hashes % DIM)),
+        shape=(len(documents), DIM),
+        dtype=np.float32
+    )
+    # Las entradas repetidas se suman al convertir a CSR; las anuladas se quitan
+    matrix.eliminate_zeros()
+    return matrix
+
+
+def _weight(matrix, idf):
+    """Aplica el IDF y normaliza cada fila a norma 1."""
+    matrix = sparse.csr_matrix(matrix.multiply(idf), dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix, dtype=np.float32)
+
+
+def _empty_matrix():
+    return sparse.csr_matrix((0, DIM), dtype=np.float32)
+
+
+class SimilarCourseIndex:
+    """Índice de vectores dispersos de cursos persistido en un directorio."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.current_path = os.path.join(directory, CURRENT_FILE)
+        self._pointer = None
+        # Segmento base
+        self._ids = None
+        self._matrix = None
+        self._idf = None
+        self._alive = None
+        # Segmento delta
+        self._delta_ids = None
+        self._delta_matrix = None
+        self._removed = None
+
+    def _lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        return FileLock(os.path.join(self.directory, LOCK_FILE))
+
+    def exists(self):
+        return os.path.exists(self.current_path)
+
+    def _current_pointer(self):
+        with open(self.current_path, encoding='utf-8') as file:
+            return file.read().strip()
+
+    def _load(self, name, array_names):
+        path = os.path.join(self.directory, name)
+        return {array: np.load(os.path.join(path, f'{array}.npy'), mmap_mode='r') for array in array_names}
+
+    @staticmethod
+    def _csr(arrays):
+        return sparse.csr_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']),
+            shape=(len(arrays['ids']), DIM),
+            copy=False
+        )
+
+    def _open(self):
+        """Carga (o recarga, si otro worker ha escrito segmentos nuevos) el índice."""
+        pointer = self._current_pointer()
+        if pointer != self._pointer:
+            generation, *delta = pointer.split()
+            arrays = self._load(generation, ARRAY_NAMES)
+            self._ids = arrays['ids']
+            self._matrix = self._csr(arrays)
+            self._idf = arrays['idf']
+
+            if delta:
+                arrays = self._load(delta[0], DELTA_ARRAY_NAMES)
+                self._delta_ids = arrays['ids']
+                self._delta_matrix = self._csr(arrays)
+                self._removed = arrays['removed']
+            else:
+                self._delta_ids = np.empty(0, dtype=np.int64)
+                self._delta_matrix = _empty_matrix()
+                self._removed = np.empty(0, dtype=np.int64)
+            self._alive = ~np.isin(self._ids, self._removed)
+            self._pointer = pointer
+
+    def _save(self, prefix, arrays):
+        """Guarda los arrays de un segmento en un directorio nuevo y devuelve su nombre."""
+        name = f'{prefix}-{os.getpid()}-{time.time_ns()}'
+        path = os.path.join(self.directory, name)
+        os.makedirs(path)
+        for array_name, array in arrays.items():
+            np.save(os.path.join(path, f'{array_name}.npy'), array)
+        return name
+
+    @staticmethod
+    def _matrix_arrays(matrix):
+        matrix.sort_indices()
+        # indices e indptr con el mismo tipo para que scipy no los copie al cargar
+        index_dtype = np.int32 if matrix.nnz < 2 ** 31 else np.int64
+        return {
+            'data': matrix.data.astype(np.float32),
+            'indices': matrix.indices.astype(index_dtype),
+            'indptr': matrix.indptr.astype(index_dtype),
+        }
+
+    def _activate(self, *segments):
+        """Apunta CURRENT a los segmentos indicados y borra los demás."""
+        tmp_path = f'{self.current_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write(' '.join(segments))
+        os.replace(tmp_path, self.current_path)
+
+        # Los workers que aún tengan mapeado un segmento anterior lo siguen
+        # leyendo sin problema aunque se borre el directorio
+        for entry in os.listdir(self.directory):
+            if entry.startswith(('gen-', 'delta-')) and entry not in segments:
+                shutil.rmtree(os.path.join(self.directory, entry), ignore_errors=True)
+
+    def _write(self, ids, matrix, idf):
+        """Escribe un segmento base nuevo sin delta, lo activa y borra los anteriores."""
+        arrays = {
+            'ids': np.asarray(ids, dtype=np.int64),
+            **self._matrix_arrays(matrix),
+            'idf': np.asarray(idf, dtype=np.float32),
+        }
+        self._activate(self._save('gen', arrays))
+
+    def _write_delta(self, delta_ids, delta_matrix, removed):
+        """
+        Escribe un segmento delta nuevo sobre la base vigente.
+
+        Cuando el delta supera DELTA_MAX_ROWS filas (incluidas las de la base
+        que oculta), se fusiona con la base en un segmento base nuevo.
+        """
+        if len(delta_ids) + len(removed) > DELTA_MAX_ROWS:
+            alive = ~np.isin(self._ids, removed)
+            self._write(
+                np.concatenate([self._ids[alive], delta_ids]),
+                sparse.vstack([self._matrix[alive], delta_matrix], format='csr'),
+                self._idf
+            )
+            logger.info(f"Segmento delta del índice de similitud fusionado ({len(delta_ids)} cursos)")
+            return
+
+        arrays = {
+            'ids': np.asarray(delta_ids, dtype=np.int64),
+            **self._matrix_arrays(sparse.csr_matrix(delta_matrix, dtype=np.float32)),
+            'removed': np.asarray(removed, dtype=np.int64),
+        }
+        self._activate(self._pointer.split()[0], self._save('delta', arrays))
+
+    def build(self, documents):
+        """
+        Reconstruye el índice completo y recalcula el IDF.
+
+        Args:
+            documents (iterable): Tuplas (id, titulo, descripcion)
+        """
+        ids, matrices = [], []
+        batch = []
+        for curso_id, titulo, descripcion in documents:
+            ids.append(curso_id)
+            batch.append((titulo, descripcion))
+            if len(batch) >= BUILD_BATCH_SIZE:
+                matrices.append(hash_documents(batch))
+                batch = []
+        if batch or not matrices:
+            matrices.append(hash_documents(batch))
+        matrix = sparse.vstack(matrices, format='csr')
+
+        # IDF suavizado sobre la presencia de cada columna
+        df = np.bincount(matrix.indices, minlength=DIM)
+        idf = (np.log((1 + len(ids)) / (1 + df)) + 1).astype(np.float32)
+
+        with self._lock():
+            self._write(ids, _weight(matrix, idf), idf)
+        logger.info(f"Índice de similitud reconstruido con {len(ids)} cursos")
+
+    def upsert(self, documents):
+        """
+        Indexa o reindexa varios cursos con el IDF de la última reconstrucción.
+
+        Los vectores se añaden al segmento delta y ocultan las filas que esos
+        cursos tuvieran en la base, sin reescribirla.
+
+        Args:
+            documents (list): Tuplas (id, titulo, descripcion)
+        """
+        if not documents or not self.exists():
+            return
+        with self._lock():
+            self._open()
+            doc_ids = np.array([curso_id for curso_id, _, _ in documents], dtype=np.int64)
+            vectors = _weight(hash_documents([(titulo, descripcion) for _, titulo, descripcion in documents]), self._idf)
+
+            keep = ~np.isin(self._delta_ids, doc_ids)
+            self._write_delta(
+                np.concatenate([self._delta_ids[keep], doc_ids]),
+                sparse.vstack([self._delta_matrix[keep], vectors], format='csr'),
+                np.union1d(self._removed, doc_ids[np.isin(doc_ids, self._ids)])
+            )
+
+    def remove(self, curso_ids):
+        """
+        Elimina varios cursos del índice.
+
+        Args:
+            curso_ids (iterable): IDs de los cursos
+        """
+        curso_ids = np.array(list(curso_ids), dtype=np.int64)
+        if not len(curso_ids) or not self.exists():
+            return
+        with self._lock():
+            self._open()
+            keep = ~np.isin(self._delta_ids, curso_ids)
+            in_base = curso_ids[np.isin(curso_ids, self._ids[self._alive])]
+            if keep.all() and not len(in_base):
+                return
+            self._write_delta(
+                self._delta_ids[keep],
+                self._delta_matrix[keep],
+                np.union1d(self._removed, in_base)
+            )
+
+    def similar(self, curso_id, k=10):
+        """
+        Busca los cursos con mayor similitud de contenido con un curso.
+
+        Args:
+            curso_id (int): ID del curso de referencia
+            k (int, optional): Número de resultados. Por defecto 10.
+
+        Returns:
+            list: Tuplas (id, similitud) ordenadas de mayor a menor similitud
+        """
+        self._open()
+        rows = np.flatnonzero(self._delta_ids == curso_id)
+        if len(rows):
+            vector = self._delta_matrix[rows[0]]
+        else:
+            rows = np.flatnonzero((self._ids == curso_id) & self._alive)
+            if not len(rows):
+                return []
+            vector = self._matrix[rows[0]]
+
+        # Los vectores están normalizados: el producto escalar es el coseno
+        base_scores = (self._matrix @ vector.T).toarray().ravel()
+        base_scores[~self._alive] = 0
+        ids = np.concatenate([self._ids, self._delta_ids])
+        scores = np.concatenate([base_scores, (self._delta_matrix @ vector.T).toarray().ravel()])
+        scores[ids == curso_id] = 0
+
+        k = min(k, len(scores) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [
+            (similar_id, score)
+            for similar_id, score in zip(ids[top].tolist(), scores[top].tolist())
+            if score > 0
+        ]
+
+
+_indexes = {}
+
+
+def get_similar_index():
+    """Devuelve el índice de la aplicación actual (uno por directorio y proceso)."""
+    directory = current_app.config['SIMILAR_INDEX_DIR']
+    if directory not in _indexes:
+        _indexes[directory] = SimilarCourseIndex(directory)
+    return _indexes[directory]
+
+
+def _iter_documents(connection, curso_ids=None):
+    query = select(Curso.id, Curso.titulo, Curso.descripcion).order_by(Curso.id)
+    if curso_ids is not None:
+        query = query.where(Curso.id.in_(curso_ids))
+    for row in connection.execute(query).yield_per(BUILD_BATCH_SIZE):
+        yield tuple(row)
+
+
+def rebuild_similar_index():
+    """Reconstruye el índice de la aplicación actual a partir de la base de datos."""
+    with db.engine.connect() as connection:
+        get_similar_index().build(_iter_documents(connection))
+
+
+def find_similar(curso_id, k=10):
+    """
+    Busca cursos similares sin construir nunca el índice en la petición.
+
+    Args:
+        curso_id (int): ID del curso de referencia
+        k (int, optional): Número de resultados
+
+    Returns:
+        list: Tuplas (id, similitud); vacía si el índice no está disponible
+    """
+    index = get_similar_index()
+    if not index.exists():
+        logger.warning("El índice de similitud no existe; ejecuta scripts/build_similar_index.py")
+        return []
+    try:
+        return index.similar(curso_id, k)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error al leer el índice de similitud: {e}")
+        return []
+
+
+@on_commit(Curso)
+def _actualizar_indice_similitud(changes):
+    """Reindexa los cursos cuyo título o descripción ha cambiado y quita los eliminados."""
+    index = get_similar_index()
+    if not index.exists():
+        return
+
+    index.remove(changes.deleted)
+
+    documents = []
+    missing = []
+    for curso_id, values in changes.upserted.items():
+        # Los cambios de precio, estado, etc. no afectan al vector del curso
+        if not changes.changed_any(curso_id, *INDEXED_COLUMNS):
+            continue
+        if 'titulo' in values and 'descripcion' in values:
+            documents.append((curso_id, values['titulo'], values['descripcion']))
+        else:
+            missing.append(curso_id)
+    if missing:
+        # La sesión ya no puede emitir SQL tras el commit: se usa otra conexión
+        with db.engine.connect() as connection:
+            documents.extend(_iter_documents(connection, missing))
+    index.upsert(documents)
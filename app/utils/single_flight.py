@@ -0,0 +1,163 @@
+"""
+Protección contra estampidas de caché (single-flight) sobre la extensión cache.
+
+Cuando una entrada muy consultada caduca, solo un llamador la recalcula: el
+resto de hilos del mismo proceso espera su resultado y los demás workers
+esperan a que se libere un bloqueo en la propia caché. Si ya hay un valor
+caducado disponible, se sirve mientras se recalcula.
+
+Además, cada entrada se refresca antes de caducar con una probabilidad que
+aumenta al acercarse la expiración (expiración temprana probabilística), de
+modo que las entradas con el mismo TTL no caducan todas a la vez.
+"""
+
+import hashlib
+import logging
+import math
+import random
+import threading
+import time
+from functools import wraps
+from app import cache
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+LOCK_TIMEOUT = 10      # Segundos máximos que se espera a otro worker
+WAIT_INTERVAL = 0.05   # Intervalo de sondeo mientras otro worker recalcula
+LOCK_STRIPES = 256     # Bloqueos locales compartidos por todas las claves
+
+# Un número fijo de bloqueos, elegidos por hash de la clave, en lugar de uno
+# por clave: las claves incluyen versiones y no dejan de aparecer nuevas.
+# Son reentrantes por si un cálculo consulta otra clave del mismo bloqueo.
+_local_locks = [threading.RLock() for _ in range(LOCK_STRIPES)]
+
+
+def _local_lock(key):
+    return _local_locks[hash(key) % LOCK_STRIPES]
+
+
+def _is_fresh(entry, beta, now=None):
+    """
+    Indica si una entrada puede servirse sin recalcular.
+
+    Args:
+        entry (tuple): (valor, duración del cálculo, instante de expiración)
+        beta (float): Factor de anticipación (>1 refresca antes)
+    """
+    _, delta, expires_at = entry
+    now = now or time.time()
+    # random() está en (0, 1], por lo que -log(random()) >= 0
+    return now - delta * beta * math.log(random.random() or 1e-12) < expires_at
+
+
+def _wait_for(key, lock_key, timeout, beta):
+    """Espera a que otro worker publique el valor o libere el bloqueo."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and _is_fresh(entry, beta):
+            return entry
+        if cache.get(lock_key) is None:
+            return cache.get(key)
+    return None
+
+
+def get_or_compute(key, compute, timeout, beta=1.0, lock_timeout=LOCK_TIMEOUT):
+    """
+    Obtiene un valor de la caché o lo calcula garantizando un solo cálculo a la vez.
+
+    Args:
+        key (str): Clave de caché
+        compute (callable): Función sin argumentos que calcula el valor
+        timeout (int): Tiempo de validez del valor en segundos
+        beta (float, optional): Factor de anticipación del refresco. Por defecto 1.0.
+        lock_timeout (int, optional): Tiempo máximo de espera a otro worker
+
+    Returns:
+        any: Valor cacheado o recién calculado (puede ser None)
+    """
+    entry = cache.get(key)
+    if entry is not None and _is_fresh(entry, beta):
+        return entry[0]
+
+    local_lock = _local_lock(key)
+    if entry is not None:
+        # Hay un valor caducado: si otro hilo ya recalcula, se sirve el antiguo
+        if not local_lock.acquire(blocking=False):
+            return entry[0]
+    elif not local_lock.acquire(timeout=lock_timeout):
+        logger.warning(f"Tiempo de espera agotado para la clave de caché {key}")
+        return compute()
+
+    try:
+        current = cache.get(key)
+        if current is not None and (entry is None or current[2] != entry[2]) and _is_fresh(current, beta):
+            # Otro hilo lo recalculó mientras esperábamos el bloqueo
+            return current[0]
+
+        lock_key = f"{key}:lock"
+        acquired = cache.add(lock_key, True, timeout=lock_timeout)
+        if not acquired:
+            # Otro worker está recalculando
+            if entry is not None:
+                return entry[0]
+            published = _wait_for(key, lock_key, lock_timeout, beta)
+            if published is not None:
+                return published[0]
+            # Sin valor tras la espera: se calcula igualmente, pero el bloqueo
+            # solo se borra al terminar si ahora es de este llamador
+            acquired = cache.add(lock_key, True, timeout=lock_timeout)
+
+        try:
+            start = time.time()
+            value = compute()
+            now = time.time()
+            # Se conserva el valor más allá de su expiración para poder
+            # servirlo mientras se recalcula
+            cache.set(key, (value, now - start, now + timeout), timeout=timeout * 2)
+            return value
+        finally:
+            if acquired:
+                cache.delete(lock_key)
+    finally:
+        local_lock.release()
+
+
+def single_flight_memoize(timeout=300, beta=1.0, key_prefix=None):
+    """
+    Decorador equivalente a cache.memoize con protección contra estampidas.
+
+    La función decorada expone invalidate(*args, **kwargs) para borrar la
+    entrada correspondiente a esos argumentos.
+
+    Args:
+        timeout (int or callable, optional): Tiempo de validez en segundos, o
+            función sin argumentos que lo devuelve en cada llamada. Por defecto 300.
+        beta (float, optional): Factor de anticipación del refresco. Por defecto 1.0.
+        key_prefix (str, optional): Prefijo de las claves. Por defecto, el nombre de la función.
+
+    Returns:
+        function: Decorador configurado
+    """
+    def decorator(func):
+        prefix = key_prefix or f"sf:{func.__module__}.{func.__qualname__}"
+
+        def make_cache_key(*args, **kwargs):
+            raw = repr((args, sorted(kwargs.items())))
+            return f"{prefix}:{hashlib.md5(raw.encode('utf-8')).hexdigest()}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_compute(
+                make_cache_key(*args, **kwargs),
+                lambda: func(*args, **kwargs),
+                timeout() if callable(timeout) else timeout,
+                beta
+            )
+
+        wrapper.make_cache_key = make_cache_key
+        wrapper.invalidate = lambda *args, **kwargs: cache.delete(make_cache_key(*args, **kwargs))
+        return wrapper
+    return decorator
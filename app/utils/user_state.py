@@ -0,0 +1,148 @@
+"""
+Estado del usuario para el arranque del frontend (GET /api/me/bootstrap).
+
+Reúne en una sola consulta UNION ALL los cursos del carrito (con su total),
+la lista de deseos, los cursos comprados y el número de sesiones activas.
+El resultado se guarda en la caché con una versión por usuario que se renueva
+tras cada commit que modifica esas tablas: las escrituras del ORM se detectan
+con on_commit y las sentencias masivas llaman a invalidate_user_state.
+"""
+
+import logging
+from sqlalchemy import func, literal, null, select, union_all
+from app import db
+from app.models.cart import Cart
+from app.models.curso import Curso
+from app.models.entitlement import Entitlement
+from app.models.session import Session
+from app.models.wishlist import Wishlist
+from app.utils.cache_versions import get_version, bump_versions, versioned_timeout
+from app.utils.model_events import on_commit
+from app.utils.single_flight import get_or_compute
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+USER_STATE_KEY = 'me:state:{user_id}:{user_version}:{curso_version}'
+USER_STATE_TIMEOUT = 3600  # La clave ya incluye las versiones
+
+
+def compute_user_state(user_id):
+    """
+    Calcula el estado de un usuario con una sola consulta.
+
+    Args:
+        user_id (int): ID del usuario
+
+    Returns:
+        dict: Carrito (IDs, número y total), lista de deseos, cursos comprados
+        y sesiones activas
+    """
+    query = union_all(
+        select(literal('cart'), Cart.curso_id, null())
+        .join(Curso, Curso.id == Cart.curso_id)
+        .where(Cart.user_id == user_id),
+        select(literal('cart_total'), null(), func.coalesce(func.sum(Curso.precio), 0))
+        .select_from(Cart)
+        .join(Curso, Curso.id == Cart.curso_id)
+        .where(Cart.user_id == user_id),
+        select(literal('wishlist'), Wishlist.curso_id, null())
+        .where(Wishlist.user_id == user_id),
+        select(literal('purchased'), Entitlement.curso_id, null())
+        .where(Entitlement.user_id == user_id),
+        select(literal('sessions'), func.count(Session.id), null())
+        .where(Session.user_id == user_id, Session.is_active.is_(True)),
+    )
+
+    ids = {'cart': [], 'wishlist': [], 'purchased': []}
+    cart_total, active_sessions = 0.0, 0
+    for kind, value, amount in db.session.execute(query):
+        if kind == 'cart_total':
+            cart_total = float(amount or 0)
+        elif kind == 'sessions':
+            active_sessions = value or 0
+        else:
+            ids[kind].append(value)
+
+    return {
+        'cart': {
+            'curso_ids': sorted(ids['cart']),
+            'items_count': len(ids['cart']),
+            'total': round(cart_total, 2)
+        },
+        'wishlist': {
+            'curso_ids': sorted(ids['wishlist'])
+        },
+        'purchased_curso_ids': sorted(ids['purchased']),
+        'active_sessions': active_sessions
+    }
+
+
+def get_user_state(user_id):
+    """
+    Obtiene el estado de un usuario, desde la caché si es posible.
+
+    Args:
+        user_id (int): ID del usuario
+
+    Returns:
+        dict: Ver compute_user_state
+    """
+    key = USER_STATE_KEY.format(
+        user_id=user_id,
+        user_version=get_version('me', user_id),
+        # El total del carrito depende de los precios de los cursos
+        curso_version=get_version('curso')
+    )
+    return get_or_compute(key, lambda: compute_user_state(user_id), versioned_timeout(USER_STATE_TIMEOUT))
+
+
+def invalidate_user_state(*user_ids):
+    """
+    Invalida el estado cacheado de varios usuarios con una sola escritura.
+
+    Debe llamarse después del commit de las sentencias masivas que no pasan
+    por el ORM; los cambios hechos con el ORM se detectan automáticamente.
+
+    Args:
+        *user_ids: IDs de los usuarios
+    """
+    bump_versions('me', user_ids, collection=False)
+
+
+def _column_values(changes, column, lookup):
+    """
+    Valores de una columna en los registros de un ChangeSet.
+
+    Los registros cuyo valor no está en la instantánea del flush (por ejemplo,
+    los registrados con mark_changed) se resuelven con la consulta lookup.
+    """
+    result, missing = set(), []
+    for entity_id, values in (*changes.upserted.items(), *changes.deleted.items()):
+        if values.get(column) is not None:
+            result.add(values[column])
+        else:
+            missing.append(entity_id)
+    if missing:
+        # La sesión ya no puede emitir SQL tras el commit: se usa otra conexión
+        with db.engine.connect() as connection:
+            result.update(connection.execute(lookup(missing)).scalars())
+    return result
+
+
+def _register_invalidation(model):
+    @on_commit(model)
+    def _invalidar_estado_usuario(changes):
+        """Renueva la versión de los usuarios cuyos datos han cambiado."""
+        lookup = lambda ids: select(model.user_id).where(model.id.in_(ids))
+        invalidate_user_state(*_column_values(changes, 'user_id', lookup))
+
+
+for _model in (Cart, Wishlist, Session):
+    _register_invalidation(_model)
+
+
+@on_commit(Entitlement)
+def _invalidar_estado_por_compras(changes):
+    """Los accesos concedidos o retirados cambian los cursos comprados."""
+    invalidate_user_state(*{user_id for user_id, _ in changes.ids})
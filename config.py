@@ -30,6 +30,15 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
 
+    # Contraseñas: coste de bcrypt (los hashes con otro coste se actualizan en
+    # el siguiente login) y pool de procesos que calcula los hashes. Con 0
+    # workers se calculan en el hilo de la petición.
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 16))  # En curso + en cola
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 0.5))  # Espera por un hueco
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+
     # Cookies y sesiones
     SESSION_COOKIE_SECURE = os.getenv('SESSION_COOKIE_SECURE', 'False') == 'True'  # True en producción con HTTPS
     SESSION_COOKIE_HTTPONLY = True
@@ -63,8 +72,26 @@ class Config:
     ]
 
     # Rendimiento
+    # SimpleCache es local a cada proceso: con varios workers usar RedisCache para
+    # que la invalidación por versiones llegue a todos (ver app/utils/cache_versions.py)
     CACHE_TYPE = os.getenv('CACHE_TYPE', 'SimpleCache')
     CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_DEFAULT_TIMEOUT', 300))  # 5 minutos
+    # Directorio del índice de similitud por contenido (array mapeado en memoria)
+    SIMILAR_INDEX_DIR = os.getenv('SIMILAR_INDEX_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'similar_index'))
+
+    # Carritos abandonados: antigüedad (sin añadir cursos) a partir de la cual se
+    # retiran y tamaño de cada lote del barrido (scripts/sweep_abandoned_carts.py)
+    CART_ABANDON_DAYS = int(os.getenv('CART_ABANDON_DAYS', 30))
+    CART_SWEEP_BATCH_SIZE = int(os.getenv('CART_SWEEP_BATCH_SIZE', 500))
+
+    # Registro de auditoría (JSONL escrito por lotes en segundo plano, ver app.utils.audit)
+    AUDIT_LOG_ENABLED = os.getenv('AUDIT_LOG_ENABLED', 'True') == 'True'
+    AUDIT_LOG_PATH = os.getenv('AUDIT_LOG_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'logs', 'audit.jsonl'))
+    AUDIT_LOG_MAX_BYTES = int(os.getenv('AUDIT_LOG_MAX_BYTES', 10 * 1024 * 1024))  # 10 MB por fichero
+    AUDIT_LOG_BACKUP_COUNT = int(os.getenv('AUDIT_LOG_BACKUP_COUNT', 5))
+    AUDIT_QUEUE_SIZE = int(os.getenv('AUDIT_QUEUE_SIZE', 10000))  # Eventos en memoria antes de descartar
+    AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', 200))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', 1.0))  # Segundos
 
     # Límites de tasa (rate limiting)
     RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'True') == 'True'
@@ -0,0 +1,46 @@
+"""Índices del listado paginado de cursos
+
+Índices compuestos para la paginación por cursor de GET /api/cursos con los
+filtros y ordenaciones habituales (activo + precio, titulo o created_at) y el
+filtro por nivel. Las migraciones comprueban lo que ya existe porque
+db.create_all() crea al arrancar las tablas nuevas con sus índices.
+
+Revision ID: 420000c82c14
+Revises: ff38c9041dee
+Create Date: 2026-10-17 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '420000c82c14'
+down_revision = 'ff38c9041dee'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('idx_cursos_activo_precio', ['activo', 'precio', 'id']),
+    ('idx_cursos_activo_titulo', ['activo', 'titulo', 'id']),
+    ('idx_cursos_activo_created', ['activo', 'created_at', 'id']),
+    ('idx_cursos_nivel_activo', ['nivel', 'activo']),
+)
+
+
+def _index_names(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    existing = _index_names('cursos')
+    for name, columns in INDEXES:
+        if name not in existing:
+            op.create_index(name, 'cursos', columns)
+
+
+def downgrade():
+    existing = _index_names('cursos')
+    for name, _ in INDEXES:
+        if name in existing:
+            op.drop_index(name, table_name='cursos')
@@ -0,0 +1,35 @@
+"""Recuentos precalculados de facetas del catálogo (curso_facets)
+
+La tabla se rellena una vez con `flask rebuild-derived`
+(CursoFacet.rebuild) y se mantiene con los eventos del modelo Curso.
+
+Revision ID: 53a0d5e541ea
+Revises: 61ea0255af9e
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '53a0d5e541ea'
+down_revision = '61ea0255af9e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('curso_facets'):
+        return
+    op.create_table('curso_facets',
+    sa.Column('facet', sa.String(length=20), nullable=False),
+    sa.Column('value', sa.String(length=100), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('facet', 'value')
+    )
+
+
+def downgrade():
+    if sa.inspect(op.get_bind()).has_table('curso_facets'):
+        op.drop_table('curso_facets')
@@ -0,0 +1,39 @@
+"""Contadores de ventas por curso (curso_stats)
+
+La tabla se rellena una vez con `flask rebuild-derived`
+(CursoStats.rebuild) y se mantiene con los eventos de Order y OrderItem.
+
+Revision ID: 54e76f258e31
+Revises: b3fe34c287c1
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '54e76f258e31'
+down_revision = 'b3fe34c287c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('curso_stats'):
+        return
+    op.create_table('curso_stats',
+    sa.Column('curso_id', sa.Integer(), nullable=False),
+    sa.Column('sales_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['curso_id'], ['cursos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('curso_id')
+    )
+    op.create_index('idx_curso_stats_sales', 'curso_stats', ['sales_count', 'curso_id'])
+    op.create_index('idx_curso_stats_revenue', 'curso_stats', ['revenue', 'curso_id'])
+
+
+def downgrade():
+    if sa.inspect(op.get_bind()).has_table('curso_stats'):
+        op.drop_table('curso_stats')
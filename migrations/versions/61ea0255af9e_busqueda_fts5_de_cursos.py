@@ -0,0 +1,69 @@
+"""Búsqueda de texto completo de cursos (SQLite FTS5)
+
+Crea la tabla virtual cursos_fts (contenido externo sobre cursos), los
+triggers que la mantienen sincronizada y la indexa con los cursos existentes.
+Solo se aplica con SQLite; en otros motores la búsqueda no está disponible.
+
+Revision ID: 61ea0255af9e
+Revises: 420000c82c14
+Create Date: 2026-10-17 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '61ea0255af9e'
+down_revision = '420000c82c14'
+branch_labels = None
+depends_on = None
+
+FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS cursos_fts USING fts5(
+        titulo, descripcion, instructor, nivel,
+        content='cursos', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cursos_fts_ai AFTER INSERT ON cursos BEGIN
+        INSERT INTO cursos_fts(rowid, titulo, descripcion, instructor, nivel)
+        VALUES (new.id, new.titulo, new.descripcion, new.instructor, new.nivel);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cursos_fts_ad AFTER DELETE ON cursos BEGIN
+        INSERT INTO cursos_fts(cursos_fts, rowid, titulo, descripcion, instructor, nivel)
+        VALUES ('delete', old.id, old.titulo, old.descripcion, old.instructor, old.nivel);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cursos_fts_au
+    AFTER UPDATE OF titulo, descripcion, instructor, nivel ON cursos BEGIN
+        INSERT INTO cursos_fts(cursos_fts, rowid, titulo, descripcion, instructor, nivel)
+        VALUES ('delete', old.id, old.titulo, old.descripcion, old.instructor, old.nivel);
+        INSERT INTO cursos_fts(rowid, titulo, descripcion, instructor, nivel)
+        VALUES (new.id, new.titulo, new.descripcion, new.instructor, new.nivel);
+    END
+    """,
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in FTS_DDL:
+        op.execute(statement)
+    # Indexar los cursos que ya existían
+    op.execute("INSERT INTO cursos_fts(cursos_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for trigger in ('cursos_fts_au', 'cursos_fts_ad', 'cursos_fts_ai'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS cursos_fts")
@@ -0,0 +1,39 @@
+"""Accesos a los cursos comprados (entitlements)
+
+La tabla se rellena una vez con `flask rebuild-derived`
+(Entitlement.rebuild) o con python scripts/backfill_entitlements.py.
+
+Revision ID: 8286a7e71fc7
+Revises: 54e76f258e31
+Create Date: 2026-10-17 10:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8286a7e71fc7'
+down_revision = '54e76f258e31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('entitlements'):
+        return
+    op.create_table('entitlements',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('curso_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('granted_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['curso_id'], ['cursos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'curso_id')
+    )
+    op.create_index('idx_entitlements_order', 'entitlements', ['order_id'])
+
+
+def downgrade():
+    if sa.inspect(op.get_bind()).has_table('entitlements'):
+        op.drop_table('entitlements')
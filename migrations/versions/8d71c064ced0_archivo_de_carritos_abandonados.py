@@ -0,0 +1,48 @@
+"""Archivo de carritos abandonados (cart_archive)
+
+Tabla en la que scripts/sweep_abandoned_carts.py copia los elementos retirados
+e índice (created_at, id) sobre cart para recorrerlos por lotes.
+
+Revision ID: 8d71c064ced0
+Revises: 8286a7e71fc7
+Create Date: 2026-10-17 10:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d71c064ced0'
+down_revision = '8286a7e71fc7'
+branch_labels = None
+depends_on = None
+
+
+def _index_names(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    if 'idx_cart_created' not in _index_names('cart'):
+        op.create_index('idx_cart_created', 'cart', ['created_at', 'id'])
+
+    if sa.inspect(op.get_bind()).has_table('cart_archive'):
+        return
+    op.create_table('cart_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cart_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('curso_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_cart_archive_archived', 'cart_archive', ['archived_at'])
+
+
+def downgrade():
+    if sa.inspect(op.get_bind()).has_table('cart_archive'):
+        op.drop_table('cart_archive')
+    if 'idx_cart_created' in _index_names('cart'):
+        op.drop_index('idx_cart_created', table_name='cart')
@@ -0,0 +1,37 @@
+"""Cursos comprados juntos (curso_related)
+
+La tabla se rellena con python scripts/compute_related_courses.py.
+
+Revision ID: a9fbefbfa43e
+Revises: 53a0d5e541ea
+Create Date: 2026-10-17 09:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9fbefbfa43e'
+down_revision = '53a0d5e541ea'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('curso_related'):
+        return
+    op.create_table('curso_related',
+    sa.Column('curso_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('related_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['curso_id'], ['cursos.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['related_id'], ['cursos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('curso_id', 'rank')
+    )
+
+
+def downgrade():
+    if sa.inspect(op.get_bind()).has_table('curso_related'):
+        op.drop_table('curso_related')
@@ -0,0 +1,44 @@
+"""Sincronización incremental del catálogo (curso_tombstones)
+
+Tabla de cursos eliminados e índice (updated_at, id) sobre cursos para
+GET /api/cursos/changes.
+
+Revision ID: b3fe34c287c1
+Revises: a9fbefbfa43e
+Create Date: 2026-10-17 09:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3fe34c287c1'
+down_revision = 'a9fbefbfa43e'
+branch_labels = None
+depends_on = None
+
+
+def _index_names(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    if 'idx_cursos_updated' not in _index_names('cursos'):
+        op.create_index('idx_cursos_updated', 'cursos', ['updated_at', 'id'])
+
+    if sa.inspect(op.get_bind()).has_table('curso_tombstones'):
+        return
+    op.create_table('curso_tombstones',
+    sa.Column('curso_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('curso_id')
+    )
+    op.create_index('idx_curso_tombstones_deleted', 'curso_tombstones', ['deleted_at', 'curso_id'])
+
+
+def downgrade():
+    if sa.inspect(op.get_bind()).has_table('curso_tombstones'):
+        op.drop_table('curso_tombstones')
+    if 'idx_cursos_updated' in _index_names('cursos'):
+        op.drop_index('idx_cursos_updated', table_name='cursos')
@@ -0,0 +1,62 @@
+"""Índice único de orders.payment_id
+
+El webhook de Stripe registra cada pago una sola vez; el índice único impide
+que dos entregas simultáneas del mismo evento creen dos pedidos. Sustituye al
+índice no único del mismo nombre. Los pedidos no se borran nunca: si ya hay
+pagos repetidos, la migración falla y los lista para revisarlos a mano.
+
+Revision ID: def743ac4249
+Revises: 8d71c064ced0
+Create Date: 2026-10-17 10:30:00.000000
+
+"""
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'def743ac4249'
+down_revision = '8d71c064ced0'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+INDEX = 'idx_orders_payment_id'
+
+
+def _payment_index():
+    for index in sa.inspect(op.get_bind()).get_indexes('orders'):
+        if index['name'] == INDEX:
+            return index
+    return None
+
+
+def upgrade():
+    index = _payment_index()
+    if index is not None and index['unique']:
+        return
+
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT payment_id, COUNT(*) FROM orders
+        WHERE payment_id IS NOT NULL
+        GROUP BY payment_id HAVING COUNT(*) > 1
+    """)).all()
+    if duplicates:
+        for payment_id, total in duplicates:
+            logger.error(f"orders: el pago {payment_id} aparece en {total} pedidos")
+        raise RuntimeError(
+            f"Hay {len(duplicates)} pagos registrados en más de un pedido; "
+            "revísalos antes de crear el índice único"
+        )
+
+    if index is not None:
+        op.drop_index(INDEX, table_name='orders')
+    op.create_index(INDEX, 'orders', ['payment_id'], unique=True)
+
+
+def downgrade():
+    if _payment_index() is not None:
+        op.drop_index(INDEX, table_name='orders')
+    op.create_index(INDEX, 'orders', ['payment_id'])
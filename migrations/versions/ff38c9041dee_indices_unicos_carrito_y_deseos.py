@@ -0,0 +1,65 @@
+"""Índices únicos (user_id, curso_id) en cart y wishlist
+
+Elimina las filas repetidas de cart y wishlist (mismo usuario y mismo curso),
+conservando la más antigua, y crea los índices únicos que necesitan las altas
+idempotentes (INSERT ... ON CONFLICT DO NOTHING). Las filas eliminadas se
+registran en el log de la migración; el downgrade no las restaura.
+
+Revision ID: ff38c9041dee
+Revises: 6805ba14b131
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+import logging
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ff38c9041dee'
+down_revision = '6805ba14b131'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+UNIQUE_INDEXES = (
+    ('cart', 'uq_cart_user_curso'),
+    ('wishlist', 'uq_wishlist_user_curso'),
+)
+
+
+def _index_names(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _delete_duplicates(table):
+    """Elimina las filas repetidas por (user_id, curso_id) y registra cuántas."""
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(f"""
+        SELECT id, user_id, curso_id FROM {table}
+        WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY user_id, curso_id)
+        ORDER BY id
+    """)).all()
+    if not duplicates:
+        return
+    for row_id, user_id, curso_id in duplicates:
+        logger.warning(f"{table}: se elimina la fila repetida {row_id} (user_id={user_id}, curso_id={curso_id})")
+    bind.execute(sa.text(f"DELETE FROM {table} WHERE id IN :ids").bindparams(
+        sa.bindparam('ids', expanding=True)
+    ), {'ids': [row_id for row_id, _, _ in duplicates]})
+    logger.warning(f"{table}: {len(duplicates)} filas repetidas eliminadas")
+
+
+def upgrade():
+    for table, index in UNIQUE_INDEXES:
+        if index in _index_names(table):
+            continue
+        _delete_duplicates(table)
+        op.create_index(index, table, ['user_id', 'curso_id'], unique=True)
+
+
+def downgrade():
+    for table, index in UNIQUE_INDEXES:
+        if index in _index_names(table):
+            op.drop_index(index, table_name=table)
@@ -0,0 +1,44 @@
+"""
+Script para recalcular la tabla entitlements a partir de los pedidos pagados.
+
+Necesario una vez tras desplegar la tabla en una base de datos con pedidos
+(también lo hace `flask rebuild-derived` si la tabla está vacía) o para corregir
+accesos tras modificar pedidos directamente en la base de datos:
+    python scripts/backfill_entitlements.py
+"""
+
+import argparse
+import os
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula los accesos a cursos comprados.")
+    parser.parse_args()
+
+    # Añadir el directorio del proyecto al path
+    project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    sys.path.insert(0, project_dir)
+
+    from sqlalchemy import select
+    from app import create_app, db
+    from app.models.entitlement import Entitlement
+    from app.utils.entitlements import refresh_entitlements
+
+    app = create_app()
+    with app.app_context():
+        users = select(Entitlement.user_id).distinct()
+        before = set(db.session.execute(users).scalars())
+        granted = Entitlement.rebuild()
+        after = set(db.session.execute(users).scalars())
+        db.session.commit()
+
+        # Actualizar la caché de los usuarios afectados (si es compartida)
+        refresh_entitlements(before | after)
+
+    print(f"Accesos concedidos: {granted} ({len(after)} usuarios)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
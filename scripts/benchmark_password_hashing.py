@@ -0,0 +1,115 @@
+"""
+Benchmark del login con distintos costes de bcrypt.
+
+Para cada coste crea un usuario en una base de datos temporal y lanza logins
+concurrentes contra POST /api/auth/login (con el cliente de pruebas de Flask,
+sin servidor). Informa de la latencia p50/p95/p99, el rendimiento y los
+intentos rechazados con 503 por el pool de hash:
+    python scripts/benchmark_password_hashing.py
+    python scripts/benchmark_password_hashing.py --costs 10 12 14 --requests 100 --concurrency 16
+    python scripts/benchmark_password_hashing.py --workers 4 --max-pending 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+EMAIL = 'benchmark@akademiakupula.test'
+PASSWORD = 'benchmark-password'
+
+
+def percentile(values, fraction):
+    """Percentil por el método del rango más próximo."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_cost(app, cost, requests, concurrency):
+    """Lanza los logins con un coste y devuelve sus estadísticas."""
+    from app import db
+    from app.models.user import User
+    from app.utils.password_hashing import hash_password
+
+    with app.app_context():
+        app.config['BCRYPT_LOG_ROUNDS'] = cost
+        User.query.filter_by(email=EMAIL).delete()
+        db.session.add(User(
+            full_name='Benchmark',
+            email=EMAIL,
+            postal_code='00000',
+            is_confirmed=True,
+            password_hash=hash_password(PASSWORD, cost)
+        ))
+        db.session.commit()
+        User.get_by_email.invalidate(User, EMAIL)
+
+    def login(_):
+        client = app.test_client()
+        start = time.perf_counter()
+        response = client.post('/api/auth/login', json={'email': EMAIL, 'password': PASSWORD})
+        return response.status_code, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(login, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    ok = [seconds * 1000 for status, seconds in results if status == 200]
+    return {
+        'cost': cost,
+        'requests': requests,
+        'ok': len(ok),
+        'shed_503': sum(1 for status, _ in results if status == 503),
+        'errors': sum(1 for status, _ in results if status not in (200, 503)),
+        'p50_ms': round(percentile(ok, 0.50), 1) if ok else None,
+        'p95_ms': round(percentile(ok, 0.95), 1) if ok else None,
+        'p99_ms': round(percentile(ok, 0.99), 1) if ok else None,
+        'throughput_rps': round(len(results) / elapsed, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide la latencia del login para cada coste de bcrypt.")
+    parser.add_argument('--costs', type=int, nargs='+', default=[10, 11, 12, 13], help="Costes de bcrypt a medir")
+    parser.add_argument('--requests', type=int, default=50, help="Logins por coste")
+    parser.add_argument('--concurrency', type=int, default=8, help="Logins simultáneos")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos del pool (por defecto, PASSWORD_HASH_WORKERS)")
+    parser.add_argument('--max-pending', type=int, default=None, help="Operaciones en curso + en cola (por defecto, PASSWORD_HASH_MAX_PENDING)")
+    args = parser.parse_args()
+
+    # Base de datos temporal y sin límite de tasa para no medir el limitador
+    database = os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+    os.environ['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database}'
+    os.environ['RATELIMIT_ENABLED'] = 'False'
+    os.environ['FLASK_DEBUG'] = 'False'
+
+    # Añadir el directorio del proyecto al path
+    project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    sys.path.insert(0, project_dir)
+
+    import logging
+    from app import create_app
+
+    app = create_app()
+    logging.disable(logging.WARNING)
+    if args.workers is not None:
+        app.config['PASSWORD_HASH_WORKERS'] = args.workers
+    if args.max_pending is not None:
+        app.config['PASSWORD_HASH_MAX_PENDING'] = args.max_pending
+
+    print(json.dumps({
+        'workers': app.config['PASSWORD_HASH_WORKERS'],
+        'max_pending': app.config['PASSWORD_HASH_MAX_PENDING'],
+        'concurrency': args.concurrency
+    }))
+    for cost in args.costs:
+        print(json.dumps(run_cost(app, cost, args.requests, args.concurrency)))
+
+
+if __name__ == '__main__':
+    main()
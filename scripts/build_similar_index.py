@@ -0,0 +1,36 @@
+"""
+Script para reconstruir el índice de similitud por contenido de los cursos.
+
+Las peticiones nunca construyen el índice: hay que ejecutar este script tras
+el primer despliegue (hasta entonces /api/cursos/<id>/similar no devuelve
+resultados). Los cursos creados, o cuyo título o descripción cambia, se indexan
+automáticamente tras cada commit en un segmento delta con el IDF de la última
+reconstrucción; la reconstrucción también fusiona ese delta. Conviene
+reconstruir el índice periódicamente (por ejemplo, tras importaciones grandes)
+para actualizar el IDF:
+    python scripts/build_similar_index.py
+"""
+
+import os
+import sys
+import time
+
+
+def main():
+    # Añadir el directorio del proyecto al path
+    project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    sys.path.insert(0, project_dir)
+
+    from app import create_app
+    from app.utils.similar_index import rebuild_similar_index
+
+    app = create_app()
+    with app.app_context():
+        start = time.perf_counter()
+        rebuild_similar_index()
+        print(f"Índice reconstruido en {time.perf_counter() - start:.2f}s en {app.config['SIMILAR_INDEX_DIR']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
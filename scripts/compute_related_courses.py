@@ -0,0 +1,37 @@
+"""
+Script para recalcular los cursos relacionados ("los estudiantes también compraron").
+
+Pensado para ejecutarse periódicamente (por ejemplo, con cron cada noche):
+    python scripts/compute_related_courses.py
+    python scripts/compute_related_courses.py --top-n 10
+"""
+
+import argparse
+import os
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula la tabla curso_related.")
+    parser.add_argument('--top-n', type=int, default=None, help="Vecinos a guardar por curso")
+    args = parser.parse_args()
+
+    # Añadir el directorio del proyecto al path
+    project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    sys.path.insert(0, project_dir)
+
+    from app import create_app
+    from app.utils.recommendations import rebuild_related, TOP_N
+
+    app = create_app()
+    with app.app_context():
+        stats = rebuild_related(top_n=args.top_n or TOP_N)
+
+    print(f"Interacciones: {stats['interactions']}")
+    print(f"Cursos con recomendaciones: {stats['courses']} ({stats['rows']} filas)")
+    print(f"Tiempo: carga {stats['load_seconds']}s, cálculo {stats['compute_seconds']}s, total {stats['total_seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Script para importar cursos de forma masiva desde un fichero CSV o JSONL.
+
+Uso:
+    python scripts/import_courses.py cursos.csv
+    python scripts/import_courses.py cursos.jsonl --batch-size 1000 --dry-run
+"""
+
+import argparse
+import os
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa cursos desde un fichero CSV o JSONL.")
+    parser.add_argument('path', help="Ruta del fichero a importar")
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help="Formato del fichero (por defecto, según la extensión)")
+    parser.add_argument('--batch-size', type=int, default=None, help="Filas insertadas por transacción")
+    parser.add_argument('--dry-run', action='store_true', help="Solo validar las filas, sin insertar")
+    args = parser.parse_args()
+
+    # Añadir el directorio del proyecto al path
+    project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    sys.path.insert(0, project_dir)
+
+    from app import create_app
+    from app.utils.course_import import import_courses, detect_format, IMPORT_BATCH_SIZE
+
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        print("No se pudo deducir el formato del fichero; use --format csv|jsonl")
+        return 1
+
+    app = create_app()
+    with app.app_context():
+        with open(args.path, 'rb') as stream:
+            report = import_courses(
+                stream,
+                fmt,
+                batch_size=args.batch_size or IMPORT_BATCH_SIZE,
+                dry_run=args.dry_run
+            )
+
+    print(f"Filas procesadas: {report['processed']}")
+    print(f"Cursos importados: {report['imported']}{' (simulación)' if args.dry_run else ''}")
+    print(f"Filas con error: {report['failed']}")
+    for error in report['errors']:
+        print(f"  Línea {error['row']}: {'; '.join(error['errors'])}")
+    if report['errors_truncated']:
+        print("  (se omiten el resto de errores)")
+
+    return 0 if report['failed'] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Script para retirar los carritos abandonados.
+
+Pensado para ejecutarse periódicamente (por ejemplo, con cron cada noche):
+    python scripts/sweep_abandoned_carts.py
+    python scripts/sweep_abandoned_carts.py --days 60 --batch-size 200 --pause 0.1
+    python scripts/sweep_abandoned_carts.py --dry-run
+"""
+
+import argparse
+import json
+import os
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archiva y elimina los elementos de carritos abandonados.")
+    parser.add_argument('--days', type=int, default=None, help="Días sin actividad (por defecto, CART_ABANDON_DAYS)")
+    parser.add_argument('--batch-size', type=int, default=None, help="Filas por lote (por defecto, CART_SWEEP_BATCH_SIZE)")
+    parser.add_argument('--pause', type=float, default=0.0, help="Segundos de espera entre lotes")
+    parser.add_argument('--no-archive', action='store_true', help="Eliminar sin copiar a cart_archive")
+    parser.add_argument('--dry-run', action='store_true', help="Solo contar los elementos, sin modificar nada")
+    args = parser.parse_args()
+
+    # Añadir el directorio del proyecto al path
+    project_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    sys.path.insert(0, project_dir)
+
+    from app import create_app
+    from app.utils.cart_sweeper import sweep_abandoned_carts
+
+    app = create_app()
+    with app.app_context():
+        report = sweep_abandoned_carts(
+            days=args.days,
+            batch_size=args.batch_size,
+            archive=not args.no_archive,
+            dry_run=args.dry_run,
+            pause=args.pause
+        )
+
+    # Una línea JSON para poder enviar los recuentos a un sistema de informes
+    print(json.dumps(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
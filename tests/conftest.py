@@ -0,0 +1,86 @@
+"""
+Configuración común de las pruebas.
+
+Cada prueba usa una base de datos SQLite temporal recién creada. Las variables
+de entorno se fijan antes de importar la aplicación porque config.Config las
+lee al importarse.
+"""
+
+import os
+import sys
+import tempfile
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix='akademiakupula-tests-')
+
+os.environ.update({
+    'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}",
+    'FLASK_DEBUG': 'False',
+    'FLASK_TESTING': 'True',
+    'CACHE_TYPE': 'SimpleCache',
+    'PASSWORD_HASH_WORKERS': '0',
+    'BCRYPT_LOG_ROUNDS': '4',
+    'AUDIT_LOG_ENABLED': 'False',
+    'RATELIMIT_ENABLED': 'False',
+    'SIMILAR_INDEX_DIR': os.path.join(_TMP_DIR, 'similar_index'),
+})
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db, cache  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    return create_app()
+
+
+@pytest.fixture(autouse=True)
+def database(app):
+    """Esquema vacío y caché limpia para cada prueba."""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        cache.clear()
+        yield db
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_curso():
+    """Crea y confirma un curso con valores por defecto."""
+    from app.models.curso import Curso
+
+    def _make_curso(**values):
+        values.setdefault('titulo', 'Curso de maquillaje')
+        values.setdefault('descripcion', 'Maquillaje profesional')
+        values.setdefault('precio', 30.0)
+        values.setdefault('nivel', 'Principiante')
+        values.setdefault('instructor', 'Ana')
+        values.setdefault('activo', True)
+        curso = Curso(**values)
+        db.session.add(curso)
+        db.session.commit()
+        return curso
+
+    return _make_curso
+
+
+@pytest.fixture
+def make_user():
+    """Crea y confirma un usuario."""
+    from app.models.user import User
+
+    def _make_user(email='alumna@example.com'):
+        user = User(full_name='Alumna', email=email, postal_code='28001', is_confirmed=True)
+        user.password_hash = 'x'
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    return _make_user
@@ -0,0 +1,36 @@
+"""Pruebas de las claves de versión de la caché (app/utils/cache_versions.py)."""
+
+import pytest
+from app.utils.cache_versions import (
+    LOCAL_CACHE_MAX_TIMEOUT, bump_versions, get_version, get_versions, is_shared_cache, versioned_timeout
+)
+
+
+def test_bump_changes_record_and_collection_versions():
+    record, collection = get_version('curso', 1), get_version('curso')
+    other = get_version('curso', 2)
+
+    bump_versions('curso', [1])
+
+    assert get_version('curso', 1) != record
+    assert get_version('curso') != collection
+    assert get_version('curso', 2) == other
+
+
+def test_get_versions_matches_get_version():
+    versions = get_versions('curso', [1, 2])
+    assert versions == {1: get_version('curso', 1), 2: get_version('curso', 2)}
+
+
+@pytest.mark.parametrize('cache_type', ['SimpleCache', 'NullCache', 'flask_caching.backends.SimpleCache'])
+def test_local_cache_caps_timeouts(app, monkeypatch, cache_type):
+    monkeypatch.setitem(app.config, 'CACHE_TYPE', cache_type)
+    assert not is_shared_cache()
+    assert versioned_timeout(86400) == LOCAL_CACHE_MAX_TIMEOUT
+    assert versioned_timeout(60) == 60
+
+
+def test_shared_cache_keeps_timeouts(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'CACHE_TYPE', 'RedisCache')
+    assert is_shared_cache()
+    assert versioned_timeout(86400) == 86400
@@ -0,0 +1,62 @@
+"""Pruebas de la planificación de operaciones del carrito por lotes (app/utils/cart_batch.py)."""
+
+import pytest
+from app.utils.cart_batch import MAX_BATCH_OPERATIONS, CartBatchError, plan_operations
+
+
+def test_add_and_remove():
+    cart, wishlist = plan_operations([
+        {'op': 'add', 'curso_ids': [1, 2]},
+        {'op': 'remove', 'curso_id': 2},
+    ])
+    assert cart == {1: True, 2: False}
+    # Añadir al carrito saca el curso de la lista de deseos
+    assert wishlist == {1: False, 2: False}
+
+
+def test_last_operation_wins():
+    cart, _ = plan_operations([
+        {'op': 'remove', 'curso_id': 1},
+        {'op': 'add', 'curso_id': 1},
+    ])
+    assert cart == {1: True}
+
+
+def test_move_to_wishlist():
+    cart, wishlist = plan_operations([
+        {'op': 'add', 'curso_id': 1},
+        {'op': 'move_to_wishlist', 'curso_id': 1},
+    ])
+    assert cart == {1: False}
+    assert wishlist == {1: True}
+
+
+def test_add_all_from_wishlist_sees_earlier_operations():
+    cart, wishlist = plan_operations([
+        {'op': 'add', 'curso_id': 10},           # sale de la lista de deseos
+        {'op': 'move_to_wishlist', 'curso_id': 30},
+        {'op': 'add_all_from_wishlist'},
+    ], wishlist_ids=[10, 20])
+
+    assert cart == {10: True, 20: True, 30: True}
+    assert wishlist == {10: False, 20: False, 30: False}
+
+
+def test_string_ids_are_converted():
+    cart, _ = plan_operations([{'op': 'add', 'curso_ids': ['3']}])
+    assert cart == {3: True}
+
+
+@pytest.mark.parametrize('operations', [
+    [],
+    None,
+    [{'op': 'vaciar'}],
+    ['add'],
+    [{'op': 'add'}],
+    [{'op': 'add', 'curso_ids': []}],
+    [{'op': 'add', 'curso_ids': ['uno']}],
+    [{'op': 'add', 'curso_id': 1}] * (MAX_BATCH_OPERATIONS + 1),
+])
+def test_invalid_operations(operations):
+    with pytest.raises(CartBatchError):
+        plan_operations(operations)
@@ -0,0 +1,57 @@
+"""Pruebas del barrido de carritos abandonados (app/utils/cart_sweeper.py)."""
+
+from datetime import datetime, timedelta, timezone
+import pytest
+from app import db
+from app.models.cart import Cart, CartArchive
+from app.utils import cart_sweeper
+
+
+@pytest.fixture
+def carritos(make_user, make_curso):
+    """Dos usuarios con un curso en el carrito desde hace 60 días."""
+    old = datetime.now(timezone.utc) - timedelta(days=60)
+    cursos = [make_curso(titulo=f'Curso {i}', precio=25.0).id for i in range(3)]
+    users = [make_user(email=f'alumna{i}@example.com').id for i in range(2)]
+    for user_id in users:
+        item = Cart(user_id=user_id, curso_id=cursos[0])
+        item.created_at = old
+        db.session.add(item)
+    db.session.commit()
+    return users, cursos
+
+
+def test_sweeps_and_archives_abandoned_items(carritos):
+    users, _ = carritos
+    report = cart_sweeper.sweep_abandoned_carts(days=30)
+
+    assert (report['items'], report['users'], report['value']) == (2, 2, 50.0)
+    assert Cart.query.count() == 0
+    assert {row.user_id for row in CartArchive.query} == set(users)
+
+
+def test_dry_run_changes_nothing(carritos):
+    report = cart_sweeper.sweep_abandoned_carts(days=30, dry_run=True)
+
+    assert report['items'] == 2
+    assert Cart.query.count() == 2
+    assert CartArchive.query.count() == 0
+
+
+def test_user_active_during_sweep_keeps_cart(carritos, monkeypatch):
+    users, cursos = carritos
+
+    # El usuario añade un curso entre la lectura del lote y el borrado
+    sweep_batch = cart_sweeper._sweep_batch
+
+    def add_then_sweep(*args, **kwargs):
+        db.session.add(Cart(user_id=users[0], curso_id=cursos[1]))
+        db.session.flush()
+        return sweep_batch(*args, **kwargs)
+
+    monkeypatch.setattr(cart_sweeper, '_sweep_batch', add_then_sweep)
+    report = cart_sweeper.sweep_abandoned_carts(days=30)
+
+    assert (report['items'], report['users'], report['skipped_active']) == (1, 1, 1)
+    assert Cart.query.filter_by(user_id=users[0]).count() == 2
+    assert [row.user_id for row in CartArchive.query] == [users[1]]
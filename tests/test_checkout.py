@@ -0,0 +1,77 @@
+"""Pruebas del registro idempotente de pedidos pagados (app/utils/checkout.py)."""
+
+import pytest
+from app import db
+from app.models.cart import Cart
+from app.models.curso_stats import CursoStats
+from app.models.entitlement import Entitlement
+from app.models.order import Order, OrderItem
+from app.utils import checkout
+
+
+@pytest.fixture
+def compra(make_user, make_curso):
+    """Usuario con dos cursos en el carrito."""
+    user = make_user()
+    cursos = [make_curso(titulo=f'Curso {i}', precio=20.0 + i).id for i in range(2)]
+    for curso_id in cursos:
+        db.session.add(Cart(user_id=user.id, curso_id=curso_id))
+    db.session.commit()
+    return user.id, [(curso_id, 20.0 + i) for i, curso_id in enumerate(cursos)]
+
+
+def _record(user_id, items, payment_id='cs_test_1'):
+    return checkout.record_paid_order(user_id, payment_id, items, sum(price for _, price in items))
+
+
+def test_records_order_once(compra):
+    user_id, items = compra
+
+    order_id, created = _record(user_id, items)
+    assert created
+
+    assert _record(user_id, items) == (order_id, False)
+    assert Order.query.count() == 1
+    assert OrderItem.query.filter_by(order_id=order_id).count() == 2
+
+
+def test_side_effects_are_applied_once(compra):
+    user_id, items = compra
+    _record(user_id, items)
+    _record(user_id, items)
+
+    for curso_id, price in items:
+        stats = db.session.get(CursoStats, curso_id)
+        assert (stats.sales_count, stats.revenue) == (1, price)
+    assert Entitlement.query.filter_by(user_id=user_id).count() == 2
+    assert Cart.query.filter_by(user_id=user_id).count() == 0
+
+
+def test_different_payments_create_different_orders(compra):
+    user_id, items = compra
+    first, _ = _record(user_id, items[:1], payment_id='cs_test_1')
+    second, created = _record(user_id, items[1:], payment_id='cs_test_2')
+    assert created and first != second
+
+
+def test_concurrent_delivery_returns_existing_order(compra, monkeypatch):
+    user_id, items = compra
+    order_id, _ = _record(user_id, items)
+
+    # Simula una segunda entrega del evento que hizo la comprobación previa
+    # antes de que la primera confirmara: la inserción choca con el índice único
+    execute = db.session.execute
+    calls = []
+
+    def execute_missing_first_lookup(statement, *args, **kwargs):
+        calls.append(statement)
+        if len(calls) == 1:
+            return execute(statement.where(Order.id.is_(None)), *args, **kwargs)
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db.session, 'execute', execute_missing_first_lookup)
+    assert _record(user_id, items) == (order_id, False)
+    monkeypatch.undo()
+
+    assert Order.query.count() == 1
+    assert db.session.get(CursoStats, items[0][0]).sales_count == 1
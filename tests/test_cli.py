@@ -0,0 +1,38 @@
+"""Pruebas del comando flask rebuild-derived (app/cli.py)."""
+
+from sqlalchemy import delete
+from app import db
+from app.models.curso_facet import CursoFacet
+
+
+def _clear_facets():
+    db.session.execute(delete(CursoFacet.__table__))
+    db.session.commit()
+
+
+def test_fills_empty_tables(app, make_curso):
+    make_curso(nivel='Avanzado')
+    _clear_facets()
+
+    result = app.test_cli_runner().invoke(args=['rebuild-derived', '--only', 'facets'])
+
+    assert result.exit_code == 0
+    assert 'facets:' in result.output
+    assert CursoFacet.query.filter_by(facet='nivel', value='Avanzado').one().total == 1
+
+
+def test_skips_tables_with_data_unless_forced(app, make_curso):
+    make_curso(nivel='Avanzado')
+    row = CursoFacet.query.filter_by(facet='nivel', value='Avanzado').one()
+    row.total = 7
+    db.session.commit()
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['rebuild-derived', '--only', 'facets'])
+    assert result.exit_code == 0
+    assert 'se omite' in result.output
+    assert db.session.get(CursoFacet, (row.facet, row.value)).total == 7
+
+    runner.invoke(args=['rebuild-derived', '--only', 'facets', '--force'])
+    db.session.expire_all()
+    assert CursoFacet.query.filter_by(facet='nivel', value='Avanzado').one().total == 1
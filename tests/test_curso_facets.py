@@ -0,0 +1,94 @@
+"""Pruebas de los recuentos incrementales de facetas (app/models/curso_facet.py)."""
+
+from app import db
+from app.models.curso import Curso
+from app.models.curso_facet import CursoFacet
+
+
+def _totals():
+    """Recuentos distintos de cero como {(faceta, valor): total}."""
+    return {
+        (row.facet, row.value): row.total
+        for row in CursoFacet.query.all() if row.total
+    }
+
+
+def _rebuilt_totals():
+    """Recuentos recalculados desde cero, sin tocar los incrementales."""
+    incremental = _totals()
+    CursoFacet.rebuild()
+    rebuilt = _totals()
+    db.session.rollback()
+    assert _totals() == incremental
+    return rebuilt
+
+
+def test_insert_adds_facets(make_curso):
+    make_curso(nivel='Avanzado', instructor='Ana', precio=120.0, destacado=True)
+    make_curso(nivel='Avanzado', instructor='Luis', precio=0.0)
+
+    totals = _totals()
+    assert totals[('nivel', 'Avanzado')] == 2
+    assert totals[('instructor', 'Ana')] == 1
+    assert totals[('precio', '100-200')] == 1
+    assert totals[('precio', 'gratis')] == 1
+    assert totals[('destacado', 'true')] == 1
+    assert totals[('destacado', 'false')] == 1
+    assert totals == _rebuilt_totals()
+
+
+def test_inactive_courses_are_not_counted(make_curso):
+    make_curso(activo=False)
+    assert _totals() == {}
+
+
+def test_update_moves_counts(make_curso):
+    curso = make_curso(nivel='Principiante', precio=30.0)
+    make_curso(nivel='Principiante', precio=30.0)
+
+    curso.nivel = 'Intermedio'
+    curso.precio = 75.0
+    db.session.commit()
+
+    totals = _totals()
+    assert totals[('nivel', 'Principiante')] == 1
+    assert totals[('nivel', 'Intermedio')] == 1
+    assert totals[('precio', '0-50')] == 1
+    assert totals[('precio', '50-100')] == 1
+    assert totals == _rebuilt_totals()
+
+
+def test_deactivate_and_reactivate(make_curso):
+    curso = make_curso(nivel='Avanzado')
+
+    curso.activo = False
+    db.session.commit()
+    assert _totals() == {}
+
+    curso.activo = True
+    db.session.commit()
+    assert _totals()[('nivel', 'Avanzado')] == 1
+
+
+def test_delete_subtracts_facets(make_curso):
+    curso = make_curso(nivel='Avanzado', instructor='Ana')
+    make_curso(nivel='Avanzado', instructor='Luis')
+
+    db.session.delete(curso)
+    db.session.commit()
+
+    totals = _totals()
+    assert totals[('nivel', 'Avanzado')] == 1
+    assert ('instructor', 'Ana') not in totals
+    assert totals == _rebuilt_totals()
+
+
+def test_rollback_leaves_counts_untouched(make_curso):
+    make_curso(nivel='Avanzado')
+    before = _totals()
+
+    db.session.add(Curso(titulo='Descartado', descripcion='d', precio=10.0, nivel='Avanzado', activo=True))
+    db.session.flush()
+    db.session.rollback()
+
+    assert _totals() == before
@@ -0,0 +1,43 @@
+"""Pruebas de los contadores de ventas por curso (app/models/curso_stats.py)."""
+
+from app import db
+from app.models.curso_stats import CursoStats, PAID_STATUS
+from app.models.order import Order, OrderItem
+
+
+def _make_order(user_id, curso_ids, status=PAID_STATUS):
+    order = Order(user_id=user_id, total_amount=30.0 * len(curso_ids), status=status)
+    order.items = [OrderItem(curso_id=curso_id, price=30.0, quantity=1) for curso_id in curso_ids]
+    db.session.add(order)
+    db.session.commit()
+    return order
+
+
+def _counters():
+    """Contadores como {curso_id: (ventas, ingresos)}."""
+    return {row.curso_id: (row.sales_count, row.revenue) for row in CursoStats.query if row.sales_count}
+
+
+def test_sales_counters_follow_order_status(make_user, make_curso):
+    user = make_user()
+    curso_id = make_curso().id
+    order = _make_order(user.id, [curso_id])
+    assert db.session.get(CursoStats, curso_id).sales_count == 1
+
+    order.status = 'refunded'
+    db.session.commit()
+    assert db.session.get(CursoStats, curso_id).sales_count == 0
+
+
+def test_rebuild_matches_incremental_counters(make_user, make_curso):
+    user = make_user()
+    cursos = [make_curso(titulo=f'Curso {i}').id for i in range(3)]
+    _make_order(user.id, cursos[:2])
+    _make_order(user.id, cursos[1:])
+    _make_order(user.id, [cursos[0]], status='pending')
+    incremental = _counters()
+
+    CursoStats.rebuild()
+    db.session.commit()
+    assert _counters() == incremental
+    assert incremental[cursos[1]] == (2, 60.0)
@@ -0,0 +1,93 @@
+"""Pruebas de la concesión y retirada de accesos a cursos (app/models/entitlement.py)."""
+
+import pytest
+from app import db
+from app.models.curso_stats import PAID_STATUS
+from app.models.entitlement import Entitlement
+from app.models.order import Order, OrderItem
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def cursos(make_curso):
+    return [make_curso(titulo=f'Curso {i}').id for i in range(3)]
+
+
+def _make_order(user_id, curso_ids, status='pending'):
+    order = Order(user_id=user_id, total_amount=30.0 * len(curso_ids), status=status)
+    order.items = [OrderItem(curso_id=curso_id, price=30.0, quantity=1) for curso_id in curso_ids]
+    db.session.add(order)
+    db.session.commit()
+    return order
+
+
+def _granted(user_id):
+    """Cursos concedidos al usuario como {curso_id: order_id}."""
+    return {
+        row.curso_id: row.order_id
+        for row in Entitlement.query.filter_by(user_id=user_id)
+    }
+
+
+def test_paid_order_grants_courses(user, cursos):
+    order = _make_order(user.id, cursos[:2], status=PAID_STATUS)
+    assert _granted(user.id) == {cursos[0]: order.id, cursos[1]: order.id}
+
+
+def test_pending_order_grants_nothing_until_paid(user, cursos):
+    order = _make_order(user.id, cursos[:2])
+    assert _granted(user.id) == {}
+
+    order.status = PAID_STATUS
+    db.session.commit()
+    assert set(_granted(user.id)) == set(cursos[:2])
+
+
+def test_refund_revokes_courses(user, cursos):
+    order = _make_order(user.id, cursos[:2], status=PAID_STATUS)
+
+    order.status = 'refunded'
+    db.session.commit()
+    assert _granted(user.id) == {}
+
+
+def test_revoke_keeps_access_from_another_paid_order(user, cursos):
+    first = _make_order(user.id, cursos[:2], status=PAID_STATUS)
+    second = _make_order(user.id, [cursos[1]], status=PAID_STATUS)
+    assert _granted(user.id)[cursos[1]] == first.id
+
+    first.status = 'refunded'
+    db.session.commit()
+    assert _granted(user.id) == {cursos[1]: second.id}
+
+
+def test_item_changes_on_paid_order(user, cursos):
+    order = _make_order(user.id, cursos[:1], status=PAID_STATUS)
+
+    db.session.add(OrderItem(order_id=order.id, curso_id=cursos[2], price=30.0, quantity=1))
+    db.session.commit()
+    assert set(_granted(user.id)) == {cursos[0], cursos[2]}
+
+    item = OrderItem.query.filter_by(order_id=order.id, curso_id=cursos[0]).one()
+    item.curso_id = cursos[1]
+    db.session.commit()
+    assert set(_granted(user.id)) == {cursos[1], cursos[2]}
+
+    db.session.delete(item)
+    db.session.commit()
+    assert set(_granted(user.id)) == {cursos[2]}
+
+
+def test_rebuild_matches_incremental_grants(user, cursos):
+    _make_order(user.id, cursos[:2], status=PAID_STATUS)
+    _make_order(user.id, [cursos[2]])
+    incremental = _granted(user.id)
+
+    Entitlement.rebuild()
+    db.session.commit()
+    assert _granted(user.id) == incremental
+
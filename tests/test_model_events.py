@@ -0,0 +1,83 @@
+"""Pruebas de la notificación de cambios tras el commit (app/utils/model_events.py)."""
+
+import pytest
+from app import db
+from app.models.curso import Curso
+from app.utils.cache_versions import get_version
+from app.utils.model_events import _commit_callbacks, mark_changed, on_commit
+
+
+@pytest.fixture
+def received():
+    """Registra un callback temporal sobre Curso y devuelve los ChangeSet recibidos."""
+    changesets = []
+    callback = on_commit(Curso)(changesets.append)
+    yield changesets
+    _commit_callbacks[Curso].remove(callback)
+
+
+def test_callback_runs_after_commit(received, make_curso):
+    curso = make_curso(titulo='Nuevo')
+
+    assert len(received) == 1
+    assert set(received[0].upserted) == {curso.id}
+    assert received[0].upserted[curso.id]['titulo'] == 'Nuevo'
+    assert not received[0].deleted
+
+
+def test_flush_does_not_notify_until_commit(received):
+    db.session.add(Curso(titulo='Pendiente', descripcion='d', precio=10.0))
+    db.session.flush()
+    assert received == []
+
+    db.session.commit()
+    assert len(received) == 1
+
+
+def test_rollback_discards_pending_changes(received, make_curso):
+    db.session.add(Curso(titulo='Descartado', descripcion='d', precio=10.0))
+    db.session.flush()
+    db.session.rollback()
+    assert received == []
+
+    # Los cambios deshechos no se cuelan en el commit siguiente
+    curso = make_curso(titulo='Confirmado')
+    assert len(received) == 1
+    assert set(received[0].ids) == {curso.id}
+
+
+def test_update_and_delete(received, make_curso):
+    curso = make_curso()
+    curso_id = curso.id
+    received.clear()
+
+    curso.precio = 45.0
+    db.session.commit()
+    assert set(received[-1].upserted) == {curso_id}
+
+    db.session.delete(curso)
+    db.session.commit()
+    assert set(received[-1].deleted) == {curso_id}
+    assert not received[-1].upserted
+
+
+def test_mark_changed_for_bulk_statements(received):
+    mark_changed(db.session, Curso, upserted_ids=[7], deleted_ids=[8])
+    db.session.commit()
+
+    assert set(received[0].upserted) == {7}
+    assert set(received[0].deleted) == {8}
+
+
+def test_cache_version_bumped_on_commit_only(make_curso):
+    curso = make_curso()
+    version = get_version('curso', curso.id)
+
+    curso.precio = 99.0
+    db.session.flush()
+    db.session.rollback()
+    assert get_version('curso', curso.id) == version
+
+    curso.precio = 99.0
+    db.session.commit()
+    assert get_version('curso', curso.id) != version
@@ -0,0 +1,76 @@
+"""Pruebas de la paginación por cursor del listado de cursos."""
+
+from datetime import datetime
+import pytest
+from app import db
+from app.models.curso_stats import CursoStats
+from app.utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize('value', [None, 0, 19.99, 'Maquillaje', datetime(2026, 3, 1, 10, 30)])
+def test_cursor_round_trip(value):
+    cursor = encode_cursor('precio', value, 42)
+    assert decode_cursor(cursor, 'precio') == (value, 42)
+
+
+def test_cursor_rejects_other_sort():
+    cursor = encode_cursor('precio', 10.0, 1)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, 'titulo')
+
+
+def test_cursor_rejects_garbage():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor('no-es-un-cursor', 'precio')
+
+
+def _walk(client, limit, **params):
+    """Recorre todas las páginas del listado y devuelve los IDs en orden."""
+    ids, cursor = [], None
+    while True:
+        query = {'limit': limit, **params}
+        if cursor:
+            query['cursor'] = cursor
+        response = client.get('/api/cursos/', query_string=query)
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        ids += [curso['id'] for curso in data['cursos']]
+        cursor = data['pagination']['next_cursor']
+        if not cursor:
+            return ids
+
+
+@pytest.fixture
+def catalogo(make_curso):
+    """Cursos con precios repetidos y sin precio (NULL)."""
+    precios = [20.0, None, 10.0, 20.0, None, 0.0, 10.0]
+    return [make_curso(titulo=f'Curso {i}', precio=precio).id for i, precio in enumerate(precios)]
+
+
+@pytest.mark.parametrize('sort', ['precio', '-precio'])
+@pytest.mark.parametrize('limit', [1, 2, 3, 100])
+def test_pages_with_null_sort_keys(client, catalogo, sort, limit):
+    ids = _walk(client, limit, sort=sort)
+
+    # Cada curso aparece exactamente una vez y en el mismo orden que sin paginar
+    assert sorted(ids) == sorted(catalogo)
+    assert ids == _walk(client, 100, sort=sort)
+
+
+def test_null_prices_sort_last_descending(client, catalogo):
+    ids = _walk(client, 2, sort='-precio')
+    precios = {curso_id: precio for curso_id, precio in zip(catalogo, [20.0, None, 10.0, 20.0, None, 0.0, 10.0])}
+    assert [precios[curso_id] for curso_id in ids[-2:]] == [None, None]
+
+
+@pytest.mark.parametrize('limit', [1, 2, 4, 100])
+def test_bestsellers_pages_into_unsold_tail(client, catalogo, limit):
+    for curso_id, sales in zip(catalogo, [5, 5, 1, 0]):
+        db.session.add(CursoStats(curso_id=curso_id, sales_count=sales, revenue=0.0))
+    db.session.commit()
+
+    ids = _walk(client, limit, sort='bestsellers')
+
+    sold = [catalogo[1], catalogo[0], catalogo[2], catalogo[3]]
+    unsold = sorted(catalogo[4:], reverse=True)
+    assert ids == sold + unsold
@@ -0,0 +1,46 @@
+"""Pruebas de la respuesta 503 cuando el pool de hash está saturado (app/utils/password_hashing.py)."""
+
+import pytest
+from app.models import user as user_model
+from app.models.user import User
+from app.utils.password_hashing import PasswordHashingBusy
+
+
+@pytest.fixture
+def busy_pool(monkeypatch):
+    """Simula un pool de hash saturado."""
+    def busy(*args, **kwargs):
+        raise PasswordHashingBusy("Demasiadas operaciones de contraseña en curso")
+
+    monkeypatch.setattr(user_model, 'hash_password', busy)
+    monkeypatch.setattr(user_model, 'verify_password', busy)
+
+
+def _assert_busy(response):
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert response.get_json()['success'] is False
+
+
+def test_register_answers_503(client, busy_pool):
+    response = client.post('/api/auth/register', json={
+        'full_name': 'Alumna', 'postal_code': '28001',
+        'email': 'nueva@example.com', 'password': 'contraseña-segura'
+    })
+    _assert_busy(response)
+    assert User.query.filter_by(email='nueva@example.com').first() is None
+
+
+def test_login_answers_503_without_counting_attempt(client, make_user, busy_pool):
+    user = make_user()
+    response = client.post('/api/auth/login', json={'email': user.email, 'password': 'x' * 8})
+    _assert_busy(response)
+    assert not user.failed_login_attempts
+
+
+def test_app_handler_covers_every_route(app):
+    # Cualquier ruta que deje pasar la excepción (por ejemplo, un cambio de
+    # contraseña) recibe el 503 del manejador de la aplicación, no un 500
+    with app.test_request_context('/api/me'):
+        response = app.make_response(app.handle_user_exception(PasswordHashingBusy("Pool saturado")))
+    _assert_busy(response)
@@ -0,0 +1,81 @@
+"""Pruebas del cambio masivo de precios (app/utils/repricing.py)."""
+
+import numpy as np
+import pytest
+from app import db
+from app.models.curso import Curso
+from app.models.curso_facet import CursoFacet
+from app.utils import repricing
+from app.utils.repricing import RepricingError, compute_prices, parse_rule
+
+
+def _prices(*values):
+    return np.array(values, dtype=np.float64)
+
+
+def _compute(prices, **rule):
+    return compute_prices(_prices(*prices), parse_rule(rule)).tolist()
+
+
+def test_cents_rounding():
+    assert _compute([19.99, 10.0, 24.30], percent=10) == [21.99, 11.0, 26.73]
+
+
+def test_integer_rounding_is_half_up():
+    # np.round redondearía 2.5 a 2 (al par); los precios se redondean hacia arriba
+    assert _compute([2.5, 3.5, 19.99], round='integer') == [3.0, 4.0, 20.0]
+    assert _compute([19.99], percent=10, round='integer') == [22.0]
+
+
+def test_charm_rounding():
+    assert _compute([24.30, 24.60, 0.30], round='charm') == [23.99, 24.99, 0.99]
+
+
+def test_free_courses_stay_free():
+    assert _compute([0.0], percent=50, round='charm', min_price=5) == [0.0]
+
+
+def test_min_and_max_price():
+    assert _compute([10.0, 30.0], percent=-50, min_price=8) == [8.0, 15.0]
+    assert _compute([10.0, 30.0], percent=50, max_price=20) == [15.0, 20.0]
+
+
+@pytest.mark.parametrize('rule', [
+    {'percent': -100},
+    {'percent': 101},
+    {'percent': 10, 'round': 'floor'},
+    {'percent': 'diez'},
+    {'min_price': 20, 'max_price': 10},
+    {'min_price': -1},
+    {},
+])
+def test_invalid_rules(rule):
+    with pytest.raises(RepricingError):
+        parse_rule(rule)
+
+
+def test_apply_skips_courses_changed_concurrently(make_curso, monkeypatch):
+    stale = make_curso(precio=40.0).id
+    fresh = make_curso(precio=40.0).id
+
+    # Otra petición cambia un precio entre la lectura y el UPDATE
+    load_selection = repricing._load_selection
+
+    def load_then_change(conditions):
+        selection = load_selection(conditions)
+        db.session.get(Curso, stale).precio = 150.0
+        db.session.commit()
+        return selection
+
+    monkeypatch.setattr(repricing, '_load_selection', load_then_change)
+    result = repricing.apply_repricing({}, {'percent': 50})
+
+    assert result == {'selected': 2, 'changed': 1, 'skipped': 1}
+    assert db.session.get(Curso, stale).precio == 150.0
+    assert db.session.get(Curso, fresh).precio == 60.0
+
+    # Los recuentos de facetas siguen a las filas realmente modificadas
+    totals = {(row.facet, row.value): row.total for row in CursoFacet.query.filter_by(facet='precio')}
+    assert totals[('precio', '50-100')] == 1
+    assert totals[('precio', '100-200')] == 1
+    assert totals[('precio', '0-50')] == 0
@@ -0,0 +1,75 @@
+"""Pruebas del índice de similitud por contenido (app/utils/similar_index.py)."""
+
+import pytest
+from app import db
+from app.models.curso import Curso
+from app.utils import similar_index
+from app.utils.repricing import apply_repricing
+
+
+@pytest.fixture
+def cursos(app, make_curso, tmp_path, monkeypatch):
+    """Tres cursos indexados en un directorio propio de la prueba."""
+    monkeypatch.setitem(app.config, 'SIMILAR_INDEX_DIR', str(tmp_path))
+    ids = [
+        make_curso(titulo='Maquillaje de novia', descripcion='Maquillaje para bodas y novias').id,
+        make_curso(titulo='Maquillaje de fiesta', descripcion='Maquillaje para bodas y fiestas').id,
+        make_curso(titulo='Uñas de gel', descripcion='Manicura con gel').id,
+    ]
+    similar_index.rebuild_similar_index()
+    return ids
+
+
+def _pointer():
+    return similar_index.get_similar_index()._current_pointer()
+
+
+def _similar_ids(curso_id):
+    return [similar_id for similar_id, _ in similar_index.find_similar(curso_id)]
+
+
+def test_finds_similar_courses(cursos):
+    assert _similar_ids(cursos[0])[0] == cursos[1]
+
+
+def test_changes_outside_indexed_columns_do_not_reindex(cursos):
+    pointer = _pointer()
+
+    curso = db.session.get(Curso, cursos[0])
+    curso.precio = 99.0
+    curso.activo = False
+    db.session.commit()
+    apply_repricing({'ids': cursos}, {'percent': 10})
+
+    assert _pointer() == pointer
+
+
+def test_content_change_only_writes_a_delta(cursos):
+    base = _pointer()
+
+    curso = db.session.get(Curso, cursos[2])
+    curso.titulo = 'Maquillaje de novia y fiesta'
+    curso.descripcion = 'Maquillaje para bodas, novias y fiestas'
+    db.session.commit()
+
+    # La base no se reescribe: el curso va al segmento delta
+    segments = _pointer().split()
+    assert len(segments) == 2 and segments[0] == base
+    assert cursos[2] in _similar_ids(cursos[0])
+
+
+def test_deleted_course_disappears(cursos):
+    db.session.delete(db.session.get(Curso, cursos[1]))
+    db.session.commit()
+
+    assert cursos[1] not in _similar_ids(cursos[0])
+    assert _similar_ids(cursos[1]) == []
+
+
+def test_large_delta_is_merged_into_the_base(cursos, make_curso, monkeypatch):
+    monkeypatch.setattr(similar_index, 'DELTA_MAX_ROWS', 1)
+    nuevo = make_curso(titulo='Maquillaje de novia clásico', descripcion='Maquillaje para novias').id
+    make_curso(titulo='Pedicura', descripcion='Cuidado de pies')
+
+    assert len(_pointer().split()) == 1
+    assert nuevo in _similar_ids(cursos[0])
@@ -0,0 +1,59 @@
+"""Pruebas de la protección contra estampidas (app/utils/single_flight.py)."""
+
+import threading
+from app import cache
+from app.utils import single_flight
+from app.utils.single_flight import LOCK_STRIPES, get_or_compute
+
+
+def test_computes_once_and_caches():
+    calls = []
+    compute = lambda: calls.append(1) or 'valor'
+
+    assert get_or_compute('sf:test:once', compute, timeout=60) == 'valor'
+    assert get_or_compute('sf:test:once', compute, timeout=60) == 'valor'
+    assert len(calls) == 1
+
+
+def test_concurrent_callers_share_one_computation():
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.wait(0.2)
+        return 'valor'
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(get_or_compute('sf:test:threads', compute, timeout=60)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['valor'] * 5
+    assert len(calls) == 1
+
+
+def test_local_locks_do_not_grow_with_keys():
+    for version in range(1000):
+        get_or_compute(f'sf:test:version:{version}', lambda: version, timeout=60)
+    assert len(single_flight._local_locks) == LOCK_STRIPES
+
+
+def test_foreign_lock_is_not_deleted(monkeypatch):
+    # Otro worker tiene el bloqueo y no publica el valor a tiempo
+    cache.set('sf:test:foreign:lock', True, timeout=60)
+    monkeypatch.setattr(single_flight, 'WAIT_INTERVAL', 0.01)
+
+    assert get_or_compute('sf:test:foreign', lambda: 'valor', timeout=60, lock_timeout=0.05) == 'valor'
+    assert cache.get('sf:test:foreign:lock') is True
+
+
+def test_own_lock_is_released():
+    get_or_compute('sf:test:own', lambda: 'valor', timeout=60)
+    assert cache.get('sf:test:own:lock') is None